@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+"""
+Бінарний формат словника наголосів (.acdb), що відкривається через mmap.
+
+Файл не розбирається при відкритті: слова шукаються прямо у відображеній
+пам'яті за хеш-таблицею (O(1)), а відсортована таблиця зсувів дає
+впорядкований обхід та двійковий пошук. Пам'ять процесу не росте разом
+зі словником - сторінки підвантажує ОС.
+
+Структура файлу (little-endian):
+    заголовок   <4sHHIIQQQQ: "ACDB", версія, резерв, к-сть слів, к-сть слотів хеш-таблиці,
+                зсуви таблиці зсувів, хеш-таблиці, блоку ключів, блоку значень
+    таблиця зсувів  count x <IIII: зсув ключа, довжина ключа, зсув значення, довжина значення
+                    (відсортовано за байтами UTF-8 ключа = порядок символів)
+    хеш-таблиця     slots x <I: індекс запису + 1 (0 - порожньо), відкрита адресація, crc32
+    блок ключів, блок значень - UTF-8
+
+Перетворення:
+    python accent_dict_binary.py to-bin accents.json [accents.acdb]
+    python accent_dict_binary.py to-json accents.acdb [accents.json]
+"""
+
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import zlib
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+MAGIC = b"ACDB"
+VERSION = 1
+BINARY_SUFFIX = ".acdb"
+
+_HEADER = struct.Struct("<4sHHIIQQQQ")
+_ENTRY = struct.Struct("<IIII")
+_SLOT = struct.Struct("<I")
+
+
+def binary_path_for(json_path) -> Path:
+    """Шлях бінарного словника поруч з JSON: accents_files.json -> accents_files.acdb"""
+    return Path(json_path).with_suffix(BINARY_SUFFIX)
+
+
+def write_binary(accents, path) -> int:
+    """
+    Записує словник у бінарний формат атомарно (тимчасовий файл + os.replace).
+    Повертає кількість слів.
+    """
+    path = Path(path)
+    items = sorted((str(k).encode('utf-8'), str(v).encode('utf-8')) for k, v in accents.items())
+    count = len(items)
+    slots = 1
+    while slots < count * 2:
+        slots *= 2
+
+    entries = bytearray()
+    keys = bytearray()
+    values = bytearray()
+    table = [0] * slots
+    mask = slots - 1
+    for index, (key, value) in enumerate(items):
+        entries += _ENTRY.pack(len(keys), len(key), len(values), len(value))
+        keys += key
+        values += value
+        slot = zlib.crc32(key) & mask
+        while table[slot]:
+            slot = (slot + 1) & mask
+        table[slot] = index + 1
+
+    index_off = _HEADER.size
+    hash_off = index_off + len(entries)
+    keys_off = hash_off + slots * _SLOT.size
+    values_off = keys_off + len(keys)
+    header = _HEADER.pack(MAGIC, VERSION, 0, count, slots, index_off, hash_off, keys_off, values_off)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(entries)
+        f.write(struct.pack(f"<{slots}I", *table))
+        f.write(keys)
+        f.write(values)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+def write_binary_sorted(items: Iterable, path, block_size: int = 1 << 16) -> int:
+    """
+    Потоковий запис бінарного словника з відсортованих пар (слово, наголос).
+    Таблиця зсувів, ключі, значення та хеші слів пишуться в тимчасові файли,
+    хеш-таблиця заповнюється вже у відображенні готового файлу - пам'ять
+    не залежить від розміру словника. Повертає кількість слів.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tempfile.TemporaryDirectory(dir=path.parent) as work:
+        work = Path(work)
+        count = keys_len = values_len = 0
+        previous = None
+        with open(work / "entries", "wb") as entries, open(work / "keys", "wb") as keys, \
+                open(work / "values", "wb") as values, open(work / "hashes", "wb") as hashes:
+            for key, value in items:
+                key, value = key.encode('utf-8'), value.encode('utf-8')
+                if previous is not None and key <= previous:
+                    raise ValueError(f"Слова не відсортовані: {key.decode('utf-8')}")
+                previous = key
+                entries.write(_ENTRY.pack(keys_len, len(key), values_len, len(value)))
+                keys.write(key)
+                values.write(value)
+                hashes.write(_SLOT.pack(zlib.crc32(key)))
+                keys_len += len(key)
+                values_len += len(value)
+                count += 1
+
+        slots = 1
+        while slots < count * 2:
+            slots *= 2
+        mask = slots - 1
+        index_off = _HEADER.size
+        hash_off = index_off + count * _ENTRY.size
+        keys_off = hash_off + slots * _SLOT.size
+        values_off = keys_off + keys_len
+
+        with open(tmp_path, "w+b") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, 0, count, slots, index_off, hash_off, keys_off, values_off))
+            with open(work / "entries", "rb") as src:
+                shutil.copyfileobj(src, f, block_size)
+            # Хеш-таблиця - нулі (порожні слоти), заповнюється нижче
+            f.seek(keys_off)
+            for name in ("keys", "values"):
+                with open(work / name, "rb") as src:
+                    shutil.copyfileobj(src, f, block_size)
+            f.truncate(values_off + values_len)
+            f.flush()
+            if count:
+                with mmap.mmap(f.fileno(), 0) as mm, open(work / "hashes", "rb") as src:
+                    table = memoryview(mm)[hash_off:keys_off].cast('I')
+                    index = 0
+                    for block in iter(lambda: src.read(block_size), b""):
+                        for (crc,) in _SLOT.iter_unpack(block):
+                            slot = crc & mask
+                            while table[slot]:
+                                slot = (slot + 1) & mask
+                            index += 1
+                            table[slot] = index
+                    if sys.byteorder == "big":
+                        # Формат файлу little-endian, а таблиця заповнювалась у порядку процесора
+                        for slot in range(slots):
+                            table[slot] = int.from_bytes(table[slot].to_bytes(4, "big"), "little")
+                    table.release()
+                    mm.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+class BinaryAccentDict(MutableMapping):
+    """
+    Словник наголосів поверх mmap. Зміни (додавання, заміна, видалення)
+    тримаються в пам'яті поверх файлу, поки словник не буде збережено.
+    """
+
+#-------------------------------------------
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Порожній файл mmap не відкриває
+            self._file.close()
+            raise ValueError(f"Порожній бінарний словник: {self.path}")
+
+        (magic, version, _, self._count, self._slots, self._index_off,
+         self._hash_off, self._keys_off, self._values_off) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Невідомий формат словника: {self.path}")
+        self._mask = self._slots - 1
+        self._overlay = {}
+        self._deleted = set()
+        self._len = self._count
+
+#-------------------------------------------
+    def _entry(self, index: int):
+        return _ENTRY.unpack_from(self._mm, self._index_off + index * _ENTRY.size)
+
+#-------------------------------------------
+    def _key_at(self, index: int) -> bytes:
+        key_off, key_len, _, _ = self._entry(index)
+        start = self._keys_off + key_off
+        return self._mm[start:start + key_len]
+
+#-------------------------------------------
+    def _find(self, key: bytes) -> int:
+        """Індекс запису у файлі або -1."""
+        if not self._count:
+            return -1
+        mm = self._mm
+        slot = zlib.crc32(key) & self._mask
+        while True:
+            ref = _SLOT.unpack_from(mm, self._hash_off + slot * 4)[0]
+            if not ref:
+                return -1
+            key_off, key_len, _, _ = _ENTRY.unpack_from(mm, self._index_off + (ref - 1) * _ENTRY.size)
+            if key_len == len(key):
+                start = self._keys_off + key_off
+                if mm[start:start + key_len] == key:
+                    return ref - 1
+            slot = (slot + 1) & self._mask
+
+#-------------------------------------------
+    def _base_get(self, key: str) -> Optional[str]:
+        index = self._find(key.encode('utf-8'))
+        if index < 0:
+            return None
+        _, _, val_off, val_len = self._entry(index)
+        start = self._values_off + val_off
+        return self._mm[start:start + val_len].decode('utf-8')
+
+#-------------------------------------------
+    def _in_base(self, key: str) -> bool:
+        return self._find(key.encode('utf-8')) >= 0
+
+#-------------------------------------------
+    def __getitem__(self, key: str) -> str:
+        if key in self._overlay:
+            return self._overlay[key]
+        if key in self._deleted:
+            raise KeyError(key)
+        value = self._base_get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+#-------------------------------------------
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+#-------------------------------------------
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+#-------------------------------------------
+    def __setitem__(self, key: str, value: str):
+        if key not in self:
+            self._len += 1
+        self._deleted.discard(key)
+        self._overlay[key] = value
+
+#-------------------------------------------
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self._overlay.pop(key, None)
+        if self._in_base(key):
+            self._deleted.add(key)
+        self._len -= 1
+
+#-------------------------------------------
+    def __len__(self) -> int:
+        return self._len
+
+#-------------------------------------------
+    def __iter__(self) -> Iterator[str]:
+        """Слова файлу у відсортованому порядку, потім нові слова."""
+        for index in range(self._count):
+            key = self._key_at(index).decode('utf-8')
+            if key not in self._deleted:
+                yield key
+        for key in self._overlay:
+            if key not in self._deleted and not self._in_base(key):
+                yield key
+
+#-------------------------------------------
+    def iter_items(self) -> Iterator:
+        """
+        Усі пари (слово, наголос) послідовним проходом таблиці зсувів -
+        у кілька разів швидше за items(), що шукає кожне слово в хеш-таблиці.
+        """
+        mm = self._mm
+        keys = mm[self._keys_off:self._values_off]
+        values = mm[self._values_off:]
+        table = mm[self._index_off:self._index_off + self._count * _ENTRY.size]
+        overlay, deleted = self._overlay, self._deleted
+        for key_off, key_len, val_off, val_len in _ENTRY.iter_unpack(table):
+            key = keys[key_off:key_off + key_len].decode('utf-8')
+            if key in overlay or key in deleted:
+                continue
+            yield key, values[val_off:val_off + val_len].decode('utf-8')
+        for key, value in overlay.items():
+            if key not in deleted:
+                yield key, value
+
+#-------------------------------------------
+    def bisect(self, prefix: str) -> int:
+        """Індекс першого слова файлу, не меншого за prefix (двійковий пошук)."""
+        target = prefix.encode('utf-8')
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+#-------------------------------------------
+    def keys_with_prefix(self, prefix: str) -> Iterator[str]:
+        """Слова файлу з заданим початком (без змін у пам'яті)."""
+        target = prefix.encode('utf-8')
+        for index in range(self.bisect(prefix), self._count):
+            key = self._key_at(index)
+            if not key.startswith(target):
+                break
+            yield key.decode('utf-8')
+
+#-------------------------------------------
+    def snapshot(self) -> "BinaryAccentDict":
+        """
+        Незалежна копія змін поверх того самого відображення файлу
+        (для запису у фоні, поки словник змінюється). Закривати не потрібно.
+        """
+        copy = object.__new__(BinaryAccentDict)
+        copy.__dict__.update(self.__dict__)
+        copy._overlay = dict(self._overlay)
+        copy._deleted = set(self._deleted)
+        copy._file = None
+        return copy
+
+#-------------------------------------------
+    @property
+    def dirty(self) -> bool:
+        """Чи є незбережені зміни поверх файлу."""
+        return bool(self._overlay or self._deleted)
+
+#-------------------------------------------
+    def close(self):
+        """Закриває відображення файлу."""
+        if self._file is None:
+            # Знімок не володіє відображенням
+            self._mm = None
+            return
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+#-------------------------------------------
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def json_to_binary(json_path, bin_path=None) -> Path:
+    """Перетворює JSON словник у бінарний."""
+    bin_path = Path(bin_path) if bin_path else binary_path_for(json_path)
+    with open(json_path, "r", encoding="utf-8") as f:
+        accents = json.load(f)
+    write_binary(accents, bin_path)
+    return bin_path
+
+
+def binary_to_json(bin_path, json_path=None) -> Path:
+    """Перетворює бінарний словник у JSON (формат FileManager.save_accents)."""
+    json_path = Path(json_path) if json_path else Path(bin_path).with_suffix(".json")
+    with BinaryAccentDict(bin_path) as accents:
+        data = dict(accents.items())
+    tmp_path = json_path.with_name(json_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, json_path)
+    return json_path
+
+
+# ========== Перетворення з командного рядка ==========
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("to-bin", "to-json"):
+        print(__doc__)
+        sys.exit(1)
+    source = sys.argv[2]
+    target = sys.argv[3] if len(sys.argv) > 3 else None
+    if sys.argv[1] == "to-bin":
+        print(f"Записано: {json_to_binary(source, target)}")
+    else:
+        print(f"Записано: {binary_to_json(source, target)}")
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Рушій розстановки наголосів.
+
+Словник один раз перетворюється на таблицю "поверхневих" форм слова
+(нижній регістр, Перша велика, ВСІ ВЕЛИКІ) -> готова заміна у потрібному
+регістрі. Текст ділиться регуляркою, еквівалентною WORD_RE, на слова та проміжки за один
+виклик split, а слова замінюються пошуком у таблиці без виклику match_casing.
+Змішаний регістр (напр. "мАма") та слова поза таблицею обробляються
+початковою логікою і запам'ятовуються.
+
+Таблиця будується, коли оброблено в BUILD_WORDS_PER_ENTRY разів більше слів,
+ніж їх у словнику - до того дешевше шукати слова напряму (із запам'ятовуванням).
+Для словників, що не є dict (Mapping з диска тощо), таблиця не будується
+взагалі - лише запам'ятовуються знайдені слова.
+"""
+
+import random
+import re
+import sys
+import time
+from collections.abc import Mapping
+from typing import Dict, Iterable, List
+
+from book_editors_suite.utils.helpers import WORD_RE, match_casing
+
+ACUTE = '\u0301'
+# Та сама мова, що й WORD_RE, але серіями літер замість (літера + необов'язковий наголос)+,
+# що вдвічі швидше. Група - щоб split повертав слова на непарних позиціях
+_SEGMENT = r"[^\W\d_]+(?:\u0301[^\W\d_]+)*\u0301?"
+WORD_SPLIT_RE = re.compile(f"({_SEGMENT}(?:'{_SEGMENT})*)", flags=re.UNICODE)
+# Межа пам'яті для запам'ятованих слів поза таблицею
+MEMO_LIMIT = 200000
+# Скільки слів тексту на одне слово словника має бути оброблено до побудови таблиці
+BUILD_WORDS_PER_ENTRY = 4
+# З якого розміру тексту (символів) паралельна обробка (parallel_accents) окупає запуск процесів
+PARALLEL_THRESHOLD_CHARS = 8 * 1024 * 1024
+
+
+def surface_forms(key: str) -> List[str]:
+    """Форми слова, що можуть зустрітися в тексті без змішаного регістру."""
+    forms = [key, key[:1].upper() + key[1:], key.upper()]
+    return [f for i, f in enumerate(forms) if f not in forms[:i] and f.lower() == key]
+
+
+class AccentEngine:
+    """Підготовлений словник наголосів та однопрохідна заміна слів у тексті."""
+
+#-------------------------------------------
+    def __init__(self, accents: Mapping, logger=None):
+        self.accents = accents
+        self.logger = logger
+        # Таблиця форм будується лише для словників у пам'яті (dict або зведений індекс шарів)
+        self.lazy = not isinstance(getattr(accents, 'index', accents), dict)
+        self._surface = {}
+        self._memo = {}
+        self._built = False
+        self._words_seen = 0
+
+#-------------------------------------------
+    def _build(self):
+        """Будує таблицю поверхневих форм для всього словника."""
+        started = time.perf_counter()
+        surface = self._surface
+        for key, value in self.accents.items():
+            if not value or ACUTE in key or key != key.lower():
+                # Такі ключі ніколи не знаходились початковою логікою
+                continue
+            for form in surface_forms(key):
+                surface[form] = match_casing(form, value)
+        self._built = True
+        if self.logger:
+            self.logger.debug(f"AccentEngine: Таблиця форм: {len(surface)} записів для "
+                              f"{len(self.accents)} слів за {time.perf_counter() - started:.2f} с")
+
+#-------------------------------------------
+    def prepare(self, expected_words: int):
+        """
+        Будує таблицю форм наперед, якщо очікуваний обсяг тексту її виправдовує
+        (перед розгалуженням процесів - щоб таблицю успадкували всі, а не будував кожен).
+        """
+        if self.lazy or self._built:
+            return
+        if self._words_seen + expected_words >= len(self.accents) * BUILD_WORDS_PER_ENTRY:
+            self._build()
+
+#-------------------------------------------
+    def _resolve(self, word: str) -> str:
+        """Початкова логіка для слова поза таблицею (з запам'ятовуванням)."""
+        if ACUTE in word:  # Якщо вже є наголос - залишаємо
+            result = word
+        else:
+            value = self.accents.get(word.lower())
+            result = match_casing(word, value) if value else word
+        if len(self._memo) >= MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[word] = result
+        return result
+
+#-------------------------------------------
+    def set_word(self, key: str, value: str):
+        """Додає/змінює слово словника та оновлює таблицю без повної перебудови."""
+        self.accents[key] = value
+        for form in surface_forms(key):
+            self._surface.pop(form, None)
+            if self._built and value and ACUTE not in key:
+                self._surface[form] = match_casing(form, value)
+        self._memo.clear()
+
+#-------------------------------------------
+    def accent_words(self, words: List[str]) -> List[str]:
+        """Замінює список слів (без розділових знаків) на слова з наголосами."""
+        if not self.lazy and not self._built:
+            self._words_seen += len(words)
+            if self._words_seen >= len(self.accents) * BUILD_WORDS_PER_ENTRY:
+                self._build()
+        surface_get = self._surface.get
+        memo_get = self._memo.get
+        resolve = self._resolve
+        return [surface_get(w) or memo_get(w) or resolve(w) for w in words]
+
+#-------------------------------------------
+    def accent_text(self, text: str) -> str:
+        """Додає наголоси до тексту за один прохід."""
+        if not text or not self.accents:
+            return text
+        parts = WORD_SPLIT_RE.split(text)
+        parts[1::2] = self.accent_words(parts[1::2])
+        return "".join(parts)
+
+#-------------------------------------------
+    def accent_paragraphs(self, paragraphs: Iterable[str]) -> List[str]:
+        """
+        Пакетна обробка абзаців.
+        Абзаци без переносів рядка обробляються одним проходом по склеєному тексту.
+        """
+        paragraphs = list(paragraphs)
+        if not paragraphs:
+            return []
+        joined = "\n".join(paragraphs)
+        if joined.count("\n") == len(paragraphs) - 1:
+            return self.accent_text(joined).split("\n")
+        return [self.accent_text(p) for p in paragraphs]
+
+
+def accent_text_legacy(text: str, accents: dict) -> str:
+    """Попередній спосіб (WORD_RE.sub з функцією на кожне слово) - для порівняння."""
+    def replace_with_accent(match):
+        word = match.group(0)
+        if ACUTE in word:
+            return word
+        key = word.replace(ACUTE, '').lower()
+        if key in accents:
+            return match_casing(word, accents[key])
+        return word
+    return WORD_RE.sub(replace_with_accent, text)
+
+
+def synthetic_corpus(size_mb: float = 10.0, dict_size: int = 500000, seed: int = 13):
+    """Синтетичний корпус і словник з псевдоукраїнських слів."""
+    rnd = random.Random(seed)
+    syllables = ["ка", "ро", "ві", "на", "ти", "ли", "ме", "до", "за", "пі", "сь", "ньо",
+                 "гу", "бо", "ше", "чи", "ю", "я", "є", "ї", "ст", "кр", "пр", "дн"]
+    words = set()
+    while len(words) < dict_size:
+        words.add("".join(rnd.choice(syllables) for _ in range(rnd.randint(2, 5))))
+    words = list(words)
+    accents = {}
+    for w in words:
+        vowels = [i for i, ch in enumerate(w) if ch in "аеєиіїоуюя"]
+        i = rnd.choice(vowels) if vowels else len(w) - 1
+        accents[w] = w[:i + 1] + ACUTE + w[i + 1:]
+
+    # Текст: слова зі словника та невідомі, різний регістр і розділові знаки
+    vocabulary = words[:50000] + ["".join(rnd.choice(syllables) for _ in range(3)) for _ in range(20000)]
+    chunks = []
+    size = 0
+    limit = int(size_mb * 1024 * 1024)
+    while size < limit:
+        sentence = [rnd.choice(vocabulary) for _ in range(rnd.randint(5, 15))]
+        sentence[0] = sentence[0].capitalize()
+        if rnd.random() < 0.05:
+            sentence[-1] = sentence[-1].upper()
+        line = " ".join(sentence) + rnd.choice([". ", "! ", "? ", ", — ", ".\n"])
+        chunks.append(line)
+        size += len(line.encode('utf-8'))
+    return "".join(chunks), accents
+
+
+def benchmark(text: str, accents: dict, label: str) -> Dict:
+    """Слова/с для попереднього та нового способу; перевіряє однаковий результат."""
+    words = len(WORD_RE.findall(text))
+
+    started = time.perf_counter()
+    legacy = accent_text_legacy(text, accents)
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    engine = AccentEngine(accents)
+    build_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    result = engine.accent_text(text)
+    engine_seconds = time.perf_counter() - started
+
+    stats = {
+        'words': words,
+        'legacy_wps': round(words / legacy_seconds) if legacy_seconds else 0,
+        'engine_wps': round(words / engine_seconds) if engine_seconds else 0,
+        'build_seconds': round(build_seconds, 3),
+        'identical': result == legacy,
+    }
+    print(f"{label}: {words} слів; WORD_RE.sub: {stats['legacy_wps']} сл/с, "
+          f"AccentEngine: {stats['engine_wps']} сл/с (підготовка словника {stats['build_seconds']} с), "
+          f"результат однаковий: {stats['identical']}")
+    return stats
+
+
+# ========== Бенчмарк ==========
+if __name__ == "__main__":
+    import json
+    text_path = sys.argv[1] if len(sys.argv) > 1 else "доповнення13_у_нас_гості.txt"
+    accents_path = sys.argv[2] if len(sys.argv) > 2 else "accents_files.json"
+    with open(text_path, 'r', encoding='utf-8') as f:
+        book_text = f.read()
+    with open(accents_path, 'r', encoding='utf-8') as f:
+        book_accents = json.load(f)
+    benchmark(book_text, book_accents, text_path)
+
+    corpus, corpus_accents = synthetic_corpus()
+    benchmark(corpus, corpus_accents, "Синтетичний корпус 10 МБ, словник 500k")
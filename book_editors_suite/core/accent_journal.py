@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Журнал змін словника наголосів (append-only).
+
+Кожне збереження слова дописує один рядок JSON у <словник>.journal з fsync,
+тому вартість не залежить від розміру словника, а обрив запису псує хіба що
+останній неповний рядок (він ігнорується при відтворенні).
+При завантаженні журнал відтворюється поверх основного файлу.
+Ущільнення (compaction) атомарно переписує основний файл і прибирає
+з журналу вже враховані записи - у фоні або при закритті редактора.
+
+Перший рядок журналу - заголовок {"base_seq": N}: номер останньої зміни,
+що вже є в основному файлі. Разом з номерами записів це дає монотонну
+версію словника (version), яку можуть використовувати кеші.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+JOURNAL_SUFFIX = ".journal"
+
+
+def journal_path_for(accents_file) -> Path:
+    """Шлях журналу поруч з основним словником: accents_files.json -> accents_files.journal"""
+    return Path(accents_file).with_suffix(JOURNAL_SUFFIX)
+
+
+class AccentJournal:
+    """Журнал змін словника з відтворенням та ущільненням."""
+
+#-------------------------------------------
+    def __init__(self, path, logger=None):
+        self.path = Path(path)
+        self.logger = logger
+        self.base_seq = 0
+        self.seq = 0
+        self.pending = 0
+        self._lock = threading.RLock()
+        self._compacting = None
+        self._valid_size = 0
+
+#-------------------------------------------
+    @property
+    def version(self) -> int:
+        """Номер останньої зміни словника."""
+        return self.seq
+
+#-------------------------------------------
+    def _read_entries(self) -> List[Dict]:
+        """Читає записи журналу; неповний останній рядок (обрив запису) пропускається."""
+        entries = []
+        self._valid_size = 0
+        if not self.path.exists():
+            return entries
+        with self.path.open('rb') as f:
+            for line_no, line in enumerate(f):
+                if not line.endswith(b"\n"):
+                    if self.logger:
+                        self.logger.warning(f"AccentJournal: Пропущено неповний запис у {self.path.name}")
+                    break
+                self._valid_size += len(line)
+                try:
+                    record = json.loads(line.decode('utf-8'))
+                except (ValueError, UnicodeDecodeError):
+                    if self.logger:
+                        self.logger.warning(f"AccentJournal: Пошкоджений рядок {line_no + 1} у {self.path.name}")
+                    continue
+                if 'base_seq' in record:
+                    self.base_seq = max(self.base_seq, int(record['base_seq']))
+                else:
+                    entries.append(record)
+        return entries
+
+#-------------------------------------------
+    def replay(self, accents) -> int:
+        """Застосовує журнал до завантаженого словника. Повертає кількість застосованих змін."""
+        with self._lock:
+            entries = self._read_entries()
+            if self.path.exists() and self.path.stat().st_size > self._valid_size:
+                # Обрізаємо неповний хвіст, щоб наступний запис почався з нового рядка
+                os.truncate(self.path, self._valid_size)
+            self.seq = self.base_seq
+            applied = 0
+            for record in entries:
+                seq = int(record.get('seq', 0))
+                if seq <= self.base_seq:
+                    continue
+                if record.get('op') == 'del':
+                    accents.pop(record['key'], None)
+                else:
+                    accents[record['key']] = record['value']
+                self.seq = max(self.seq, seq)
+                applied += 1
+            self.pending = applied
+        if applied and self.logger:
+            self.logger.info(f"AccentJournal: Відтворено {applied} змін з {self.path.name}")
+        return applied
+
+#-------------------------------------------
+    def changes_since(self, seq: int) -> Optional[Set[str]]:
+        """
+        Слова, змінені після версії seq, або None, якщо ці зміни вже ущільнено
+        в основний файл і їх не можна відновити.
+        """
+        with self._lock:
+            entries = self._read_entries()
+            if seq < self.base_seq or seq > self.seq:
+                return None
+            return {r['key'] for r in entries if int(r.get('seq', 0)) > seq}
+
+#-------------------------------------------
+    def append(self, key: str, value: Optional[str] = None, op: str = 'set') -> int:
+        """Дописує зміну (set або del) з fsync. Повертає її номер."""
+        with self._lock:
+            self.seq += 1
+            record = {'seq': self.seq, 'op': op, 'key': key}
+            if op == 'set':
+                record['value'] = value
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            with self.path.open('a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.pending += 1
+            return self.seq
+
+#-------------------------------------------
+    def _truncate_through(self, seq: int):
+        """Атомарно лишає в журналі тільки записи новіші за seq."""
+        with self._lock:
+            self.base_seq = seq
+            newer = [r for r in self._read_entries() if int(r.get('seq', 0)) > seq]
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with tmp_path.open('w', encoding='utf-8') as f:
+                f.write(json.dumps({'base_seq': seq}) + "\n")
+                for record in newer:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.pending = len(newer)
+
+#-------------------------------------------
+    def compact(self, snapshot, save_func: Callable, seq: Optional[int] = None) -> bool:
+        """
+        Записує знімок словника у основний файл (save_func має писати атомарно)
+        та прибирає з журналу враховані зміни.
+        Після обриву між цими кроками журнал просто відтвориться повторно.
+        """
+        seq = self.seq if seq is None else seq
+        if not save_func(snapshot):
+            return False
+        self._truncate_through(seq)
+        if self.logger:
+            self.logger.info(f"AccentJournal: Словник ущільнено (версія {seq})")
+        return True
+
+#-------------------------------------------
+    def compact_in_background(self, snapshot, save_func: Callable) -> Optional[threading.Thread]:
+        """Ущільнення у фоновому потоці; знімок має бути незалежною копією словника."""
+        if self._compacting is not None and self._compacting.is_alive():
+            return None
+        seq = self.seq
+
+        def run():
+            try:
+                self.compact(snapshot, save_func, seq)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"AccentJournal: Помилка фонового ущільнення: {e}")
+
+        self._compacting = threading.Thread(target=run, name="accent-journal-compact", daemon=True)
+        self._compacting.start()
+        return self._compacting
+
+#-------------------------------------------
+    def wait(self):
+        """Чекає завершення фонового ущільнення."""
+        if self._compacting is not None:
+            self._compacting.join()
+            self._compacting = None
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Потокова конвертація позначок наголосу в текстових файлах.
+
+Режими:
+    acute-to-plus          а\\u0301 -> а+   (знак наголосу -> '+' після голосної)
+    plus-to-acute          а+ -> а\\u0301
+    acute-to-plus-before   а\\u0301 -> +а   ('+' перед голосною)
+    plus-before-to-acute   +а -> а\\u0301
+
+Файл читається частинами: кожна частина перетворюється кількома str.replace
+(по одному на голосну), тому час лінійний. Якщо частина закінчується символом,
+з якого може початися пара (голосна або '+'), він переноситься в наступну
+частину - наголос, відірваний від голосної межею частин, не губиться.
+Наголос не після голосної та '+' поза парою лишаються як є.
+
+Кілька файлів обробляються паралельно в пулі процесів.
+
+    python accent_marks.py acute-to-plus книга.txt [ще.txt ...] [-o тека]
+    python accent_marks.py bench [МБ]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+ACCENT_CHAR = "\u0301"
+PLUS_SIGN = "+"
+UKR_VOWELS = "аеєиіїоуюяАЕЄИІЇОУЮЯ"
+CHUNK_CHARS = 1 << 22
+
+MODES = {
+    'acute-to-plus': [(v + ACCENT_CHAR, v + PLUS_SIGN) for v in UKR_VOWELS],
+    'plus-to-acute': [(v + PLUS_SIGN, v + ACCENT_CHAR) for v in UKR_VOWELS],
+    'acute-to-plus-before': [(v + ACCENT_CHAR, PLUS_SIGN + v) for v in UKR_VOWELS],
+    'plus-before-to-acute': [(PLUS_SIGN + v, v + ACCENT_CHAR) for v in UKR_VOWELS],
+}
+
+# Суфікси вихідних файлів за замовчуванням
+MODE_SUFFIXES = {
+    'acute-to-plus': "_plus",
+    'plus-to-acute': "_u0301",
+    'acute-to-plus-before': "_plus_before",
+    'plus-before-to-acute': "_u0301",
+}
+
+
+def _pairs(mode: str) -> List[Tuple[str, str]]:
+    try:
+        return MODES[mode]
+    except KeyError:
+        raise ValueError(f"Невідомий режим: {mode} (доступні: {', '.join(MODES)})")
+
+
+def convert_text(text: str, mode: str = 'acute-to-plus') -> str:
+    """Перетворює текст цілком."""
+    for source, target in _pairs(mode):
+        text = text.replace(source, target)
+    return text
+
+
+def iter_convert(chunks: Iterable[str], mode: str = 'acute-to-plus') -> Iterator[str]:
+    """
+    Перетворює послідовність частин тексту. Результат збігається з
+    convert_text над з'єднаним текстом незалежно від місць розрізу.
+    """
+    pairs = _pairs(mode)
+    starters = {source[0] for source, _ in pairs}
+    carry = ""
+    for chunk in chunks:
+        chunk = carry + chunk
+        if chunk and chunk[-1] in starters:
+            chunk, carry = chunk[:-1], chunk[-1]
+        else:
+            carry = ""
+        for source, target in pairs:
+            chunk = chunk.replace(source, target)
+        if chunk:
+            yield chunk
+    if carry:
+        yield carry
+
+
+def read_chunks(f, chunk_chars: int = CHUNK_CHARS) -> Iterator[str]:
+    while True:
+        chunk = f.read(chunk_chars)
+        if not chunk:
+            return
+        yield chunk
+
+
+def convert_stream(src, dst, mode: str = 'acute-to-plus', chunk_chars: int = CHUNK_CHARS) -> int:
+    """Перетворює текстовий потік у потік. Повертає кількість записаних символів."""
+    written = 0
+    for chunk in iter_convert(read_chunks(src, chunk_chars), mode):
+        dst.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def output_path_for(input_path, mode: str, output_dir=None) -> Path:
+    """книга.txt -> [тека/]книга_plus.txt"""
+    input_path = Path(input_path)
+    folder = Path(output_dir) if output_dir else input_path.parent
+    return folder / f"{input_path.stem}{MODE_SUFFIXES[mode]}{input_path.suffix}"
+
+
+def convert_file(input_path, output_path=None, mode: str = 'acute-to-plus',
+                 chunk_chars: int = CHUNK_CHARS) -> Dict:
+    """
+    Перетворює файл; вихідний файл записується атомарно.
+    Повертає {'input', 'output', 'chars', 'bytes', 'seconds'}.
+    """
+    started = time.perf_counter()
+    _pairs(mode)
+    input_path = Path(input_path)
+    output_path = Path(output_path) if output_path else output_path_for(input_path, mode)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    # newline='' - переноси рядків лишаються як у вхідному файлі
+    with open(input_path, "r", encoding="utf-8", newline="") as src, \
+            open(tmp_path, "w", encoding="utf-8", newline="") as dst:
+        chars = convert_stream(src, dst, mode, chunk_chars)
+    os.replace(tmp_path, output_path)
+    return {
+        'input': str(input_path),
+        'output': str(output_path),
+        'chars': chars,
+        'bytes': input_path.stat().st_size,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def _convert_job(args) -> Dict:
+    """Обробка одного файлу в пулі процесів; помилка повертається, а не піднімається."""
+    input_path, output_path, mode = args
+    try:
+        return convert_file(input_path, output_path, mode)
+    except Exception as e:
+        return {'input': str(input_path), 'output': None, 'error': str(e)}
+
+
+def convert_files(paths: Iterable, mode: str = 'acute-to-plus', output_dir=None,
+                  workers: Optional[int] = None) -> List[Dict]:
+    """Перетворює кілька файлів паралельно. Повертає статистику по кожному файлу."""
+    _pairs(mode)
+    jobs = [(str(p), str(output_path_for(p, mode, output_dir)), mode) for p in paths]
+    workers = min(workers or os.cpu_count() or 1, len(jobs)) or 1
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(_convert_job, jobs))
+        except (OSError, ImportError, NotImplementedError):
+            pass
+    return [_convert_job(job) for job in jobs]
+
+
+def benchmark(size_mb: int = 100, mode: str = 'acute-to-plus', folder=None) -> Dict:
+    """Пропускна здатність на згенерованому файлі розміром size_mb (МБ UTF-8)."""
+    import tempfile
+    folder = Path(folder or tempfile.mkdtemp())
+    sample = ("Вона́ ска́зала: «Ходи́ сюди́, до ха́ти!» Він мовча́в, а ві́тер "
+              "гуля́в по по́лю.\n")
+    sample_bytes = len(sample.encode("utf-8"))
+    input_path = folder / "bench_u0301.txt"
+    with open(input_path, "w", encoding="utf-8", newline="") as f:
+        block = sample * 1000
+        for _ in range(size_mb * (1 << 20) // (sample_bytes * 1000) + 1):
+            f.write(block)
+    try:
+        stats = convert_file(input_path, folder / "bench_out.txt", mode)
+        stats['mb_per_s'] = stats['bytes'] / (1 << 20) / stats['seconds']
+        return stats
+    finally:
+        for path in (input_path, folder / "bench_out.txt"):
+            if path.exists():
+                path.unlink()
+
+
+# ========== Конвертація з командного рядка ==========
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "bench":
+        result = benchmark(int(args[1]) if len(args) > 1 else 100)
+        print(f"{result['bytes'] / (1 << 20):.0f} МБ за {result['seconds']:.2f} с "
+              f"({result['mb_per_s']:.1f} МБ/с)")
+        sys.exit(0)
+
+    if len(args) < 2 or args[0] not in MODES:
+        print(__doc__)
+        sys.exit(1)
+
+    out_dir = None
+    if "-o" in args:
+        pos = args.index("-o")
+        out_dir = args[pos + 1]
+        args = args[:pos] + args[pos + 2:]
+
+    for result in convert_files(args[1:], args[0], out_dir):
+        if result.get('error'):
+            print(f"Помилка: {result['input']}: {result['error']}")
+        else:
+            print(f"{result['input']} -> {result['output']} "
+                  f"({result['bytes'] / (1 << 20):.1f} МБ за {result['seconds']:.2f} с)")
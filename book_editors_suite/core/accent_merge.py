@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+Потокове злиття кількох словників наголосів (k-way merge).
+
+Словники (JSON або бінарні .acdb) читаються як відсортовані потоки пар
+(слово, наголос) і зливаються через heapq.merge - у пам'яті лише по одному
+запису з кожного словника. Невідсортований JSON спершу сортується зовнішнім
+сортуванням (частинами по RUN_ENTRIES слів у тимчасові файли).
+
+Якщо одне слово має в словниках різні наголоси - це розбіжність. Для кожного
+варіанта рахується, скільки разів він трапляється у вказаних текстах книг
+(слова з \\u0301), вибір варіанта задає --prefer:
+    last   - з останнього словника у переліку (як dict.update, типово)
+    first  - з першого словника
+    text   - найчастіший у текстах (за рівності - з останнього словника)
+
+    python accent_merge.py словник1.json словник2.acdb ... -o злитий.json|.acdb
+        [-t текст.txt ...] [--prefer last|first|text] [-r розбіжності.tsv]
+    python accent_merge.py sort accents_files.json [відсортований.json]
+"""
+
+import heapq
+import json
+import os
+import pickle
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from book_editors_suite.utils.helpers import WORD_RE
+from book_editors_suite.core.accent_dict_binary import BINARY_SUFFIX, BinaryAccentDict, write_binary_sorted
+
+ACUTE = '\u0301'
+PREFER_MODES = ("last", "first", "text")
+CONFLICTS_HEADER = "слово\tнаголос\tу текстах\tсловники\tвибрано"
+
+# Розмір частини зовнішнього сортування та блоку читання JSON
+RUN_ENTRIES = 200_000
+RUN_BLOCK = 4096
+READ_CHARS = 1 << 16
+
+# Пара "слово": "наголос" з роздільником після неї (рядки JSON, екрановані \\)
+_STRING = r'"((?:[^"\\]|\\.)*)"'
+_PAIR_RE = re.compile(r'\s*' + _STRING + r'\s*:\s*' + _STRING + r'\s*([,}])')
+_OPEN_RE = re.compile(r'\s*\{\s*(\})?')
+
+
+def _unescape(raw: str) -> str:
+    return json.loads('"' + raw + '"') if '\\' in raw else raw
+
+
+def iter_json_items(path, read_chars: int = READ_CHARS) -> Iterator[Tuple[str, str]]:
+    """
+    Пари (слово, наголос) з JSON-об'єкта {"слово": "наголос", ...} без
+    завантаження файлу: у буфері лише непрочитаний залишок та поточний запис.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = f.read(read_chars)
+        while buffer.isspace():
+            buffer += f.read(read_chars)
+        start = _OPEN_RE.match(buffer)
+        if start is None:
+            raise ValueError(f"{path}: не словник JSON")
+        pos = start.end()
+        first = True
+        while True:
+            match = _PAIR_RE.match(buffer, pos)
+            if match is None:
+                data = f.read(read_chars)
+                if not data:
+                    if first and (start.group(1) or buffer[pos:].strip() == "}"):
+                        return
+                    raise ValueError(f"{path}: помилка формату біля: {buffer[pos:pos + 40]!r}")
+                buffer = buffer[pos:] + data
+                pos = 0
+                continue
+            first = False
+            yield _unescape(match.group(1)), _unescape(match.group(2))
+            if match.group(3) == "}":
+                return
+            pos = match.end()
+
+
+def iter_source(path) -> Iterator[Tuple[str, str]]:
+    """Пари словника у порядку файлу (.acdb - завжди відсортовано)."""
+    if Path(path).suffix == BINARY_SUFFIX:
+        with BinaryAccentDict(path) as accents:
+            yield from accents.iter_items()
+    else:
+        yield from iter_json_items(path)
+
+
+def is_sorted(path) -> bool:
+    """Чи йдуть слова словника строго за зростанням (один прохід файлу)."""
+    if Path(path).suffix == BINARY_SUFFIX:
+        return True
+    previous = None
+    for key, _ in iter_json_items(path):
+        if previous is not None and key <= previous:
+            return False
+        previous = key
+    return True
+
+
+def _write_run(entries: List[Tuple[str, str]], work_dir) -> Path:
+    """Відсортована частина у тимчасовий файл блоками по RUN_BLOCK пар (pickle)."""
+    entries.sort()
+    fd, name = tempfile.mkstemp(suffix=".run", dir=work_dir)
+    with os.fdopen(fd, "wb") as f:
+        for start in range(0, len(entries), RUN_BLOCK):
+            pickle.dump(entries[start:start + RUN_BLOCK], f, pickle.HIGHEST_PROTOCOL)
+    return Path(name)
+
+
+def _iter_run(path) -> Iterator[Tuple[str, str]]:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            yield from block
+
+
+def external_sort(items: Iterable[Tuple[str, str]], work_dir,
+                  run_entries: int = RUN_ENTRIES) -> Iterator[Tuple[str, str]]:
+    """Сортує пари частинами по run_entries у тимчасові файли та зливає їх."""
+    runs = []
+    entries = []
+    for item in items:
+        entries.append(item)
+        if len(entries) >= run_entries:
+            runs.append(_write_run(entries, work_dir))
+            entries = []
+    if not runs:
+        yield from sorted(entries)
+        return
+    if entries:
+        runs.append(_write_run(entries, work_dir))
+    yield from heapq.merge(*(_iter_run(run) for run in runs))
+
+
+def sorted_source(path, work_dir, logger=None) -> Iterator[Tuple[str, str]]:
+    """Відсортований потік пар словника; невідсортований JSON сортується зовнішньо."""
+    if is_sorted(path):
+        return iter_source(path)
+    if logger:
+        logger.info(f"accent_merge: Словник не відсортовано, зовнішнє сортування: {path}")
+    return external_sort(iter_source(path), work_dir)
+
+
+def write_json_sorted(items: Iterable[Tuple[str, str]], path) -> int:
+    """
+    Потоково та атомарно записує пари у JSON (той самий вигляд, що
+    json.dump(..., ensure_ascii=False, indent=2) у FileManager). Повертає кількість слів.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for key, value in items:
+            f.write(("\n" if not count else ",\n") + "  " + json.dumps(key, ensure_ascii=False)
+                    + ": " + json.dumps(value, ensure_ascii=False))
+            count += 1
+        f.write("\n}" if count else "}")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+def write_accents_sorted(items: Iterable[Tuple[str, str]], path) -> int:
+    """Відсортовані пари у файл за розширенням: .acdb або JSON."""
+    if Path(path).suffix == BINARY_SUFFIX:
+        return write_binary_sorted(items, path)
+    return write_json_sorted(items, path)
+
+
+def sort_accents_file(path, output_path=None, logger=None) -> int:
+    """Сортує словник у файлі (або пише відсортований в output_path) з обмеженою пам'яттю."""
+    output_path = Path(output_path or path)
+    with tempfile.TemporaryDirectory(dir=output_path.parent) as work:
+        return write_accents_sorted(sorted_source(path, work, logger), output_path)
+
+
+def count_accented_forms(texts: Iterable) -> Counter:
+    """Скільки разів кожна наголошена форма (нижній регістр) трапляється в текстах."""
+    counts = Counter()
+    for text_path in texts:
+        with open(text_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if ACUTE in line:
+                    counts.update(w.lower() for w in WORD_RE.findall(line) if ACUTE in w)
+    return counts
+
+
+def _tagged(items: Iterable[Tuple[str, str]], index: int) -> Iterator[Tuple[str, int, str]]:
+    for key, value in items:
+        yield key, index, value
+
+
+def _choose(variants: Dict[str, List[int]], prefer: str, counts: Counter) -> str:
+    """Варіант наголосу для розбіжності; variants: {наголос: [номери словників]}."""
+    if prefer == "first":
+        return min(variants, key=lambda v: min(variants[v]))
+    if prefer == "text":
+        return max(variants, key=lambda v: (counts[v.lower()], max(variants[v])))
+    return max(variants, key=lambda v: max(variants[v]))
+
+
+def merge_dictionaries(paths: List, output_path, texts: Iterable = (), prefer: str = "last",
+                       report_path=None, logger=None) -> Dict:
+    """
+    Зливає словники у output_path (.acdb або JSON), розбіжності - у TSV report_path.
+    Повертає {'sources', 'words', 'conflicts', 'report', 'seconds'}.
+    """
+    if prefer not in PREFER_MODES:
+        raise ValueError(f"Невідомий спосіб вибору: {prefer}")
+    started = time.perf_counter()
+    paths = [Path(p) for p in paths]
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    counts = count_accented_forms(texts)
+    stats = {'sources': len(paths), 'words': 0, 'conflicts': 0,
+             'report': str(report_path) if report_path else None}
+
+    report = None
+    if report_path:
+        Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+        report = open(report_path, "w", encoding="utf-8")
+        report.write(CONFLICTS_HEADER + "\n")
+
+    def merged(work) -> Iterator[Tuple[str, str]]:
+        streams = [_tagged(sorted_source(path, work, logger), index) for index, path in enumerate(paths)]
+        current, variants = None, {}
+        for key, index, value in heapq.merge(*streams):
+            if key != current:
+                if current is not None:
+                    yield current, resolve(current, variants)
+                current, variants = key, {}
+            variants.setdefault(value, []).append(index)
+        if current is not None:
+            yield current, resolve(current, variants)
+
+    def resolve(key: str, variants: Dict[str, List[int]]) -> str:
+        if len(variants) == 1:
+            return next(iter(variants))
+        chosen = _choose(variants, prefer, counts)
+        stats['conflicts'] += 1
+        if report is not None:
+            for value, sources in sorted(variants.items(), key=lambda item: -counts[item[0].lower()]):
+                names = ", ".join(paths[i].name for i in sources)
+                mark = "так" if value == chosen else ""
+                report.write(f"{key}\t{value}\t{counts[value.lower()]}\t{names}\t{mark}\n")
+        return chosen
+
+    try:
+        with tempfile.TemporaryDirectory(dir=output_path.parent) as work:
+            stats['words'] = write_accents_sorted(merged(work), output_path)
+    finally:
+        if report is not None:
+            report.close()
+    stats['seconds'] = time.perf_counter() - started
+    if logger:
+        logger.info(f"accent_merge: Злито {stats['sources']} словників: {stats['words']} слів, "
+                    f"розбіжностей {stats['conflicts']} за {stats['seconds']:.2f} с -> {output_path}")
+    return stats
+
+
+# ========== Злиття з командного рядка ==========
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) >= 2 and args[0] == "sort":
+        written = sort_accents_file(args[1], args[2] if len(args) > 2 else None)
+        print(f"Відсортовано {written} слів: {args[2] if len(args) > 2 else args[1]}")
+        sys.exit(0)
+
+    options = {}
+    texts = []
+    while "-t" in args:
+        pos = args.index("-t")
+        texts.append(args[pos + 1])
+        args = args[:pos] + args[pos + 2:]
+    for flag in ("-o", "-r", "--prefer"):
+        if flag in args:
+            pos = args.index(flag)
+            options[flag] = args[pos + 1]
+            args = args[:pos] + args[pos + 2:]
+
+    if not args or "-o" not in options:
+        print(__doc__)
+        sys.exit(1)
+
+    try:
+        result = merge_dictionaries(args, options["-o"], texts, options.get("--prefer", "last"),
+                                    options.get("-r"))
+    except ValueError as e:
+        print(f"Помилка: {e}")
+        sys.exit(1)
+    print(f"Словників: {result['sources']}, слів: {result['words']}, "
+          f"розбіжностей: {result['conflicts']}, {result['seconds']:.2f} с -> {options['-o']}")
+    if result['report']:
+        print(f"Розбіжності: {result['report']}")
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Кеш тексту з наголосами між відкриттями редактора.
+
+Ключ кешу - хеш вхідного тексту та версія словника (журнал змін FileManager).
+Якщо текст і словник не змінились, готовий текст береться з кешу цілком.
+Інакше абзаци зіставляються за хешем: незмінені беруться з кешу, а заново
+обробляються тільки нові/відредаговані абзаци та абзаци зі словами,
+доданими до словника після збереження кешу (їх дає журнал змін).
+Якщо журнал уже ущільнено і змінені слова невідомі - обробляється все.
+
+Виправлення окремих абзаців (після зміни словника в редакторі) дописуються
+у файл латок поруч з кешем - без перезапису всього кешу. Латки застосовуються
+при читанні та вливаються в кеш при наступному збереженні.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+from book_editors_suite.utils.helpers import WORD_RE
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def paragraph_hash(paragraph: str) -> str:
+    return hashlib.blake2b(paragraph.encode('utf-8'), digest_size=10).hexdigest()
+
+
+class AccentSnapshot:
+    """Збережений на диску результат розстановки наголосів по абзацах."""
+
+#-------------------------------------------
+    def __init__(self, cache_path, logger=None):
+        self.cache_path = Path(cache_path)
+        self.patch_path = self.cache_path.with_name(self.cache_path.name + ".patch")
+        self.logger = logger
+        self.stats = {}
+
+#-------------------------------------------
+    def _load(self) -> Dict:
+        if not self.cache_path.exists():
+            return {}
+        try:
+            with self.cache_path.open('r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"AccentSnapshot: Кеш пошкоджено, буде створено заново: {e}")
+            return {}
+        if self.patch_path.exists():
+            self._apply_patches(cache)
+        return cache
+
+#-------------------------------------------
+    def _apply_patches(self, cache: Dict):
+        """Застосовує латки абзаців; неповний останній рядок (обрив запису) ігнорується."""
+        patched = {}
+        with self.patch_path.open('r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if 'dict_version' in record:
+                    cache['dict_version'] = record['dict_version']
+                    cache['dict_size'] = record['dict_size']
+                else:
+                    patched[record['h']] = record['a']
+        cache['paragraphs'] = [[h, patched.get(h, accented)] for h, accented in cache.get('paragraphs', [])]
+        cache['patched'] = True
+
+#-------------------------------------------
+    def _save(self, data: Dict):
+        """Атомарний запис кешу."""
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+            with tmp_path.open('w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+            if self.patch_path.exists():
+                self.patch_path.unlink()
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"AccentSnapshot: Не вдалося зберегти кеш: {e}")
+
+#-------------------------------------------
+    @staticmethod
+    def _touches(paragraph: str, words: Set[str]) -> bool:
+        """Чи містить абзац хоч одне зі слів (нижній регістр)."""
+        lower = paragraph.lower()
+        # Швидка перевірка підрядком, розбір на слова - тільки для підозрілих абзаців
+        if not any(w in lower for w in words):
+            return False
+        return any(w in words for w in WORD_RE.findall(lower))
+
+#-------------------------------------------
+    def plan(self, raw_text: str, accents, dict_version: int = 0,
+             changes_since: Callable[[int], Optional[Set[str]]] = None) -> Dict:
+        """
+        Зіставляє текст з кешем, нічого не обробляючи.
+        Повертає план: {'paragraphs': сирі абзаци, 'result': абзац з наголосами або None,
+        'todo': індекси абзаців для обробки, ...}. Після заповнення result - store(plan).
+        changes_since(version) - слова, змінені в словнику після version, або None, якщо невідомо.
+        """
+        started = time.perf_counter()
+        full_hash = text_hash(raw_text)
+        cache = self._load()
+        same_dict = cache.get('dict_version') == dict_version and cache.get('dict_size') == len(accents)
+        plan = {
+            'text_hash': full_hash,
+            'dict_version': dict_version,
+            'dict_size': len(accents),
+            'paragraphs': raw_text.split("\n"),
+            'started': started,
+        }
+
+        if cache.get('text_hash') == full_hash and same_dict:
+            plan['hashes'] = [h for h, _ in cache.get('paragraphs', [])]
+            plan['result'] = [accented for _, accented in cache.get('paragraphs', [])]
+            plan['todo'] = []
+            plan['from_cache'] = not cache.get('patched')
+            return plan
+
+        # Які слова словника змінились після збереження кешу
+        stale_words = set()
+        if not cache:
+            stale_words = None
+        elif not same_dict:
+            # Порожній набір при зміненому словнику - зміни поза журналом (редагування файлу)
+            changed = changes_since(cache.get('dict_version', 0)) if changes_since else None
+            stale_words = changed or None
+
+        cached = {} if stale_words is None else dict(cache.get('paragraphs', []))
+        hashes = [paragraph_hash(p) for p in plan['paragraphs']]
+        result = [None] * len(hashes)
+        todo = []
+        for i, (paragraph, h) in enumerate(zip(plan['paragraphs'], hashes)):
+            accented = cached.get(h)
+            if accented is not None and not (stale_words and self._touches(paragraph, stale_words)):
+                result[i] = accented
+            else:
+                todo.append(i)
+        plan.update({'hashes': hashes, 'result': result, 'todo': todo, 'from_cache': False})
+        return plan
+
+#-------------------------------------------
+    def store(self, plan: Dict):
+        """Зберігає заповнений план у кеш (якщо щось оброблялось) та рахує статистику."""
+        if not plan['from_cache']:
+            self._save({
+                'text_hash': plan['text_hash'],
+                'dict_version': plan['dict_version'],
+                'dict_size': plan['dict_size'],
+                'paragraphs': [[h, accented] for h, accented in zip(plan['hashes'], plan['result'])],
+            })
+        self.stats = {
+            'reused': len(plan['result']) - len(plan['todo']),
+            'processed': len(plan['todo']),
+            'seconds': time.perf_counter() - plan['started'],
+        }
+        if self.logger:
+            self.logger.info(f"AccentSnapshot: Абзаців з кешу: {self.stats['reused']}, "
+                             f"оброблено: {self.stats['processed']} за {self.stats['seconds']:.2f} с")
+
+#-------------------------------------------
+    def patch(self, plan: Dict, paragraph_ids, dict_version: int, dict_size: int):
+        """
+        Дописує виправлені абзаци плану (plan['result'] уже оновлено) у файл латок
+        та нову версію словника, з якою вони узгоджені.
+        """
+        plan['dict_version'] = dict_version
+        plan['dict_size'] = dict_size
+        try:
+            with self.patch_path.open('a', encoding='utf-8') as f:
+                for i in paragraph_ids:
+                    f.write(json.dumps({'h': plan['hashes'][i], 'a': plan['result'][i]}, ensure_ascii=False) + "\n")
+                f.write(json.dumps({'dict_version': dict_version, 'dict_size': dict_size}) + "\n")
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"AccentSnapshot: Не вдалося записати латку кешу: {e}")
+
+#-------------------------------------------
+    def accent_paragraphs(self, raw_text: str, accents, accent_func: Callable[[List[str]], List[str]],
+                          dict_version: int = 0,
+                          changes_since: Callable[[int], Optional[Set[str]]] = None) -> List[str]:
+        """
+        Повертає абзаци тексту з наголосами, обробляючи тільки те, чого немає в кеші.
+        accent_func - пакетна обробка списку абзаців (TextProcessor.add_accents_to_paragraphs).
+        """
+        plan = self.plan(raw_text, accents, dict_version, changes_since)
+        todo = plan['todo']
+        if todo:
+            raw = plan['paragraphs']
+            for i, accented in zip(todo, accent_func([raw[i] for i in todo])):
+                plan['result'][i] = accented
+        self.store(plan)
+        return plan['result']
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Пропозиції наголосу для невідомих форм слова за наявним словником.
+
+Два відсортовані масиви ключів словника:
+    прямий     - для пошуку форм з найдовшою спільною основою
+                 (автобат -> автобату, автобаті: наголос у межах основи переноситься)
+    обернений  - суфіксний індекс (обернені слова у відсортованому порядку - це
+                 листя суфіксного дерева): слова з найдовшим спільним закінченням,
+                 наголос переноситься за номером голосної з кінця.
+
+Найдовший збіг шукається двійковим пошуком (сусіди точки вставки мають
+найдовший спільний префікс), тому пропозиції для всіх невідомих слів книги
+рахуються одним пакетом за секунди. Впевненість (0..1) враховує довжину збігу
+та згоду між кандидатами; збіг основи завжди вагоміший за збіг закінчення.
+
+    python accent_suggest.py accents_files.json слово [слово ...]
+    python accent_suggest.py accents_files.json --check     (перевірка "виключи одне")
+"""
+
+import sys
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ACUTE = '\u0301'
+UKR_VOWELS = "аеєиіїоуюя"
+
+# Мінімальна спільна основа (символів) і частка слова, яку вона має покривати
+MIN_STEM = 4
+MIN_STEM_SHARE = 0.6
+# Мінімальне спільне закінчення для пропозиції за аналогією
+MIN_SUFFIX = 3
+# Скільки сусідніх кандидатів переглядати в кожен бік
+MAX_CANDIDATES = 24
+
+
+def stress_index(value: str) -> int:
+    """Індекс наголошеної літери в слові без наголосу (-1, якщо наголосу немає)."""
+    pos = value.find(ACUTE)
+    return pos - 1 if pos > 0 else -1
+
+
+def vowel_positions(word: str) -> List[int]:
+    return [i for i, ch in enumerate(word) if ch in UKR_VOWELS]
+
+
+def common_prefix(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def place_accent(word: str, index: int) -> str:
+    return word[:index + 1] + ACUTE + word[index + 1:]
+
+
+class AccentSuggester:
+    """Індекс основ і закінчень словника та пропозиції наголосу для невідомих слів."""
+
+#-------------------------------------------
+    def __init__(self, accents, logger=None):
+        self.logger = logger
+        started = time.perf_counter()
+        items = accents.iter_items() if hasattr(accents, 'iter_items') else accents.items()
+        stresses = {}
+        for key, value in items:
+            if not value or ACUTE in key or key != key.lower():
+                continue
+            pos = stress_index(value)
+            if pos >= 0 and pos < len(key) and key[pos] in UKR_VOWELS:
+                stresses[key] = pos
+        self._keys = sorted(stresses)
+        self._stress = [stresses[k] for k in self._keys]
+        # Обернений індекс: (обернене слово, наголос з кінця в голосних)
+        reversed_entries = []
+        for key, pos in stresses.items():
+            from_end = sum(1 for ch in key[pos + 1:] if ch in UKR_VOWELS)
+            reversed_entries.append((key[::-1], from_end))
+        reversed_entries.sort()
+        self._rkeys = [r for r, _ in reversed_entries]
+        self._rstress = [n for _, n in reversed_entries]
+        if self.logger:
+            self.logger.debug(f"AccentSuggester: Індекс для {len(self._keys)} слів "
+                              f"за {time.perf_counter() - started:.2f} с")
+
+#-------------------------------------------
+    @staticmethod
+    def _neighbours(keys: List[str], word: str) -> Tuple[int, List[int]]:
+        """Довжина найдовшого спільного префікса з ключами та індекси ключів з таким префіксом."""
+        pos = bisect_left(keys, word)
+        best = 0
+        for i in (pos - 1, pos):
+            if 0 <= i < len(keys):
+                best = max(best, common_prefix(keys[i], word))
+        if not best:
+            return 0, []
+        prefix = word[:best]
+        found = []
+        i = pos - 1
+        while i >= 0 and len(found) < MAX_CANDIDATES and keys[i].startswith(prefix):
+            found.append(i)
+            i -= 1
+        i = pos
+        while i < len(keys) and len(found) < 2 * MAX_CANDIDATES and keys[i].startswith(prefix):
+            found.append(i)
+            i += 1
+        return best, found
+
+#-------------------------------------------
+    def _by_stem(self, word: str) -> Optional[Tuple[str, float, str]]:
+        stem, found = self._neighbours(self._keys, word)
+        if stem < MIN_STEM or stem < MIN_STEM_SHARE * len(word):
+            return None
+        votes = Counter(self._stress[i] for i in found if self._stress[i] < stem)
+        if not votes:
+            return None
+        pos, agree = votes.most_common(1)[0]
+        confidence = agree / len(found) * (0.6 + 0.4 * stem / len(word))
+        return place_accent(word, pos), round(confidence, 2), self._keys[found[0]]
+
+#-------------------------------------------
+    def _by_suffix(self, word: str, vowels: List[int]) -> Optional[Tuple[str, float, str]]:
+        suffix, found = self._neighbours(self._rkeys, word[::-1])
+        if suffix < MIN_SUFFIX:
+            return None
+        votes = Counter(self._rstress[i] for i in found if self._rstress[i] < len(vowels))
+        if not votes:
+            return None
+        from_end, agree = votes.most_common(1)[0]
+        confidence = agree / len(found) * 0.8 * min(1.0, suffix / 6)
+        return place_accent(word, vowels[-1 - from_end]), round(confidence, 2), self._rkeys[found[0]][::-1]
+
+#-------------------------------------------
+    def suggest(self, word: str) -> Optional[Dict]:
+        """
+        Пропозиція для слова (ключ словника - нижній регістр, без наголосу):
+        {'word', 'suggestion', 'confidence', 'source': 'stem'|'suffix', 'like': схоже відоме слово}
+        або None для односкладових слів і слів без схожих.
+        """
+        vowels = vowel_positions(word)
+        if len(vowels) < 2 or ACUTE in word:
+            return None
+        source, result = 'stem', self._by_stem(word)
+        if result is None:
+            source, result = 'suffix', self._by_suffix(word, vowels)
+        if result is None:
+            return None
+        suggestion, confidence, like = result
+        return {'word': word, 'suggestion': suggestion, 'confidence': confidence,
+                'source': source, 'like': like}
+
+#-------------------------------------------
+    def suggest_many(self, words: Iterable[str], min_confidence: float = 0.0) -> Dict[str, Dict]:
+        """Пропозиції для багатьох слів одним пакетом: {слово: пропозиція}."""
+        started = time.perf_counter()
+        result = {}
+        for word in words:
+            suggestion = self.suggest(word)
+            if suggestion is not None and suggestion['confidence'] >= min_confidence:
+                result[word] = suggestion
+        if self.logger:
+            self.logger.info(f"AccentSuggester: Пропозицій: {len(result)} "
+                             f"за {time.perf_counter() - started:.2f} с")
+        return result
+
+
+def leave_one_out(accents, limit: int = None) -> Dict:
+    """Перевірка: кожне слово словника вилучається і вгадується за рештою."""
+    keys = sorted(k for k, v in accents.items() if stress_index(v) >= 0 and len(vowel_positions(k)) > 1)
+    if limit:
+        keys = keys[::max(1, len(keys) // limit)]
+    stats = Counter()
+    for key in keys:
+        rest = {k: v for k, v in accents.items() if k != key}
+        suggestion = AccentSuggester(rest).suggest(key)
+        if suggestion is None:
+            stats['none'] += 1
+            continue
+        ok = suggestion['suggestion'] == accents[key]
+        stats[f"{suggestion['source']}_{'ok' if ok else 'bad'}"] += 1
+    stats['total'] = len(keys)
+    return dict(stats)
+
+
+# ========== Пропозиції з командного рядка ==========
+if __name__ == "__main__":
+    import json
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        dictionary = json.load(f)
+    if sys.argv[2] == "--check":
+        print(leave_one_out(dictionary, 300))
+        sys.exit(0)
+    suggester = AccentSuggester(dictionary)
+    for item in sys.argv[2:]:
+        print(item, suggester.suggest(item.lower()))
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+Потокове об'єднання звукових фрагментів глави.
+
+Фрагменти декодуються паралельно в пулі процесів з обмеженим
+випередженням (lookahead), а PCM блоки віддаються по порядку
+одному записувачу. Пам'ять обмежена lookahead фрагментами,
+а не довжиною глави.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+import wave
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from book_editors_suite.core.audio_validator import read_audio_params
+
+# Кодеки ffmpeg для сирого PCM за розрядністю (байт)
+_PCM_CODECS = {1: 'u8', 2: 's16le', 3: 's24le', 4: 's32le'}
+
+# pydub.AudioSegment: імпортується при першому декодуванні, щоб процеси пулу
+# та модулі, яким потрібен лише запис PCM, стартували без нього (False - ще не імпортовано)
+_AUDIO_SEGMENT = False
+
+
+def audio_segment():
+    """pydub.AudioSegment або None, якщо pydub не встановлено."""
+    global _AUDIO_SEGMENT
+    if _AUDIO_SEGMENT is False:
+        try:
+            from pydub import AudioSegment
+        except ImportError:
+            AudioSegment = None
+        _AUDIO_SEGMENT = AudioSegment
+    return _AUDIO_SEGMENT
+
+
+def target_params(paths) -> Dict:
+    """
+    Спільний формат для всіх фрагментів (як pydub при додаванні сегментів):
+    максимальні частота, кількість каналів та розрядність.
+    """
+    params = {'frame_rate': 0, 'channels': 0, 'sample_width': 0}
+    for path in paths:
+        p = read_audio_params(path)
+        if p:
+            for key in params:
+                params[key] = max(params[key], p[key])
+    return {
+        'frame_rate': params['frame_rate'] or 24000,
+        'channels': params['channels'] or 1,
+        'sample_width': params['sample_width'] or 2,
+    }
+
+
+def decode_fragment(path: str, params: Dict) -> bytes:
+    """Декодує фрагмент у сирий PCM заданого формату."""
+    AudioSegment = audio_segment()
+    if AudioSegment is not None:
+        seg = AudioSegment.from_file(path)
+        seg = (seg.set_frame_rate(params['frame_rate'])
+                  .set_channels(params['channels'])
+                  .set_sample_width(params['sample_width']))
+        return seg.raw_data
+
+    # Без pydub - тільки WAV, що вже має потрібний формат
+    with wave.open(path, 'rb') as w:
+        if (w.getframerate(), w.getnchannels(), w.getsampwidth()) != (
+                params['frame_rate'], params['channels'], params['sample_width']):
+            raise ValueError(f"pydub не встановлено, а формат {Path(path).name} потребує конвертації")
+        return w.readframes(w.getnframes())
+
+
+def _decode_job(args):
+    """Завдання для пулу: (індекс, шлях, формат) -> (індекс, PCM або помилка)."""
+    index, path, params = args
+    try:
+        return index, decode_fragment(path, params), None
+    except Exception as e:
+        return index, None, str(e)
+
+
+def _make_pool(workers: int):
+    """Пул процесів; якщо платформа не підтримує - пул потоків (ffmpeg все одно окремий процес)."""
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    try:
+        return ProcessPoolExecutor(max_workers=workers)
+    except (OSError, ImportError, NotImplementedError):
+        return ThreadPoolExecutor(max_workers=workers)
+
+
+def iter_decoded_fragments(paths, params: Dict, workers: int = None,
+                           lookahead: int = None) -> Iterator:
+    """
+    Декодує фрагменти паралельно і віддає (шлях, PCM, помилка) строго по порядку.
+    Одночасно в пам'яті не більше lookahead декодованих фрагментів.
+    """
+    paths = [str(p) for p in paths]
+    workers = workers or os.cpu_count() or 1
+    lookahead = max(lookahead or workers * 2, 1)
+
+    if workers <= 1 or len(paths) <= 1:
+        for i, path in enumerate(paths):
+            _, pcm, error = _decode_job((i, path, params))
+            yield path, pcm, error
+        return
+
+    with _make_pool(workers) as pool:
+        pending = deque()
+        next_index = 0
+        while next_index < len(paths) and len(pending) < lookahead:
+            pending.append(pool.submit(_decode_job, (next_index, paths[next_index], params)))
+            next_index += 1
+        while pending:
+            index, pcm, error = pending.popleft().result()
+            if next_index < len(paths):
+                pending.append(pool.submit(_decode_job, (next_index, paths[next_index], params)))
+                next_index += 1
+            yield paths[index], pcm, error
+
+
+class PcmWriter:
+    """Послідовний запис PCM блоків у WAV (модуль wave) або через ffmpeg у стислий формат."""
+
+#-------------------------------------------
+    def __init__(self, out_path, out_format: str, params: Dict):
+        self.out_path = Path(out_path)
+        self.out_format = out_format
+        self.params = params
+        self.bytes_written = 0
+        self._wave = None
+        self._proc = None
+
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        if out_format == 'wav':
+            self._wave = wave.open(str(self.out_path), 'wb')
+            self._wave.setnchannels(params['channels'])
+            self._wave.setsampwidth(params['sample_width'])
+            self._wave.setframerate(params['frame_rate'])
+        else:
+            self._proc = subprocess.Popen(
+                [self.ffmpeg_binary(), '-y', '-loglevel', 'error',
+                 '-f', _PCM_CODECS[params['sample_width']],
+                 '-ar', str(params['frame_rate']), '-ac', str(params['channels']),
+                 '-i', '-', '-f', out_format, str(self.out_path)],
+                stdin=subprocess.PIPE
+            )
+
+#-------------------------------------------
+    @staticmethod
+    def ffmpeg_binary() -> str:
+        """Шлях до ffmpeg (той самий, що використовує pydub)."""
+        AudioSegment = audio_segment()
+        if AudioSegment is not None and getattr(AudioSegment, 'converter', None):
+            return AudioSegment.converter
+        return shutil.which('ffmpeg') or 'ffmpeg'
+
+#-------------------------------------------
+    def write(self, pcm: bytes):
+        """Дописує PCM блок."""
+        if self._wave is not None:
+            self._wave.writeframesraw(pcm)
+        else:
+            self._proc.stdin.write(pcm)
+        self.bytes_written += len(pcm)
+
+#-------------------------------------------
+    def close(self) -> bool:
+        """Завершує запис. Повертає True, якщо файл записано успішно."""
+        if self._wave is not None:
+            self._wave.close()
+            self._wave = None
+            return True
+        if self._proc is not None:
+            self._proc.stdin.close()
+            code = self._proc.wait()
+            self._proc = None
+            return code == 0
+        return True
+
+#-------------------------------------------
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def merge_fragments(paths, out_path, out_format: str, workers: int = None,
+                    lookahead: int = None, logger=None,
+                    music_bed: Dict = None, speech_flags: List[bool] = None) -> Dict:
+    """
+    Паралельно декодує фрагменти та послідовно пише їх у один файл.
+    music_bed - налаштування музичної підкладки (див. music_bed.py),
+    speech_flags - для кожного фрагмента: чи це мова (під нею музика приглушується).
+    Повертає статистику: кількість фрагментів, помилки, тривалість, час.
+    """
+    paths = [Path(p) for p in paths]
+    started = time.perf_counter()
+    params = target_params(paths)
+
+    bed = None
+    if music_bed:
+        from book_editors_suite.core.music_bed import MusicBed
+        params['sample_width'] = 2
+        try:
+            bed = MusicBed(music_bed, params, logger)
+        except Exception as e:
+            if logger:
+                logger.warning(f"merge_fragments: Музичну підкладку вимкнено: {e}")
+    speech_flags = list(speech_flags or [False] * len(paths))
+    bytes_per_second = params['frame_rate'] * params['channels'] * params['sample_width']
+
+    merged = 0
+    errors = []
+    try:
+        with PcmWriter(out_path, out_format, params) as writer:
+            decoded = iter_decoded_fragments(paths, params, workers, lookahead)
+            for i, (path, pcm, error) in enumerate(decoded):
+                if error:
+                    errors.append((path, error))
+                    if logger:
+                        logger.warning(f"merge_fragments: Помилка завантаження фрагменту {Path(path).name}: {error}")
+                    continue
+                if bed is not None:
+                    next_speech = i + 1 < len(speech_flags) and speech_flags[i + 1]
+                    pcm = bed.mix(pcm, speech_flags[i], next_speech)
+                writer.write(pcm)
+                merged += 1
+            ok = writer.close()
+    finally:
+        if bed is not None:
+            bed.close()
+
+    stats = {
+        'fragments': merged,
+        'errors': errors,
+        'duration': writer.bytes_written / bytes_per_second if bytes_per_second else 0.0,
+        'seconds': time.perf_counter() - started,
+        'ok': ok and merged > 0,
+    }
+    if logger:
+        logger.info(f"merge_fragments: {out_path}: {merged} фрагментів, "
+                    f"{stats['duration']:.1f} с аудіо за {stats['seconds']:.2f} с")
+    return stats
+
+
+def merge_fragments_serial(paths, out_path, out_format: str) -> Dict:
+    """Попередній спосіб: послідовне AudioSegment.from_file і додавання сегментів (для порівняння)."""
+    started = time.perf_counter()
+    AudioSegment = audio_segment()
+    combined = None
+    for path in paths:
+        seg = AudioSegment.from_file(str(path))
+        combined = seg if combined is None else combined + seg
+    combined.export(str(out_path), format=out_format)
+    return {'fragments': len(paths), 'seconds': time.perf_counter() - started}
+
+
+def benchmark_merge(work_dir, fragments: int = 200, out_format: str = 'mp3',
+                    fragment_ms: int = 6000, workers: int = None) -> Dict:
+    """
+    Порівнює послідовне та паралельне об'єднання на синтетичній главі.
+    Фрагменти генеруються один раз і лишаються в work_dir для повторних запусків.
+    """
+    if audio_segment() is None:
+        raise RuntimeError("Для бенчмарку потрібен pydub (та ffmpeg)")
+    from pydub.generators import Sine
+
+    sound_folder = Path(work_dir) / "Звук"
+    sound_folder.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(fragments):
+        path = sound_folder / f"bench_фр_{i:04d}.{out_format}"
+        if not path.exists():
+            tone = Sine(220 + (i % 12) * 20, sample_rate=24000).to_audio_segment(duration=fragment_ms)
+            tone.set_channels(1).export(str(path), format=out_format)
+        paths.append(path)
+
+    serial = merge_fragments_serial(paths, Path(work_dir) / f"serial.{out_format}", out_format)
+    parallel = merge_fragments(paths, Path(work_dir) / f"parallel.{out_format}", out_format, workers=workers)
+    result = {
+        'fragments': fragments,
+        'serial_seconds': round(serial['seconds'], 2),
+        'parallel_seconds': round(parallel['seconds'], 2),
+        'speedup': round(serial['seconds'] / parallel['seconds'], 2) if parallel['seconds'] else 0.0,
+    }
+    print(f"Послідовно: {result['serial_seconds']} с, паралельно: {result['parallel_seconds']} с, "
+          f"прискорення x{result['speedup']} ({fragments} фрагментів .{out_format})")
+    return result
+
+
+# ========== Бенчмарк ==========
+if __name__ == "__main__":
+    work_dir = sys.argv[1] if len(sys.argv) > 1 else "/storage/emulated/0/Documents/bench_merge"
+    fragments = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    benchmark_merge(work_dir, fragments=fragments)
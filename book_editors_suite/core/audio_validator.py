@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+Швидка перевірка цілісності озвучених фрагментів глави.
+
+Перевіряє тільки заголовки (RIFF/WAVE) та синхронізацію фреймів MP3,
+без повного декодування. Файли перевіряються паралельно.
+
+Статуси результату:
+    ok              - фрагмент цілий
+    empty           - файл порожній або без аудіоданих
+    truncated       - файл обрізаний (перерваний запис / gTTS)
+    corrupt         - пошкоджена структура фреймів або чанків
+    format_mismatch - вміст не відповідає розширенню файлу
+    mode_mismatch   - розширення не відповідає SOUNDS_MODE
+    missing         - фрагмент є в маніфесті глави, але файлу немає
+"""
+
+import os
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional
+
+AUDIO_EXTENSIONS = ("mp3", "wav")
+
+# Таблиці бітрейтів (кбіт/с) для MPEG audio
+_MP3_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+_MP3_SAMPLE_RATES = {
+    1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    25: (11025, 12000, 8000),
+}
+
+# Скільки байтів на початку файлу шукати перший фрейм
+_MP3_SYNC_SEARCH_LIMIT = 4096
+
+
+def _result(path, status: str, fmt: Optional[str] = None, duration: float = 0.0, detail: str = "") -> Dict:
+    """Формує словник результату перевірки."""
+    return {
+        'path': str(path),
+        'status': status,
+        'format': fmt,
+        'duration': round(duration, 3),
+        'detail': detail,
+    }
+
+
+def parse_mp3_frame_header(data: bytes, pos: int = 0) -> Optional[Dict]:
+    """
+    Розбирає 4-байтовий заголовок фрейму MPEG audio.
+    Повертає параметри фрейму або None, якщо заголовок недійсний.
+    """
+    if pos + 4 > len(data):
+        return None
+    b1, b2, b3, b4 = data[pos], data[pos + 1], data[pos + 2], data[pos + 3]
+    if b1 != 0xFF or (b2 & 0xE0) != 0xE0:
+        return None
+
+    version_bits = (b2 >> 3) & 0x03
+    layer_bits = (b2 >> 1) & 0x03
+    if version_bits == 1 or layer_bits == 0:
+        return None
+    version = {0: 25, 2: 2, 3: 1}[version_bits]
+    layer = 4 - layer_bits
+
+    bitrate_idx = (b3 >> 4) & 0x0F
+    sr_idx = (b3 >> 2) & 0x03
+    if bitrate_idx in (0, 15) or sr_idx == 3:
+        return None
+
+    bitrate = _MP3_BITRATES[(1 if version == 1 else 2, layer)][bitrate_idx] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][sr_idx]
+    padding = (b3 >> 1) & 0x01
+    channels = 1 if ((b4 >> 6) & 0x03) == 3 else 2
+
+    if layer == 1:
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+        samples = 384
+    elif layer == 2 or version == 1:
+        frame_length = 144 * bitrate // sample_rate + padding
+        samples = 1152
+    else:
+        frame_length = 72 * bitrate // sample_rate + padding
+        samples = 576
+
+    return {
+        'version': version,
+        'layer': layer,
+        'bitrate': bitrate,
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'frame_length': frame_length,
+        'samples': samples,
+    }
+
+
+def _skip_id3v2(data: bytes, pos: int) -> int:
+    """Пропускає ID3v2 тег (розмір у synchsafe форматі)."""
+    while data[pos:pos + 3] == b"ID3" and pos + 10 <= len(data):
+        size = 0
+        for b in data[pos + 6:pos + 10]:
+            size = (size << 7) | (b & 0x7F)
+        footer = 10 if data[pos + 5] & 0x10 else 0
+        pos += 10 + size + footer
+    return pos
+
+
+def check_mp3(path) -> Dict:
+    """Перевіряє MP3 файл обходом заголовків фреймів."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return _result(path, "corrupt", "mp3", detail=f"не вдалося прочитати: {e}")
+
+    size = len(data)
+    if size == 0:
+        return _result(path, "empty", "mp3", detail="0 байтів")
+
+    pos = _skip_id3v2(data, 0)
+    if pos > size:
+        return _result(path, "truncated", "mp3", detail="обрізаний ID3 тег")
+
+    # Шукаємо перший фрейм (два послідовні дійсні заголовки)
+    limit = min(size, pos + _MP3_SYNC_SEARCH_LIMIT)
+    first = None
+    while pos < limit:
+        header = parse_mp3_frame_header(data, pos)
+        if header:
+            nxt = pos + header['frame_length']
+            if nxt >= size or parse_mp3_frame_header(data, nxt):
+                first = header
+                break
+        pos += 1
+    if first is None:
+        if pos >= size:
+            return _result(path, "empty", "mp3", detail="немає аудіофреймів")
+        return _result(path, "corrupt", "mp3", detail="не знайдено синхронізацію фреймів")
+
+    frames = 0
+    samples = 0
+    sample_rate = first['sample_rate']
+    while pos < size:
+        if data[pos:pos + 3] == b"TAG" and size - pos == 128:
+            break  # ID3v1 в кінці файлу
+        if data[pos:pos + 3] == b"ID3":
+            pos = _skip_id3v2(data, pos)
+            continue
+        header = parse_mp3_frame_header(data, pos)
+        if header is None:
+            if size - pos < 4:
+                return _result(path, "truncated", "mp3", samples / sample_rate,
+                               f"обрізаний заголовок фрейму #{frames}")
+            return _result(path, "corrupt", "mp3", samples / sample_rate,
+                           f"втрачено синхронізацію на байті {pos}")
+        if header['sample_rate'] != sample_rate:
+            return _result(path, "corrupt", "mp3", samples / sample_rate,
+                           f"зміна частоти дискретизації на фреймі #{frames}")
+        if pos + header['frame_length'] > size:
+            return _result(path, "truncated", "mp3", samples / sample_rate,
+                           f"обрізаний фрейм #{frames}")
+        pos += header['frame_length']
+        frames += 1
+        samples += header['samples']
+
+    if frames == 0:
+        return _result(path, "empty", "mp3", detail="немає аудіофреймів")
+    return _result(path, "ok", "mp3", samples / sample_rate, f"{frames} фреймів")
+
+
+def check_wav(path) -> Dict:
+    """Перевіряє WAV файл за заголовками чанків RIFF (дані не читаються)."""
+    try:
+        file_size = os.path.getsize(path)
+        if file_size == 0:
+            return _result(path, "empty", "wav", detail="0 байтів")
+        with open(path, "rb") as f:
+            head = f.read(12)
+            if len(head) < 12 or head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+                return _result(path, "corrupt", "wav", detail="недійсний заголовок RIFF/WAVE")
+
+            byte_rate = 0
+            pos = 12
+            while pos + 8 <= file_size:
+                f.seek(pos)
+                chunk_id, chunk_size = struct.unpack("<4sI", f.read(8))
+                body = pos + 8
+                if chunk_id == b"fmt ":
+                    fmt = f.read(min(chunk_size, 16))
+                    if len(fmt) < 16:
+                        return _result(path, "truncated", "wav", detail="обрізаний чанк fmt")
+                    byte_rate = struct.unpack("<HHIIHH", fmt)[3]
+                elif chunk_id == b"data":
+                    if not byte_rate:
+                        return _result(path, "corrupt", "wav", detail="чанк data перед fmt")
+                    available = file_size - body
+                    if chunk_size == 0 or available == 0:
+                        return _result(path, "empty", "wav", detail="порожній чанк data")
+                    if chunk_size > available:
+                        return _result(path, "truncated", "wav", available / byte_rate,
+                                       f"data: заявлено {chunk_size}, є {available} байтів")
+                    return _result(path, "ok", "wav", chunk_size / byte_rate)
+                pos = body + chunk_size + (chunk_size & 1)
+    except (OSError, struct.error) as e:
+        return _result(path, "corrupt", "wav", detail=f"помилка читання: {e}")
+
+    return _result(path, "truncated", "wav", detail="чанк data не знайдено")
+
+
+def sniff_audio_format(path) -> Optional[str]:
+    """Визначає фактичний формат файлу за першими байтами."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(4096)
+    except OSError:
+        return None
+    if head[:4] == b"RIFF":
+        return "wav"
+    if head[:3] == b"ID3":
+        return "mp3"
+    for pos in range(min(len(head), 4)):
+        if parse_mp3_frame_header(head, pos):
+            return "mp3"
+    return None
+
+
+def read_audio_params(path) -> Optional[Dict]:
+    """
+    Читає параметри потоку з заголовка: частота, канали, розрядність (байт).
+    Для MP3 розрядність після декодування - 2 байти.
+    """
+    fmt = sniff_audio_format(path)
+    try:
+        if fmt == "wav":
+            with open(path, "rb") as f:
+                f.seek(12)
+                while True:
+                    chunk = f.read(8)
+                    if len(chunk) < 8:
+                        return None
+                    chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+                    if chunk_id == b"fmt ":
+                        _, channels, rate, _, _, bits = struct.unpack("<HHIIHH", f.read(16))
+                        return {'frame_rate': rate, 'channels': channels, 'sample_width': bits // 8}
+                    f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+        if fmt == "mp3":
+            with open(path, "rb") as f:
+                data = f.read(_MP3_SYNC_SEARCH_LIMIT * 4)
+            pos = _skip_id3v2(data, 0)
+            if pos >= len(data):
+                with open(path, "rb") as f:
+                    f.seek(pos)
+                    data, pos = f.read(_MP3_SYNC_SEARCH_LIMIT), 0
+            for i in range(pos, min(len(data), pos + _MP3_SYNC_SEARCH_LIMIT)):
+                header = parse_mp3_frame_header(data, i)
+                if header:
+                    return {'frame_rate': header['sample_rate'], 'channels': header['channels'], 'sample_width': 2}
+    except (OSError, struct.error):
+        pass
+    return None
+
+
+def validate_fragment(path, sounds_mode: str) -> Dict:
+    """Перевіряє один фрагмент з урахуванням очікуваного SOUNDS_MODE."""
+    path = Path(path)
+    ext = path.suffix.lower().lstrip(".")
+    try:
+        if path.stat().st_size == 0:
+            return _result(path, "empty", ext, detail="0 байтів")
+    except OSError as e:
+        return _result(path, "corrupt", ext, detail=f"файл недоступний: {e}")
+
+    actual = sniff_audio_format(path)
+    if actual is None:
+        return _result(path, "format_mismatch", None, detail=f"невідомий формат у файлі .{ext}")
+    if actual != ext:
+        return _result(path, "format_mismatch", actual, detail=f"вміст {actual}, розширення .{ext}")
+
+    result = check_mp3(path) if actual == "mp3" else check_wav(path)
+    if result['status'] == "ok" and ext != sounds_mode:
+        result['status'] = "mode_mismatch"
+        result['detail'] = f"очікувався .{sounds_mode}, знайдено .{ext}"
+    return result
+
+
+def list_chapter_fragments(sound_folder) -> List[Path]:
+    """Повертає відсортовані фрагменти глави (без об'єднаного файлу)."""
+    sound_folder = Path(sound_folder)
+    if not sound_folder.is_dir():
+        return []
+    return sorted(
+        p for p in sound_folder.iterdir()
+        if p.is_file()
+        and p.suffix.lower().lstrip(".") in AUDIO_EXTENSIONS
+        and not p.stem.endswith("_повна")
+    )
+
+
+def validate_fragments(paths, sounds_mode: str, workers: int = None) -> List[Dict]:
+    """Паралельно перевіряє список фрагментів. Порядок результатів зберігається."""
+    paths = list(paths)
+    if not paths:
+        return []
+    from concurrent.futures import ThreadPoolExecutor
+    workers = workers or min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda p: validate_fragment(p, sounds_mode), paths))
+
+
+def validate_chapter_folder(chapter_folder, sounds_mode: str, workers: int = None) -> List[Dict]:
+    """Перевіряє папку 'Звук' однієї глави."""
+    return validate_fragments(list_chapter_fragments(Path(chapter_folder) / "Звук"), sounds_mode, workers)
+
+
+def validate_book(project_root, sounds_mode: str, workers: int = None) -> Dict[str, List[Dict]]:
+    """
+    Перевіряє всі глави проекту одним пулом.
+    Повертає {назва_глави: [результати]}.
+    """
+    project_root = Path(project_root)
+    chapters = {}
+    for chapter_dir in sorted(project_root.iterdir()):
+        if chapter_dir.is_dir():
+            fragments = list_chapter_fragments(chapter_dir / "Звук")
+            if fragments:
+                chapters[chapter_dir.name] = fragments
+
+    flat = [p for fragments in chapters.values() for p in fragments]
+    results = iter(validate_fragments(flat, sounds_mode, workers))
+    return {name: [next(results) for _ in fragments] for name, fragments in chapters.items()}
+
+
+def bad_fragments(results: List[Dict]) -> List[Dict]:
+    """Відбирає фрагменти з будь-яким статусом, крім 'ok'."""
+    return [r for r in results if r['status'] != "ok"]
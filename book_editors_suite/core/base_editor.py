@@ -1,14 +1,13 @@
 # -*- coding: utf-8 -*-
 """
-Базовий клас для всіх редакторів зі стандартною ініціалізацією
+Базовий клас для всіх редакторів зі стандартною ініціалізацією.
+
+Менеджери (логер, TTS, файли, текст, теми) створюються при першому звертанні,
+а їхні модулі імпортуються лише тоді - ядро працює без Kivy і pyjnius,
+а фонові процеси не платять за імпорт непотрібних залежностей.
 """
 
 from book_editors_suite.core.config_manager import get_config_manager
-from book_editors_suite.core.tts_manager import TTSManager
-from book_editors_suite.core.file_manager import FileManager
-from book_editors_suite.core.text_processor import TextProcessor
-from book_editors_suite.core.logging_manager import LoggingManager
-from book_editors_suite.ui.themes import ThemeManager
 
 
 class BaseEditor:
@@ -23,20 +22,80 @@ class BaseEditor:
         self.config_manager = get_config_manager(book_project_name, input_text_file)
         self.config = self.config_manager.load_for_editor(editor_name)
         
-        # Отримуємо інформацію про проект для логера
-        project_info = self.config_manager.get_project_info()
-        log_dir = project_info['base_path'] + f"/{self.book_project_name}/temp_folder/logs"
-        self.logger = LoggingManager(log_dir, app_name=editor_name)
-        
-        self.tts_manager = TTSManager()
-        self.file_manager = FileManager(self.config_manager, editor_name, self.logger)
-        self.text_processor = TextProcessor(self.logger)
-        self.theme_manager = ThemeManager()
+        # Решта менеджерів - ліниво (див. властивості нижче)
+        self._logger = None
+        self._tts_manager = None
+        self._file_manager = None
+        self._text_processor = None
+        self._theme_manager = None
         
         # Стандартні властивості
         self.current_scroll_y = 0.0
         self.current_cursor_pos = 0
         self.current_paragraph_index = 0
+
+    @property
+    def logger(self):
+        """Логер редактора (створюється при першому звертанні)"""
+        if self._logger is None:
+            from book_editors_suite.core.logging_manager import LoggingManager
+            # Отримуємо інформацію про проект для логера
+            project_info = self.config_manager.get_project_info()
+            log_dir = project_info['base_path'] + f"/{self.book_project_name}/temp_folder/logs"
+            self._logger = LoggingManager(log_dir, app_name=self.editor_name)
+        return self._logger
+
+    @logger.setter
+    def logger(self, value):
+        self._logger = value
+
+    @property
+    def tts_manager(self):
+        """Android TTS (pyjnius завантажується при першому звертанні)"""
+        if self._tts_manager is None:
+            from book_editors_suite.core.tts_manager import TTSManager
+            self._tts_manager = TTSManager()
+        return self._tts_manager
+
+    @tts_manager.setter
+    def tts_manager(self, value):
+        self._tts_manager = value
+
+    @property
+    def file_manager(self):
+        """Менеджер файлів проекту"""
+        if self._file_manager is None:
+            from book_editors_suite.core.file_manager import FileManager
+            self._file_manager = FileManager(self.config_manager, self.editor_name, self.logger)
+        return self._file_manager
+
+    @file_manager.setter
+    def file_manager(self, value):
+        self._file_manager = value
+
+    @property
+    def text_processor(self):
+        """Обробка тексту (наголоси, слова абзацу)"""
+        if self._text_processor is None:
+            from book_editors_suite.core.text_processor import TextProcessor
+            self._text_processor = TextProcessor(self.logger)
+        return self._text_processor
+
+    @text_processor.setter
+    def text_processor(self, value):
+        self._text_processor = value
+
+    @property
+    def theme_manager(self):
+        """Теми інтерфейсу"""
+        if self._theme_manager is None:
+            from book_editors_suite.ui.themes import ThemeManager
+            self._theme_manager = ThemeManager()
+        return self._theme_manager
+
+    @theme_manager.setter
+    def theme_manager(self, value):
+        self._theme_manager = value
         
     def save_bookmark(self):
         """Зберегти закладку"""
@@ -64,5 +123,5 @@ class BaseEditor:
     
     def stop_tts(self):
         """Зупинка TTS відтворення"""
-        if self.tts_manager:
-            self.tts_manager.stop_tts()
+        if self._tts_manager:
+            self._tts_manager.stop_tts()
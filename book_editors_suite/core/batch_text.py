@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Пакетна обробка текстів бібліотеки без інтерфейсу (Kivy не імпортується).
+
+Ланцюжок перетворень задається через кому, кожен файл проходить його
+один раз частинами по цілих рядках (жодне перетворення не виходить за
+межі рядка), файли обробляються паралельно в пулі процесів.
+Для кожного кроку рахується час і пропускна здатність - видно, який крок
+найповільніший.
+
+Перетворення:
+    accent                 наголоси за словником (-a словник.json / .acdb)
+    acute-to-plus, plus-to-acute, acute-to-plus-before, plus-before-to-acute
+                           позначки наголосу (accent_marks)
+    strip-accents          прибрати \\u0301
+    strip-tags             прибрати теги голосів (#g1:, #g2_slow:), звуків (#S1:) та "## "
+    sanitize               прибрати невидимі символи, нерозривні пробіли -> пробіл,
+                           пробіли в кінці рядків
+
+    python batch_text.py accent,acute-to-plus тека_або_файл.txt ... -o вихідна_тека
+        [-a accents_files.json] [-j процесів] [--translit]
+
+--translit - назви вихідних файлів латиницею (helpers.transliterate).
+Файли з тек зберігають під вихідною текою свої шляхи відносно вхідної теки;
+якщо два вхідні файли все одно дають один вихідний - обробка не починається.
+"""
+
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from book_editors_suite.utils.helpers import strip_combining_acute, transliterate
+from book_editors_suite.core.accent_engine import AccentEngine
+from book_editors_suite.core.accent_marks import MODES as MARK_MODES, convert_text
+from book_editors_suite.core.accent_dict_binary import BINARY_SUFFIX, BinaryAccentDict
+
+CHUNK_CHARS = 1 << 20
+
+TAGS_RE = re.compile(r"^##\s*|#g\d+(?:_(?:slow|fast))?:\s?|#S\d+:\s?", re.IGNORECASE | re.MULTILINE)
+# Невидимі символи та нерозривні пробіли (кілька str.replace швидші за str.translate)
+INVISIBLE_REPLACEMENTS = (('\ufeff', ''), ('\u200b', ''), ('\u200c', ''), ('\u200d', ''),
+                          ('\u00a0', ' '), ('\u202f', ' '))
+
+# Процес пулу отримує ланцюжок від батька (fork) або будує його сам
+_CHAIN = None
+
+
+def strip_tags(text: str) -> str:
+    return TAGS_RE.sub("", text)
+
+
+def sanitize_text(text: str) -> str:
+    for char, replacement in INVISIBLE_REPLACEMENTS:
+        if char in text:
+            text = text.replace(char, replacement)
+    return "\n".join(line.rstrip(" \t") for line in text.split("\n"))
+
+
+def load_accents(path):
+    """Словник з JSON або бінарного .acdb (відкривається через mmap)."""
+    path = Path(path)
+    if path.suffix == BINARY_SUFFIX:
+        return BinaryAccentDict(path)
+    with path.open('r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_chain(names: List[str], accents_path=None) -> List[Tuple[str, Callable[[str], str]]]:
+    """Перетворення за назвами: [(назва, функція str -> str)]."""
+    chain = []
+    for name in names:
+        if name == 'accent':
+            if not accents_path:
+                raise ValueError("Для 'accent' потрібен словник (-a)")
+            chain.append((name, AccentEngine(load_accents(accents_path)).accent_text))
+        elif name in MARK_MODES:
+            chain.append((name, lambda text, mode=name: convert_text(text, mode)))
+        elif name == 'strip-accents':
+            chain.append((name, strip_combining_acute))
+        elif name == 'strip-tags':
+            chain.append((name, strip_tags))
+        elif name == 'sanitize':
+            chain.append((name, sanitize_text))
+        else:
+            raise ValueError(f"Невідоме перетворення: {name}")
+    return chain
+
+
+def read_line_chunks(f, chunk_chars: int = CHUNK_CHARS) -> Iterator[str]:
+    """Частини тексту по цілих рядках."""
+    while True:
+        chunk = f.read(chunk_chars)
+        if not chunk:
+            return
+        if not chunk.endswith("\n"):
+            chunk += f.readline()
+        yield chunk
+
+
+def output_path_for(input_path, output_dir, translit: bool = False, relative=None) -> Path:
+    """Вихідний файл: relative (шлях відносно вхідної теки) або лише назва файлу під output_dir."""
+    relative = Path(relative) if relative is not None else Path(Path(input_path).name)
+    stem = transliterate(relative.stem) if translit else relative.stem
+    return Path(output_dir) / relative.parent / f"{stem}{relative.suffix}"
+
+
+def process_file(input_path, output_path, chain) -> Dict:
+    """
+    Пропускає файл через ланцюжок і записує результат атомарно.
+    Повертає {'input', 'output', 'bytes', 'seconds', 'steps': {назва: секунди}}.
+    """
+    started = time.perf_counter()
+    steps = {name: 0.0 for name, _ in chain}
+    input_path, output_path = Path(input_path), Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with open(input_path, "r", encoding="utf-8", newline="") as src, \
+            open(tmp_path, "w", encoding="utf-8", newline="") as dst:
+        for chunk in read_line_chunks(src):
+            for name, func in chain:
+                step_started = time.perf_counter()
+                chunk = func(chunk)
+                steps[name] += time.perf_counter() - step_started
+            dst.write(chunk)
+    os.replace(tmp_path, output_path)
+    return {
+        'input': str(input_path),
+        'output': str(output_path),
+        'bytes': input_path.stat().st_size,
+        'seconds': time.perf_counter() - started,
+        'steps': steps,
+    }
+
+
+def _init_worker(names, accents_path):
+    global _CHAIN
+    if _CHAIN is None:
+        _CHAIN = build_chain(names, accents_path)
+
+
+def _process_job(args) -> Dict:
+    input_path, output_path = args
+    try:
+        return process_file(input_path, output_path, _CHAIN)
+    except Exception as e:
+        return {'input': str(input_path), 'output': None, 'error': str(e)}
+
+
+def collect_inputs(paths: Iterable, output_dir=None) -> List[Tuple[Path, Path]]:
+    """
+    Файли та *.txt з тек (рекурсивно), крім вихідної теки:
+    [(файл, шлях відносно вхідної теки або назва файлу)].
+    """
+    out = Path(output_dir).resolve() if output_dir else None
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            for found in sorted(path.rglob("*.txt")):
+                if out is None or out not in found.resolve().parents:
+                    files.append((found, found.relative_to(path)))
+        else:
+            files.append((path, Path(path.name)))
+    return files
+
+
+def run_batch(names: List[str], paths: Iterable, output_dir, accents_path=None,
+              workers: Optional[int] = None, translit: bool = False) -> Dict:
+    """
+    Обробляє всі файли ланцюжком перетворень.
+    Повертає {'files': [статистика файлу], 'steps': {назва: {'seconds', 'mb_per_s'}},
+    'bytes', 'seconds'}.
+    ValueError - якщо кілька вхідних файлів мають спільний вихідний файл.
+    """
+    global _CHAIN
+    started = time.perf_counter()
+    files = collect_inputs(paths, output_dir)
+    # Паралельні записи в один вихідний файл перетерли б один одного
+    sources = {}
+    for input_path, relative in files:
+        output_path = str(output_path_for(input_path, output_dir, translit, relative))
+        if output_path in sources:
+            if Path(sources[output_path]).resolve() != input_path.resolve():
+                raise ValueError(f"Спільний вихідний файл {output_path}: {sources[output_path]} і {input_path}")
+            continue
+        sources[output_path] = str(input_path)
+    jobs = [(input_path, output_path) for output_path, input_path in sources.items()]
+    # Ланцюжок (разом зі словником) будується один раз; при fork процеси його успадковують
+    _CHAIN = build_chain(names, accents_path)
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs)) or 1
+    results = None
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(names, accents_path)) as pool:
+                results = list(pool.map(_process_job, jobs))
+        except (OSError, ImportError, NotImplementedError):
+            results = None
+    if results is None:
+        results = [_process_job(job) for job in jobs]
+
+    total_bytes = sum(r.get('bytes', 0) for r in results)
+    steps = {}
+    for name in names:
+        seconds = sum(r['steps'][name] for r in results if 'steps' in r)
+        steps[name] = {
+            'seconds': seconds,
+            'mb_per_s': total_bytes / (1 << 20) / seconds if seconds else 0.0,
+        }
+    return {'files': results, 'steps': steps, 'bytes': total_bytes,
+            'seconds': time.perf_counter() - started}
+
+
+def format_report(report: Dict) -> str:
+    lines = []
+    for result in report['files']:
+        if result.get('error'):
+            lines.append(f"Помилка: {result['input']}: {result['error']}")
+        else:
+            lines.append(f"{result['input']} -> {result['output']} ({result['seconds']:.2f} с)")
+    lines.append(f"Файлів: {len(report['files'])}, {report['bytes'] / (1 << 20):.1f} МБ "
+                 f"за {report['seconds']:.2f} с")
+    for name, step in report['steps'].items():
+        lines.append(f"  {name:22s} {step['seconds']:8.2f} с  {step['mb_per_s']:8.1f} МБ/с")
+    return "\n".join(lines)
+
+
+# ========== Пакетна обробка з командного рядка ==========
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {}
+    for flag in ("-o", "-a", "-j"):
+        if flag in args:
+            pos = args.index(flag)
+            options[flag] = args[pos + 1]
+            args = args[:pos] + args[pos + 2:]
+    translit = "--translit" in args
+    args = [a for a in args if a != "--translit"]
+
+    if len(args) < 2 or "-o" not in options:
+        print(__doc__)
+        sys.exit(1)
+
+    try:
+        report = run_batch(args[0].split(","), args[1:], options["-o"], options.get("-a"),
+                           int(options["-j"]) if "-j" in options else None, translit)
+    except ValueError as e:
+        print(f"Помилка: {e}")
+        sys.exit(1)
+    print(format_report(report))
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+Збирання всієї аудіокниги за один прохід.
+
+Глави читаються в порядку тексту (book_manifest.json від MultispeakerTTS),
+кожна декодується рівно один раз і потоком пишеться у вихідний файл.
+Паралельно записуються мітки глав (ffmetadata + cue) і, за бажанням,
+окремі доріжки голосів (G1 розповідач, G2…G9, FX) з тишею там,
+де голос відсутній.
+"""
+
+import json
+import os
+import subprocess
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, List
+
+from book_editors_suite.core.audio_merge import PcmWriter, iter_decoded_fragments, target_params
+from book_editors_suite.core.audio_validator import list_chapter_fragments
+
+BOOK_MANIFEST_NAME = "book_manifest.json"
+# Назви маніфестів у сховищі проекту (project_store)
+BOOK_MANIFEST_KEY = "book"
+FX_STEM = "FX"
+
+
+def chapter_manifest_key(folder_name: str) -> str:
+    """Назва маніфесту глави у сховищі проекту."""
+    return f"chapter/{folder_name}"
+
+
+class BookAssembler:
+    """Потокове збирання книги з мітками глав та доріжками голосів."""
+
+#-------------------------------------------
+    def __init__(self, project_root, sounds_mode: str, voice_dict: Dict = None,
+                 logger=None, workers: int = None, lookahead: int = None, store=None):
+        self.project_root = Path(project_root)
+        self.store = store
+        self.sounds_mode = sounds_mode
+        self.voice_dict = voice_dict or {}
+        self.logger = logger
+        self.workers = workers
+        self.lookahead = lookahead
+
+#-------------------------------------------
+    def load_chapters(self) -> List[Dict]:
+        """
+        Повертає глави в порядку тексту: [{'folder': ..., 'title': ...}].
+        Без book_manifest.json - папки глав в алфавітному порядку.
+        """
+        manifest = self.store.load_manifest(BOOK_MANIFEST_KEY) if self.store is not None else None
+        if manifest is not None:
+            return manifest.get('chapters', [])
+        manifest_path = self.project_root / BOOK_MANIFEST_NAME
+        if manifest_path.exists():
+            try:
+                with manifest_path.open('r', encoding='utf-8') as f:
+                    return json.load(f).get('chapters', [])
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"load_chapters: Помилка читання {manifest_path}: {e}")
+        return [{'folder': d.name, 'title': d.name.replace('_', ' ')}
+                for d in sorted(self.project_root.iterdir())
+                if d.is_dir() and (d / "Звук").is_dir()]
+
+#-------------------------------------------
+    def chapter_sources(self, chapter: Dict, with_stems: bool) -> List[Dict]:
+        """
+        Джерела звуку глави: [{'path': ..., 'stem': голос/FX/None}].
+        Без доріжок голосів береться вже об'єднаний файл глави (якщо є).
+        """
+        chapter_folder = self.project_root / chapter['folder']
+        sound_folder = chapter_folder / "Звук"
+        merged = sound_folder / f"{chapter['folder']}_повна.{self.sounds_mode}"
+        if not with_stems and merged.exists():
+            return [{'path': merged, 'stem': None}]
+
+        manifest_path = chapter_folder / "manifest.json"
+        entries = []
+        manifest = (self.store.load_manifest(chapter_manifest_key(chapter['folder']))
+                    if self.store is not None else None)
+        if manifest is not None:
+            entries = manifest.get('fragments', [])
+        elif manifest_path.exists():
+            with manifest_path.open('r', encoding='utf-8') as f:
+                entries = json.load(f).get('fragments', [])
+        if entries:
+            sources = []
+            for entry in entries:
+                path = sound_folder / entry['file']
+                if not path.exists():
+                    continue
+                if entry.get('kind') == 'speech':
+                    stem = entry.get('voice') or 'G1'
+                elif entry.get('kind') == 'pause':
+                    stem = None
+                else:
+                    stem = FX_STEM
+                sources.append({'path': path, 'stem': stem})
+            return sources
+
+        return [{'path': p, 'stem': None} for p in list_chapter_fragments(sound_folder)
+                if p.suffix == f".{self.sounds_mode}"]
+
+#-------------------------------------------
+    def _stem_file_name(self, stem: str) -> str:
+        """Ім'я файлу доріжки голосу, напр. G1_Розповідач.mp3"""
+        name = self.voice_dict.get(stem)
+        label = f"{stem}_{name.replace(' ', '_')}" if name else stem
+        return f"{label}.{self.sounds_mode}"
+
+#-------------------------------------------
+    def assemble(self, out_path=None, with_stems: bool = False, stems_dir=None,
+                 embed_chapters: bool = True) -> Dict:
+        """
+        Збирає книгу за один прохід.
+        Повертає статистику з мітками глав: {'chapters': [{'title', 'start', 'end'}], ...}
+        """
+        started = time.perf_counter()
+        out_path = Path(out_path or self.project_root / f"{self.project_root.name}_книга.{self.sounds_mode}")
+        stems_dir = Path(stems_dir or self.project_root / "stems")
+
+        chapters = self.load_chapters()
+        plan = []
+        for chapter in chapters:
+            sources = self.chapter_sources(chapter, with_stems)
+            if sources:
+                plan.append((chapter, sources))
+        if not plan:
+            if self.logger:
+                self.logger.warning("assemble: Немає глав для збирання")
+            return {'ok': False, 'chapters': [], 'stems': {}}
+
+        flat = [src for _, sources in plan for src in sources]
+        params = target_params([src['path'] for src in flat])
+        bytes_per_second = params['frame_rate'] * params['channels'] * params['sample_width']
+        # Тиша: нулі, але 8-бітний PCM беззнаковий - тиша 0x80
+        silence_byte = b"\x80" if params['sample_width'] == 1 else b"\x00"
+
+        markers = []
+        errors = []
+        stem_writers = {}
+        # Доріжки голосів можуть бути процесами ffmpeg - закриваються і при помилці
+        with ExitStack() as stack:
+            if with_stems:
+                for stem in sorted({src['stem'] for src in flat if src['stem']}):
+                    stem_writers[stem] = stack.enter_context(
+                        PcmWriter(stems_dir / self._stem_file_name(stem), self.sounds_mode, params))
+            writer = stack.enter_context(PcmWriter(out_path, self.sounds_mode, params))
+            decoded = iter_decoded_fragments([src['path'] for src in flat], params, self.workers, self.lookahead)
+            stack.callback(decoded.close)
+            for chapter, sources in plan:
+                start = writer.bytes_written
+                for src in sources:
+                    path, pcm, error = next(decoded)
+                    if error:
+                        errors.append((path, error))
+                        if self.logger:
+                            self.logger.warning(f"assemble: Пропущено {Path(path).name}: {error}")
+                        continue
+                    writer.write(pcm)
+                    if stem_writers:
+                        silence = None
+                        for stem, stem_writer in stem_writers.items():
+                            if stem == src['stem']:
+                                stem_writer.write(pcm)
+                            else:
+                                silence = silence or silence_byte * len(pcm)
+                                stem_writer.write(silence)
+                markers.append({
+                    'title': chapter.get('title') or chapter['folder'],
+                    'start': start / bytes_per_second,
+                    'end': writer.bytes_written / bytes_per_second,
+                })
+            ok = writer.close()
+            for stem_writer in stem_writers.values():
+                ok = stem_writer.close() and ok
+
+        self.write_chapter_markers(out_path, markers)
+        if embed_chapters and ok and self.sounds_mode != 'wav':
+            self.embed_chapter_markers(out_path)
+
+        stats = {
+            'ok': ok,
+            'output': str(out_path),
+            'chapters': markers,
+            'stems': {stem: str(w.out_path) for stem, w in stem_writers.items()},
+            'errors': errors,
+            'seconds': time.perf_counter() - started,
+        }
+        if self.logger:
+            self.logger.info(f"assemble: Книгу зібрано: {out_path} ({len(markers)} глав, "
+                             f"{len(stem_writers)} доріжок голосів, {stats['seconds']:.1f} с)")
+        return stats
+
+#-------------------------------------------
+    @staticmethod
+    def _metadata_escape(value: str) -> str:
+        """Екранування спецсимволів формату ffmetadata."""
+        for ch in ('\\', '=', ';', '#', '\n'):
+            value = value.replace(ch, '\\' + ch)
+        return value
+
+#-------------------------------------------
+    def write_chapter_markers(self, out_path: Path, markers: List[Dict]):
+        """Пише мітки глав поруч з книгою: .ffmetadata (для ffmpeg) та .cue"""
+        meta_lines = [";FFMETADATA1", f"title={self._metadata_escape(self.project_root.name)}"]
+        for m in markers:
+            meta_lines += [
+                "[CHAPTER]", "TIMEBASE=1/1000",
+                f"START={int(m['start'] * 1000)}", f"END={int(m['end'] * 1000)}",
+                f"title={self._metadata_escape(m['title'])}",
+            ]
+        out_path.with_suffix('.ffmetadata').write_text("\n".join(meta_lines) + "\n", encoding='utf-8')
+
+        cue_type = "WAVE" if self.sounds_mode == 'wav' else "MP3"
+        cue_lines = [f'TITLE "{self.project_root.name}"', f'FILE "{out_path.name}" {cue_type}']
+        for i, m in enumerate(markers, 1):
+            frames = int(round(m['start'] * 75))
+            cue_lines += [
+                f"  TRACK {i:02d} AUDIO",
+                f'    TITLE "{m["title"].replace(chr(34), chr(39))}"',
+                f"    INDEX 01 {frames // 4500:02d}:{frames // 75 % 60:02d}:{frames % 75:02d}",
+            ]
+        out_path.with_suffix('.cue').write_text("\n".join(cue_lines) + "\n", encoding='utf-8')
+
+#-------------------------------------------
+    def embed_chapter_markers(self, out_path: Path) -> bool:
+        """Вбудовує мітки глав у файл копіюванням потоку (-c copy, без декодування)."""
+        tmp_path = out_path.with_name(out_path.stem + ".chapters" + out_path.suffix)
+        cmd = [PcmWriter.ffmpeg_binary(), '-y', '-loglevel', 'error',
+               '-i', str(out_path), '-i', str(out_path.with_suffix('.ffmetadata')),
+               '-map', '0:a', '-map_metadata', '1', '-map_chapters', '1',
+               '-c', 'copy', '-id3v2_version', '3', str(tmp_path)]
+        try:
+            subprocess.run(cmd, check=True)
+            os.replace(tmp_path, out_path)
+            return True
+        except (OSError, subprocess.CalledProcessError) as e:
+            if self.logger:
+                self.logger.warning(f"embed_chapter_markers: Мітки глав лишилися тільки у .ffmetadata/.cue: {e}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return False
@@ -11,9 +11,21 @@ import re
 import os
 import logging
 import shutil
+import threading
+import time
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from book_editors_suite.core.project_store import STORE_FLAG, open_project_store
+from book_editors_suite.core.write_behind import WriteBehindFile
+
+# Зміни конфігу (закладки тощо) записуються у файл не частіше ніж раз на стільки секунд
+CONFIG_FLUSH_SECONDS = 2.0
+# Як часто читання конфігу перевіряє, чи не змінив файл інший редактор (с)
+CONFIG_CHECK_SECONDS = 1.0
+
+_MISSING = object()
+
 class ProjectManager:
     """Менеджер для створення структури проекту книги"""
     
@@ -206,6 +218,8 @@ class ProjectManager:
             
             # Конфіг для accent_editor
             "ACCENT_EDITOR_ACCENTS_FILE": f"{base_path}/json/accents_files.json",
+            # Спільний для всіх книг словник (поруч з папками проектів)
+            "ACCENT_EDITOR_GLOBAL_ACCENTS_FILE": f"{os.path.dirname(base_path)}/global_json/accents_global.acdb",
             "ACCENT_EDITOR_OUTPUT_MP3_FOLDER": f"{base_path}/outputs/output_mp3",
             "ACCENT_EDITOR_TTS_MODE": "gTTS",
             "ACCENT_EDITOR_DO_SPLIT": False,
@@ -275,6 +289,13 @@ class ProjectManager:
             "MULTISPEAKER_TTS_FRAGMENT_HARD_LIMIT": 1000,
             "MULTISPEAKER_TTS_DO_SPLIT": True,
             "MULTISPEAKER_TTS_DO_MERGE": False,
+            "MULTISPEAKER_TTS_VALIDATE_AUDIO": True,
+            "MULTISPEAKER_TTS_MERGE_WORKERS": 0,
+            "MULTISPEAKER_TTS_MERGE_LOOKAHEAD": 0,
+            "MULTISPEAKER_TTS_DO_ASSEMBLE": False,
+            "MULTISPEAKER_TTS_ASSEMBLE_STEMS": False,
+            "MULTISPEAKER_TTS_MUSIC_BEDS": {},
+            "MULTISPEAKER_TTS_SYNTH_SCHEDULE_WINDOW": 0,
             "MULTISPEAKER_TTS_TTS_MODE": "TFile",
             "MULTISPEAKER_TTS_SOUND_DICT": {
                 "S01": "Звук_пострілу",
@@ -323,6 +344,27 @@ class ModularConfigManager:
         # Налаштування логування
         self.logger = self._setup_logging()
 
+        # Відкладений атомарний запис: зміни в self.data лише під self._lock
+        self._lock = threading.RLock()
+        self._writer = WriteBehindFile(self.config_file, self._serialize_config, self._lock,
+                                       CONFIG_FLUSH_SECONDS, self.logger, on_flush=self._on_flushed)
+        # Необов'язкове SQLite сховище (project_store): зміни - по рядках, JSON - експорт
+        self.project_store = None
+
+        # Готові конфіги редакторів (змінюються на місці лише для змінених ключів),
+        # ключ конфігу -> [(редактор, параметр)], слухачі змін
+        self._views: Dict[str, Dict[str, Any]] = {}
+        self._key_params: Dict[str, List] = {}
+        self._listeners: List = []
+        # Ключі, змінені тут і ще не записані (не перетираються при перечитуванні файлу):
+        # ключ -> номер зміни; _written_keys - ті, що потрапили в знімок поточного запису
+        self._pending_keys: Dict[str, int] = {}
+        self._pending_seq = 0
+        self._written_keys: Dict[str, int] = {}
+        # mtime/розмір файлу або data_version сховища на момент останнього читання
+        self._disk_stamp = None
+        self._next_check = 0.0
+
         # Спільні параметри
         self.common_params = {
             'params': [
@@ -371,6 +413,7 @@ class ModularConfigManager:
             'accent_editor': {
                 'params': [
                     'ACCENTS_FILE',
+                    'GLOBAL_ACCENTS_FILE',
                     'OUTPUT_MP3_FOLDER', 
                     'TTS_MODE', 
                     'DO_SPLIT',
@@ -378,6 +421,7 @@ class ModularConfigManager:
                 ],
                 'defaults': {
                     'ACCENTS_FILE': '',
+                    'GLOBAL_ACCENTS_FILE': '',
                     'OUTPUT_MP3_FOLDER': '',
                     'TTS_MODE': 'gTTS', 
                     'DO_SPLIT': False,
@@ -445,6 +489,13 @@ class ModularConfigManager:
                     'FRAGMENT_HARD_LIMIT', 
                     'DO_SPLIT',
                     'DO_MERGE',
+                    'VALIDATE_AUDIO',
+                    'MERGE_WORKERS',
+                    'MERGE_LOOKAHEAD',
+                    'DO_ASSEMBLE',
+                    'ASSEMBLE_STEMS',
+                    'MUSIC_BEDS',
+                    'SYNTH_SCHEDULE_WINDOW',
                     'TTS_MODE',
                     "SOUNDS_EFFECTS_LIST"
                     'SOUND_DICT',
@@ -456,6 +507,13 @@ class ModularConfigManager:
                     'FRAGMENT_HARD_LIMIT': 1000,
                     'DO_SPLIT': True,
                     'DO_MERGE': False,
+                    'VALIDATE_AUDIO': True,
+                    'MERGE_WORKERS': 0,
+                    'MERGE_LOOKAHEAD': 0,
+                    'DO_ASSEMBLE': False,
+                    'ASSEMBLE_STEMS': False,
+                    'MUSIC_BEDS': {},
+                    'SYNTH_SCHEDULE_WINDOW': 0,
                     'TTS_MODE': 'TFile',
                     'SOUNDS_EFFECTS_LIST': '',
                     'SOUND_DICT': {
@@ -531,42 +589,198 @@ class ModularConfigManager:
 
 #----load_full_config-----
     def load_full_config(self) -> Dict[str, Any]:
-        """Завантажує повний конфіг з файлу."""
+        """
+        Завантажує повний конфіг з файлу (незаписані зміни спершу зберігаються).
+        Якщо для проекту ввімкнено сховище SQLite - зі сховища.
+        """
+        self._writer.flush()
+        if self.project_store is not None:
+            return self._load_from_store()
         if self.config_file.exists():
+            stamp = self._file_stamp()
             try:
                 with open(self.config_file, "r", encoding="utf-8") as f:
-                    self.data = json.load(f)
+                    data = json.load(f)
+                self._replace_data(data, stamp)
                 self.logger.info(f"load_full_config: \nЗавантажено конфіг: {len(self.data)} параметрів")
             except Exception as e:
                 self.logger.error(f"load_full_config: Помилка завантаження конфігу: {e}")
-                self.data = {}
+                self._replace_data({}, None)
+            self.project_store = open_project_store(self.config_file, bool(self.data.get(STORE_FLAG)), self.logger)
+            if self.project_store is not None:
+                self._load_from_store()
         return self.data
 
+#----_load_from_store-----
+    def _load_from_store(self) -> Dict[str, Any]:
+        """Зчитує конфіг зі сховища SQLite."""
+        try:
+            stamp = self.project_store.data_version()
+            self._replace_data(self.project_store.get_config(), stamp)
+            self.logger.info(f"_load_from_store: \nЗавантажено конфіг зі сховища: {len(self.data)} параметрів")
+        except Exception as e:
+            self.logger.error(f"_load_from_store: Помилка читання сховища: {e}")
+        return self.data
+
+#----_file_stamp-----
+    def _file_stamp(self):
+        """(mtime, розмір) файлу конфігу або None."""
+        try:
+            st = os.stat(self.config_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+#----_on_flushed-----
+    def _on_flushed(self):
+        """
+        Після власного запису файл актуальний - перечитувати його не треба.
+        Записані ключі перестають бути незаписаними, якщо після знімка їх не змінили знову.
+        """
+        with self._lock:
+            for key, seq in self._written_keys.items():
+                if self._pending_keys.get(key) == seq:
+                    del self._pending_keys[key]
+            self._written_keys = {}
+        if self.project_store is None:
+            self._disk_stamp = self._file_stamp()
+
+#----_mark_pending-----
+    def _mark_pending(self, keys):
+        """Позначає ключі як змінені тут і ще не записані (викликається під self._lock)."""
+        self._pending_seq += 1
+        for key in keys:
+            self._pending_keys[key] = self._pending_seq
+
+#----check_for_changes-----
+    def check_for_changes(self) -> bool:
+        """
+        Перечитує конфіг, якщо його змінив інший редактор (mtime файлу або
+        data_version сховища). Змінені параметри оновлюються в конфігах
+        редакторів, слухачі отримують повідомлення. True - були зміни.
+        """
+        self._next_check = time.monotonic() + CONFIG_CHECK_SECONDS
+        try:
+            if self.project_store is not None:
+                stamp = self.project_store.data_version()
+                if stamp == self._disk_stamp:
+                    return False
+                data = self.project_store.get_config()
+            else:
+                stamp = self._file_stamp()
+                if stamp is None or stamp == self._disk_stamp:
+                    return False
+                with open(self.config_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+        except Exception as e:
+            # Файл міг бути прочитаний посеред чужого запису - наступна перевірка повторить
+            self.logger.warning(f"check_for_changes: Не вдалося перечитати конфіг: {e}")
+            return False
+        changed = self._replace_data(data, stamp)
+        if changed:
+            self.logger.info(f"check_for_changes: \nКонфіг змінено ззовні: {len(changed)} ключів")
+        return bool(changed)
+
+#----_replace_data-----
+    def _replace_data(self, data: Dict[str, Any], stamp) -> set:
+        """Підставляє новий повний конфіг, зберігаючи власні незаписані зміни. Повертає змінені ключі."""
+        with self._lock:
+            for key in self._pending_keys:
+                if key in self.data:
+                    data[key] = self.data[key]
+            old = self.data
+            changed = {key for key in old.keys() | data.keys()
+                       if old.get(key, _MISSING) != data.get(key, _MISSING)}
+            self.data = data
+            self._disk_stamp = stamp
+        self._refresh_views(changed)
+        return changed
+
+#----_resolve_param-----
+    def _resolve_param(self, editor_name: str, param: str):
+        """Значення параметра редактора: особистий ключ, його типове, спільний ключ, спільне типове."""
+        editor = self.editor_registry[editor_name]
+        if param in editor['params']:
+            personal_key = f"{editor_name.upper()}_{param.upper()}"
+            if personal_key in self.data:
+                return self.data[personal_key]
+            if param in editor['defaults']:
+                return editor['defaults'][param]
+        if param in self.common_params['params']:
+            common_key = f"COMMON_{param.upper()}"
+            if common_key in self.data:
+                return self.data[common_key]
+            if param in self.common_params['defaults']:
+                return self.common_params['defaults'][param]
+        return _MISSING
+
+#----_refresh_views-----
+    def _refresh_views(self, keys):
+        """Оновлює на місці лише параметри, що залежать від змінених ключів, і повідомляє слухачів."""
+        changed_params: Dict[str, List[str]] = {}
+        with self._lock:
+            for key in keys:
+                for editor_name, param in self._key_params.get(key, ()):
+                    view = self._views[editor_name]
+                    value = self._resolve_param(editor_name, param)
+                    if value is _MISSING:
+                        if view.pop(param, _MISSING) is _MISSING:
+                            continue
+                    elif view.get(param, _MISSING) is value:
+                        continue
+                    else:
+                        view[param] = value
+                    changed_params.setdefault(editor_name, []).append(param)
+        for editor_name, params in changed_params.items():
+            for listener_editor, callback in list(self._listeners):
+                if listener_editor is None or listener_editor == editor_name:
+                    try:
+                        callback(editor_name, params)
+                    except Exception as e:
+                        self.logger.error(f"_refresh_views: Помилка слухача змін конфігу: {e}")
+
+#----add_change_listener-----
+    def add_change_listener(self, callback, editor_name: str = None):
+        """
+        Підписка на зміни конфігу: callback(редактор, [параметри]).
+        editor_name=None - зміни всіх редакторів.
+        """
+        self._listeners.append((editor_name, callback))
+
+#----remove_change_listener-----
+    def remove_change_listener(self, callback):
+        """Скасовує підписку на зміни конфігу."""
+        self._listeners = [(e, c) for e, c in self._listeners if c != callback]
+
 #----load_for_editor-----
     def load_for_editor(self, editor_name: str) -> Dict[str, Any]:
-        """Завантажує тільки параметри потрібні конкретному редактору."""
+        """
+        Параметри конкретного редактора (спільні + особисті).
+        Повертається той самий словник, що оновлюється на місці при зміні
+        конфігу - його не можна змінювати, лише читати.
+        """
+        if time.monotonic() >= self._next_check:
+            self.check_for_changes()
+        view = self._views.get(editor_name)
+        if view is not None:
+            return view
+
         if editor_name not in self.editor_registry:
             error_msg = f"load_for_editor: Невідомий редактор: {editor_name}"
             self.logger.error(error_msg)
             raise ValueError(error_msg)
             
         editor_config = {}
-        
-        # Завантажуємо спільні параметри
-        for param in self.common_params['params']:
-            common_key = f"COMMON_{param.upper()}"
-            if common_key in self.data:
-                editor_config[param] = self.data[common_key]
-            elif param in self.common_params['defaults']:
-                editor_config[param] = self.common_params['defaults'][param]
-        
-        # Завантажуємо особисті параметри редактора
-        for param in self.editor_registry[editor_name]['params']:
-            personal_key = f"{editor_name.upper()}_{param.upper()}"
-            if personal_key in self.data:
-                editor_config[param] = self.data[personal_key]
-            elif param in self.editor_registry[editor_name]['defaults']:
-                editor_config[param] = self.editor_registry[editor_name]['defaults'][param]
+        with self._lock:
+            params = list(self.common_params['params'])
+            params += [p for p in self.editor_registry[editor_name]['params'] if p not in params]
+            for param in params:
+                value = self._resolve_param(editor_name, param)
+                if value is not _MISSING:
+                    editor_config[param] = value
+                for key in (f"COMMON_{param.upper()}", f"{editor_name.upper()}_{param.upper()}"):
+                    self._key_params.setdefault(key, []).append((editor_name, param))
+            self._views[editor_name] = editor_config
         
         self.logger.info(f"load_for_editor: Завантажено конфіг для {editor_name}: {len(editor_config)} параметрів")
         return editor_config
@@ -581,31 +795,67 @@ class ModularConfigManager:
             
         updated_params = []
         
-        for param, value in editor_data.items():
-            if param in self.editor_registry[editor_name]['params']:
-                personal_param = f"{editor_name.upper()}_{param.upper()}"
-                self.data[personal_param] = value
-                updated_params.append(personal_param)
+        with self._lock:
+            for param, value in editor_data.items():
+                if param in self.editor_registry[editor_name]['params']:
+                    personal_param = f"{editor_name.upper()}_{param.upper()}"
+                    self.data[personal_param] = value
+                    updated_params.append(personal_param)
+            self._mark_pending(updated_params)
+        
+        if updated_params and self.project_store is not None:
+            # Лише змінені рядки - паралельні редактори не затирають змін один одного
+            # data_version не змінюється від власних записів цього з'єднання, тож штамп
+            # не чіпаємо - інакше зникли б коміти інших редакторів, зроблені до нашого
+            self.project_store.set_values({key: self.data[key] for key in updated_params})
         
         if updated_params:
+            self._refresh_views(updated_params)
             self.save_full_config()
             self.logger.info(f"save_from_editor: Оновлено особисті параметри {editor_name}: {len(updated_params)} параметрів")
 
 #----save_full_config-----
-    def save_full_config(self, data: Dict[str, Any] = None):
-        """Зберігає повний конфіг у файл."""
-        if data is not None:
-            self.data = data
-            
-        try:
-            self.config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
-            self.logger.info(f"save_full_config: \nУспішно збережено конфіг: {self.config_file}")
-            return True
-        except Exception as e:
-            self.logger.error(f"save_full_config: \nПомилка збереження конфігу: {e}")
-            return False
+    def save_full_config(self, data: Dict[str, Any] = None, immediate: bool = False):
+        """
+        Зберігає повний конфіг у файл: запис відкладено до CONFIG_FLUSH_SECONDS,
+        зміни за цей час об'єднуються в один атомарний запис.
+        immediate=True - записати зараз.
+        """
+        changed = ()
+        with self._lock:
+            if data is not None:
+                changed = {key for key in self.data.keys() | data.keys()
+                           if self.data.get(key, _MISSING) != data.get(key, _MISSING)}
+                self.data = data
+                self._mark_pending(data)
+        if data is not None and self.project_store is not None:
+            # Штамп не оновлюємо (див. save_from_editor)
+            self.project_store.set_values(data)
+        if changed:
+            self._refresh_views(changed)
+        self._writer.mark_dirty()
+        if immediate:
+            return self.flush()
+        return True
+
+#----_serialize_config-----
+    def _serialize_config(self) -> str:
+        """Вміст файлу конфігу (викликається під self._lock); зі сховищем - його експорт."""
+        # Ключі знімка знімаються з незаписаних лише після успішного запису (_on_flushed)
+        self._written_keys = dict(self._pending_keys)
+        if self.project_store is not None:
+            return self.project_store.export_config_text()
+        return json.dumps(self.data, ensure_ascii=False, indent=2)
+
+#----flush-----
+    def flush(self) -> bool:
+        """Записує незбережені зміни конфігу зараз (закриття/пауза редактора)."""
+        return self._writer.flush()
+
+#----flush_stats-----
+    def flush_stats(self) -> Dict[str, Any]:
+        """Діагностика відкладеного запису: зміни, записи, об'єднані зміни, час запису."""
+        return self._writer.stats()
 
 #----update_bookmark-----
     def update_bookmark(self, editor_name: str, cursor_pos: int, scroll_y: float, paragraph_index: int):
@@ -661,8 +911,10 @@ def get_config_manager(book_project_name: str = None, input_text_file: str = Non
 
 #----reset_config_manager-----
 def reset_config_manager():
-    """Скидає глобальний екземпляр менеджера конфігурації."""
+    """Скидає глобальний екземпляр менеджера конфігурації (незаписані зміни зберігаються)."""
     global _global_config_manager
+    if _global_config_manager is not None:
+        _global_config_manager.flush()
     _global_config_manager = None
 
 __all__ = ['ModularConfigManager', 'ProjectManager', 'get_config_manager', 'reset_config_manager']
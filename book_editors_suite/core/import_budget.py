@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Бюджет часу імпорту headless-ядра.
+
+Кожен модуль імпортується в окремому чистому процесі (python -X importtime),
+час береться з останнього рядка звіту (сумарний час модуля з усіма його
+імпортами), найкращий з кількох запусків. Заодно перевіряється, що після
+імпорту не завантажено жодної важкої залежності (Kivy, pyjnius, pydub,
+NumPy, gTTS) - вони мають імпортуватися лише при першому використанні.
+
+Окремо вимірюється старт процесу пулу рендерингу: від створення пулу до
+відповіді процесу, який імпортував модулі збирання глави. Бюджет - на
+додатковий час понад порожній процес пулу (сам інтерпретатор і
+multiprocessing від нас не залежать).
+
+    python import_budget.py [бюджет_мс] [запусків]
+"""
+
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+# Модулі, що мають імпортуватися без Kivy та звукових/Android бібліотек
+HEADLESS_MODULES = (
+    "book_editors_suite.core.config_manager",
+    "book_editors_suite.core.base_editor",
+    "book_editors_suite.core.tts_manager",
+    "book_editors_suite.core.file_manager",
+    "book_editors_suite.core.text_processor",
+    "book_editors_suite.core.sound_effects_manager",
+    "book_editors_suite.core.text_normalizer",
+    "book_editors_suite.core.audio_validator",
+    "book_editors_suite.core.audio_merge",
+    "book_editors_suite.core.music_bed",
+    "book_editors_suite.core.book_assembler",
+    "book_editors_suite.core.synthesis_scheduler",
+)
+# Що імпортує процес пулу рендерингу глави
+RENDER_WORKER_MODULES = (
+    "book_editors_suite.core.audio_merge",
+    "book_editors_suite.core.music_bed",
+    "book_editors_suite.core.text_normalizer",
+)
+HEAVY_MODULES = ("kivy", "jnius", "pydub", "numpy", "gtts")
+
+# Сумарний час імпорту одного модуля та додатковий час старту процесу пулу (мс)
+IMPORT_BUDGET_MS = 60
+WORKER_START_BUDGET_MS = 40
+
+_PROBE = ("import sys, {module}\n"
+          "print(' '.join(m for m in {heavy!r} if m in sys.modules))")
+
+
+def measure_import(module: str, runs: int = 3) -> Dict:
+    """
+    Час імпорту модуля в чистому процесі: {'module', 'ms', 'heavy', 'error'}.
+    heavy - важкі залежності, завантажені під час імпорту.
+    """
+    best = None
+    heavy: List[str] = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                               _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            return {'module': module, 'ms': None, 'heavy': [],
+                    'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "помилка"}
+        # "import time: власний | сумарний | модуль" - останній рядок для самого модуля
+        rows = [line for line in proc.stderr.splitlines() if line.startswith("import time:")]
+        ms = int(rows[-1].split("|")[1]) / 1000
+        best = ms if best is None else min(best, ms)
+        heavy = proc.stdout.split()
+    return {'module': module, 'ms': best, 'heavy': heavy, 'error': None}
+
+
+def _import_modules(modules):
+    for module in modules:
+        __import__(module)
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def measure_worker_start(modules=RENDER_WORKER_MODULES, runs: int = 3) -> Optional[float]:
+    """
+    Найкращий час (мс) від створення пулу (spawn - найгірший випадок, новий
+    інтерпретатор) до відповіді процесу, що імпортував modules.
+    None - пул процесів недоступний.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    best = None
+    try:
+        context = multiprocessing.get_context("spawn")
+        for _ in range(runs):
+            started = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=1, mp_context=context,
+                                     initializer=_import_modules, initargs=(tuple(modules),)) as pool:
+                pool.submit(_ready).result()
+                ms = (time.perf_counter() - started) * 1000
+            best = ms if best is None else min(best, ms)
+    except (OSError, ImportError, NotImplementedError) as e:
+        print(f"Пул процесів недоступний: {e}")
+        return None
+    return best
+
+
+def check_budget(budget_ms: float = IMPORT_BUDGET_MS, runs: int = 3,
+                 modules=HEADLESS_MODULES) -> Dict:
+    """
+    Міряє всі модулі: {'modules': [...], 'over_budget': [...], 'heavy': [...], 'errors': [...]}.
+    """
+    results = [measure_import(module, runs) for module in modules]
+    return {
+        'modules': results,
+        'over_budget': [r['module'] for r in results if r['ms'] is not None and r['ms'] > budget_ms],
+        'heavy': [r['module'] for r in results if r['heavy']],
+        'errors': [r['module'] for r in results if r['error']],
+    }
+
+
+# ========== Перевірка бюджету з командного рядка ==========
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else IMPORT_BUDGET_MS
+    runs_arg = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    report = check_budget(budget, runs_arg)
+    print(f"Бюджет імпорту: {budget:.0f} мс на модуль, найкращий з {runs_arg} запусків")
+    for r in report['modules']:
+        if r['error']:
+            print(f"  {r['module']:<48} ПОМИЛКА: {r['error']}")
+            continue
+        mark = "  > бюджету" if r['ms'] > budget else ""
+        heavy = f"  завантажено: {', '.join(r['heavy'])}" if r['heavy'] else ""
+        print(f"  {r['module']:<48} {r['ms']:7.1f} мс{mark}{heavy}")
+
+    base_ms = measure_worker_start((), runs_arg)
+    worker_ms = measure_worker_start(runs=runs_arg)
+    extra_ms = None
+    if base_ms is not None and worker_ms is not None:
+        extra_ms = max(worker_ms - base_ms, 0.0)
+        mark = "  > бюджету" if extra_ms > WORKER_START_BUDGET_MS else ""
+        print(f"Старт процесу пулу рендерингу (spawn): {worker_ms:.1f} мс, порожній процес "
+              f"{base_ms:.1f} мс, модулі +{extra_ms:.1f} мс (бюджет {WORKER_START_BUDGET_MS} мс){mark}")
+
+    failed = report['over_budget'] or report['heavy'] or report['errors'] or (
+        extra_ms is not None and extra_ms > WORKER_START_BUDGET_MS)
+    sys.exit(1 if failed else 0)
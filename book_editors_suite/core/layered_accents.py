@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Шаровий словник наголосів: спільний (глобальний) для всіх книг і
+проєктний поверх нього.
+
+Глобальний словник лише читається (зазвичай бінарний .acdb через mmap),
+зміни в редакторі йдуть у проєктний шар. Обидва шари зводяться в один
+індекс (звичайний dict) при відкритті, тому пошук коштує як в одному словнику.
+
+Перенесення слів проєкту в глобальний словник (promote) та звіт про
+розбіжності шарів - функції нижче та командний рядок:
+
+    python layered_accents.py conflicts глобальний.acdb accents_files.json [звіт.tsv]
+    python layered_accents.py promote глобальний.acdb accents_files.json [слово ...]
+
+Без переліку слів promote не чіпає розбіжностей - їх переносять явно.
+"""
+
+import json
+import os
+import sys
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from book_editors_suite.core.accent_dict_binary import BINARY_SUFFIX, BinaryAccentDict, write_binary
+from book_editors_suite.core.accent_journal import AccentJournal, journal_path_for
+
+CONFLICTS_HEADER = "слово\tглобальний\tпроєкт"
+
+
+def open_accents_file(path):
+    """Словник з файлу: .acdb - через mmap, інакше JSON. Відсутній файл - порожній словник."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    if path.suffix == BINARY_SUFFIX:
+        return BinaryAccentDict(path)
+    with path.open('r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _items(accents) -> Iterator[Tuple[str, str]]:
+    if isinstance(accents, BinaryAccentDict):
+        return accents.iter_items()
+    return iter(accents.items())
+
+
+def write_accents_file(accents, path) -> int:
+    """Атомарно записує словник у формат за розширенням (.acdb або JSON)."""
+    path = Path(path)
+    if path.suffix == BINARY_SUFFIX:
+        return write_binary(accents, path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open('w', encoding='utf-8') as f:
+        json.dump(dict(_items(accents)), f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(accents)
+
+
+class LayeredAccents(MutableMapping):
+    """
+    Проєктний словник поверх глобального з єдиним індексом.
+    Запис і видалення змінюють лише проєктний шар (local).
+    """
+
+#-------------------------------------------
+    def __init__(self, global_accents, local_accents, logger=None):
+        self.global_accents = global_accents
+        self.local = local_accents
+        self.logger = logger
+        started = time.perf_counter()
+        self._index = dict(_items(global_accents))
+        self._index.update(local_accents)
+        if self.logger:
+            self.logger.info(f"LayeredAccents: Індекс словника: {len(self._index)} слів "
+                             f"(глобальний {len(global_accents)}, проєкт {len(local_accents)}) "
+                             f"за {time.perf_counter() - started:.2f} с")
+
+#-------------------------------------------
+    def __getitem__(self, key: str) -> str:
+        return self._index[key]
+
+#-------------------------------------------
+    def get(self, key, default=None):
+        return self._index.get(key, default)
+
+#-------------------------------------------
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+#-------------------------------------------
+    def __setitem__(self, key: str, value: str):
+        self.local[key] = value
+        self._index[key] = value
+
+#-------------------------------------------
+    def __delitem__(self, key: str):
+        """Видаляє слово з проєкту; якщо воно є в глобальному - повертається глобальне значення."""
+        del self.local[key]
+        value = self.global_accents.get(key)
+        if value is None:
+            del self._index[key]
+        else:
+            self._index[key] = value
+
+#-------------------------------------------
+    def __len__(self) -> int:
+        return len(self._index)
+
+#-------------------------------------------
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+#-------------------------------------------
+    @property
+    def index(self) -> Dict[str, str]:
+        """Зведений індекс шарів (лише для читання)."""
+        return self._index
+
+#-------------------------------------------
+    def items(self):
+        return self._index.items()
+
+#-------------------------------------------
+    def layer_of(self, key: str) -> Optional[str]:
+        """'local', 'global' або None - звідки береться значення слова."""
+        if key in self.local:
+            return 'local'
+        if key in self.global_accents:
+            return 'global'
+        return None
+
+#-------------------------------------------
+    def conflicts(self) -> List[Tuple[str, str, str]]:
+        """Слова, що є в обох шарах з різними наголосами: [(слово, глобальний, проєкт)]."""
+        found = []
+        for key, value in self.local.items():
+            global_value = self.global_accents.get(key)
+            if global_value is not None and global_value != value:
+                found.append((key, global_value, value))
+        return sorted(found)
+
+#-------------------------------------------
+    def redundant(self) -> List[str]:
+        """Слова проєкту, що дослівно повторюють глобальний словник."""
+        return sorted(k for k, v in self.local.items() if self.global_accents.get(k) == v)
+
+#-------------------------------------------
+    def local_only(self) -> List[str]:
+        """Слова, яких немає в глобальному словнику (кандидати на перенесення)."""
+        return sorted(k for k in self.local if k not in self.global_accents)
+
+#-------------------------------------------
+    def promote(self, global_path, keys: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Переносить слова проєкту у глобальний словник: файл переписується атомарно
+        і відкривається заново, слова зникають з проєктного шару.
+        Без keys переносяться всі слова, крім розбіжностей (їх - лише явно через keys).
+        Повертає перенесені слова. Проєктний шар після цього треба зберегти.
+        """
+        if keys is None:
+            keys = self.local_only() + self.redundant()
+        else:
+            keys = [k for k in keys if k in self.local]
+        promoted = {k: self.local[k] for k in keys}
+        if not promoted:
+            return promoted
+        merged = dict(_items(self.global_accents))
+        merged.update(promoted)
+        write_accents_file(merged, global_path)
+        if isinstance(self.global_accents, BinaryAccentDict):
+            self.global_accents.close()
+        self.global_accents = open_accents_file(global_path)
+        for key in promoted:
+            del self.local[key]
+        if self.logger:
+            self.logger.info(f"LayeredAccents: До глобального словника перенесено {len(promoted)} слів")
+        return promoted
+
+
+def write_conflicts_report(layered: LayeredAccents, report_path) -> Path:
+    """TSV з розбіжностями шарів: слово, глобальний наголос, проєктний наголос."""
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with report_path.open('w', encoding='utf-8') as f:
+        f.write(CONFLICTS_HEADER + "\n")
+        for key, global_value, local_value in layered.conflicts():
+            f.write(f"{key}\t{global_value}\t{local_value}\n")
+    return report_path
+
+
+def open_layered(global_path, local_path, logger=None) -> LayeredAccents:
+    """Шари з файлів; журнал змін проєктного словника відтворюється."""
+    local = open_accents_file(local_path)
+    if isinstance(local, BinaryAccentDict):
+        local = dict(local.iter_items())
+    AccentJournal(journal_path_for(local_path), logger).replay(local)
+    return LayeredAccents(open_accents_file(global_path), local, logger)
+
+
+# ========== Робота з шарами з командного рядка ==========
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) < 3 or args[0] not in ("conflicts", "promote"):
+        print(__doc__)
+        sys.exit(1)
+    command, global_file, local_file = args[:3]
+    layered = open_layered(global_file, local_file)
+
+    if command == "conflicts":
+        report = args[3] if len(args) > 3 else Path(local_file).with_name(Path(local_file).stem + "_розбіжності.tsv")
+        write_conflicts_report(layered, report)
+        print(f"Розбіжностей: {len(layered.conflicts())}, дублікатів глобального: "
+              f"{len(layered.redundant())}, лише в проєкті: {len(layered.local_only())} -> {report}")
+    else:
+        moved = layered.promote(global_file, args[3:] or None)
+        # Проєктний словник переписується, журнал очищається
+        def save_local(snapshot):
+            write_accents_file(snapshot, local_file)
+            return True
+
+        journal = AccentJournal(journal_path_for(local_file))
+        journal.replay({})
+        journal.compact(layered.local, save_local)
+        print(f"До глобального словника перенесено {len(moved)} слів: {global_file}")
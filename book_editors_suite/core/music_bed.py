@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Музична підкладка глави з автоматичним приглушенням (ducking) під мовою.
+
+Музика читається потоком (ffmpeg -stream_loop, або циклічно з WAV без ffmpeg)
+рівно стільки, скільки потрібно для поточного блоку, тому пам'ять не залежить
+від довжини глави. Огинаюча гучності рахується векторно в NumPy:
+експоненційна атака/відновлення між рівнями "музика" та "під мовою".
+
+Налаштування в конфігу проекту (MULTISPEAKER_TTS_MUSIC_BEDS):
+    {
+        "Назва_папки_глави": {"file": "/шлях/ambient.mp3", "gain_db": -18,
+                              "duck_db": -14, "attack_ms": 120, "release_ms": 600},
+        "*": {...}   # для всіх інших глав
+    }
+"""
+
+import subprocess
+import wave
+from pathlib import Path
+from typing import Dict, Optional
+
+from book_editors_suite.core.audio_merge import PcmWriter
+
+# NumPy імпортується при створенні першої підкладки - глави без музики
+# і процеси збирання книги його не завантажують
+np = None
+
+DEFAULT_BED = {
+    'gain_db': -18.0,
+    'duck_db': -14.0,
+    'attack_ms': 120,
+    'release_ms': 600,
+}
+
+
+def _load_numpy() -> bool:
+    """Імпортує NumPy у модуль (один раз); False - NumPy не встановлено."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+
+def find_bed_config(music_beds: Dict, chapter_name: str) -> Optional[Dict]:
+    """Підбирає налаштування підкладки для глави (або загальне '*')."""
+    if not music_beds:
+        return None
+    bed = music_beds.get(chapter_name) or music_beds.get('*')
+    if not bed or not bed.get('file'):
+        return None
+    config = dict(DEFAULT_BED)
+    config.update(bed)
+    return config
+
+
+def _db_to_gain(db: float) -> float:
+    return 10.0 ** (db / 20.0)
+
+
+class MusicBed:
+    """Потокове джерело музики та мікшування з приглушенням під мовою."""
+
+#-------------------------------------------
+    def __init__(self, bed_config: Dict, params: Dict, logger=None):
+        if not _load_numpy():
+            raise RuntimeError("Для музичної підкладки потрібен numpy")
+        if params['sample_width'] != 2:
+            raise ValueError("Музична підкладка мікшується тільки в 16-бітному PCM")
+
+        self.path = Path(bed_config['file'])
+        self.params = params
+        self.logger = logger
+        self.channels = params['channels']
+        self.frame_rate = params['frame_rate']
+
+        self.base_gain = _db_to_gain(float(bed_config['gain_db']))
+        self.duck_gain = _db_to_gain(float(bed_config['gain_db']) + float(bed_config['duck_db']))
+        self.attack = max(float(bed_config['attack_ms']), 1.0) * self.frame_rate / 1000.0
+        self.release = max(float(bed_config['release_ms']), 1.0) * self.frame_rate / 1000.0
+        self._gain = self.base_gain
+
+        self._proc = None
+        self._wave = None
+        self._open_source()
+
+#-------------------------------------------
+    def _open_source(self):
+        """Відкриває музику: ffmpeg з нескінченним циклом, або WAV напряму."""
+        try:
+            self._proc = subprocess.Popen(
+                [PcmWriter.ffmpeg_binary(), '-loglevel', 'error', '-stream_loop', '-1',
+                 '-i', str(self.path), '-f', 's16le',
+                 '-ar', str(self.frame_rate), '-ac', str(self.channels), '-'],
+                stdout=subprocess.PIPE
+            )
+        except OSError:
+            self._proc = None
+            w = wave.open(str(self.path), 'rb')
+            if (w.getframerate(), w.getnchannels(), w.getsampwidth()) != (self.frame_rate, self.channels, 2):
+                w.close()
+                raise ValueError(f"Без ffmpeg формат {self.path.name} має збігатися з форматом глави")
+            self._wave = w
+
+#-------------------------------------------
+    def _read_music(self, nbytes: int) -> bytes:
+        """Читає рівно nbytes музики (по колу)."""
+        chunks = []
+        remaining = nbytes
+        while remaining > 0:
+            if self._proc is not None:
+                data = self._proc.stdout.read(remaining)
+            else:
+                data = self._wave.readframes(remaining // (2 * self.channels))
+                if not data:
+                    self._wave.rewind()
+                    data = self._wave.readframes(remaining // (2 * self.channels))
+            if not data:
+                break
+            chunks.append(data)
+            remaining -= len(data)
+        music = b"".join(chunks)
+        if len(music) < nbytes:
+            music += bytes(nbytes - len(music))
+        return music
+
+#-------------------------------------------
+    def _segment(self, frames: int, target: float):
+        """Експоненційний перехід поточного рівня до target на frames кадрів."""
+        tau = self.attack if target < self._gain else self.release
+        env = target + (self._gain - target) * np.exp(-np.arange(1, frames + 1, dtype=np.float32) / tau)
+        if frames:
+            self._gain = float(env[-1])
+        return env
+
+#-------------------------------------------
+    def envelope(self, frames: int, speech: bool, next_speech: bool = False):
+        """
+        Огинаюча гучності музики для блоку.
+        Під мовою - рівень duck; у паузах/мелодіях - відновлення.
+        Якщо наступний блок - мова, приглушення починається за attack_ms до нього.
+        """
+        if speech:
+            return self._segment(frames, self.duck_gain)
+        pre = min(frames, int(self.attack)) if next_speech else 0
+        if not pre:
+            return self._segment(frames, self.base_gain)
+        return np.concatenate((self._segment(frames - pre, self.base_gain),
+                               self._segment(pre, self.duck_gain)))
+
+#-------------------------------------------
+    def mix(self, pcm: bytes, speech: bool, next_speech: bool = False) -> bytes:
+        """Мікшує музику з приглушенням у 16-бітний PCM блок."""
+        voice = np.frombuffer(pcm, dtype=np.int16)
+        frames = len(voice) // self.channels
+        music = np.frombuffer(self._read_music(len(voice) * 2), dtype=np.int16)
+        env = self.envelope(frames, speech, next_speech)
+        if self.channels > 1:
+            env = np.repeat(env, self.channels)
+        mixed = voice.astype(np.float32) + music.astype(np.float32) * env
+        np.clip(mixed, -32768, 32767, out=mixed)
+        return mixed.astype(np.int16).tobytes()
+
+#-------------------------------------------
+    def close(self):
+        """Зупиняє джерело музики."""
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc.stdout.close()
+            self._proc.wait()
+            self._proc = None
+        if self._wave is not None:
+            self._wave.close()
+            self._wave = None
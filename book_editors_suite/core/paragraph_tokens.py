@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Індекс слів абзацу: межі слів (WORD_RE), нормалізовані ключі та наявність наголосу.
+
+Будується один раз на абзац і спільний для редакторів наголосів, тегів голосів
+і звукових ефектів (через TextProcessor):
+    слово під курсором      - двійковий пошук за початками слів
+    заміна слова            - вставка в текст і перебудова лише сусідніх слів,
+                              межі решти зсуваються
+    невідомі слова          - слова без наголосу, яких немає в словнику
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+
+from book_editors_suite.utils.helpers import WORD_RE, strip_combining_acute
+
+ACUTE = '\u0301'
+UKR_VOWELS = "аеєиіїоуюяАЕЄИІЇОУЮЯ"
+
+
+class ParagraphTokens:
+    """Слова абзацу з межами, ключами словника та ознакою наголосу."""
+
+#-------------------------------------------
+    def __init__(self, text: str):
+        self.text = text
+        self.starts = array('I')
+        self.ends = array('I')
+        self.words: List[str] = []
+        self.keys: List[str] = []
+        self.accented: List[bool] = []
+        for match in WORD_RE.finditer(text):
+            self._add(match, self.starts, self.ends, self.words, self.keys, self.accented)
+
+#-------------------------------------------
+    @staticmethod
+    def _add(match, starts, ends, words, keys, accented):
+        word = match.group(0)
+        starts.append(match.start())
+        ends.append(match.end())
+        words.append(word)
+        has_accent = ACUTE in word
+        keys.append((strip_combining_acute(word) if has_accent else word).lower())
+        accented.append(has_accent)
+
+#-------------------------------------------
+    def __len__(self) -> int:
+        return len(self.words)
+
+#-------------------------------------------
+    def index_at(self, cursor: int) -> int:
+        """Номер слова, що містить позицію курсора або прилягає до неї (-1 - немає)."""
+        i = bisect_right(self.starts, cursor) - 1
+        if i >= 0 and cursor <= self.ends[i]:
+            return i
+        return -1
+
+#-------------------------------------------
+    def word_at(self, cursor: int) -> Tuple[Optional[str], int, int]:
+        """(слово, початок, кінець) під курсором або (None, 0, 0)."""
+        i = self.index_at(cursor)
+        if i < 0:
+            return None, 0, 0
+        return self.words[i], self.starts[i], self.ends[i]
+
+#-------------------------------------------
+    def splice(self, start: int, end: int, replacement: str) -> str:
+        """
+        Замінює text[start:end] на replacement і повертає новий текст.
+        Слова перебудовуються від сусіда перед заміною, доки не збіжуться
+        зі зсунутими старими (наголос чи апостроф після заміни може приєднатися
+        до слова), решта лише зсувається.
+        """
+        text = self.text[:start] + replacement + self.text[end:]
+        delta = len(replacement) - (end - start)
+        count = len(self.words)
+        lo = max(bisect_left(self.ends, start) - 1, 0)
+        hi = bisect_right(self.starts, end)
+        window_start = min(start, self.starts[lo]) if lo < count else start
+        window_end = end + delta
+
+        starts, ends = array('I'), array('I')
+        words, keys, accented = [], [], []
+        tail = count
+        for match in WORD_RE.finditer(text, window_start):
+            if match.start() >= window_end:
+                while hi < count and self.starts[hi] + delta < match.start():
+                    hi += 1
+                if hi < count and self.starts[hi] + delta == match.start() and self.ends[hi] + delta == match.end():
+                    tail = hi
+                    break
+            self._add(match, starts, ends, words, keys, accented)
+
+        self.starts = self.starts[:lo] + starts + array('I', (s + delta for s in self.starts[tail:]))
+        self.ends = self.ends[:lo] + ends + array('I', (e + delta for e in self.ends[tail:]))
+        self.words[lo:tail] = words
+        self.keys[lo:tail] = keys
+        self.accented[lo:tail] = accented
+        self.text = text
+        return text
+
+#-------------------------------------------
+    def replace_word(self, index: int, new_word: str) -> str:
+        """Замінює слово за номером і повертає новий текст."""
+        return self.splice(self.starts[index], self.ends[index], new_word)
+
+#-------------------------------------------
+    def unknown(self, accents, min_vowels: int = 2) -> List[int]:
+        """Номери слів без наголосу, яких немає в словнику (від min_vowels голосних)."""
+        found = []
+        for i, key in enumerate(self.keys):
+            if self.accented[i] or key in accents:
+                continue
+            if sum(1 for ch in key if ch in UKR_VOWELS) >= min_vowels:
+                found.append(i)
+        return found
+
+#-------------------------------------------
+    def spans(self, indices) -> List[Tuple[int, int]]:
+        """Межі слів за номерами: [(початок, кінець)]."""
+        return [(self.starts[i], self.ends[i]) for i in indices]
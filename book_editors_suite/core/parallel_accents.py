@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Паралельна розстановка наголосів для дуже великих текстів.
+
+Текст ділиться на частини по межах абзаців (слово ніколи не розрізається),
+частини обробляються в пулі процесів, результати збираються по порядку.
+Словник у задачі не передається: при fork процеси успадковують готовий
+AccentEngine батька (разом з таблицею форм), без fork - кожен процес один раз
+відкриває бінарний словник за шляхом (mmap) або отримує словник при старті.
+Перед запуском пулу об'єкти батька заморожуються (gc.freeze), щоб збирач
+сміття дочірніх процесів не торкався успадкованих сторінок.
+У роботі одночасно не більше MAX_PENDING_PER_WORKER частин на процес, тому
+пам'ять обмежена і для потокової обробки файлів.
+
+    python parallel_accents.py [МБ тексту] [процесів]     - порівняння з одним процесом
+"""
+
+import gc
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from book_editors_suite.core.accent_engine import AccentEngine
+from book_editors_suite.core.accent_dict_binary import BinaryAccentDict
+
+CHUNK_CHARS = 1024 * 1024
+MAX_PENDING_PER_WORKER = 2
+# Середня кількість символів на слово - для оцінки обсягу роботи
+CHARS_PER_WORD = 7
+
+# Рушій процесу пулу (успадкований при fork або створений ініціалізатором)
+_ENGINE = None
+
+
+def parallel_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def split_paragraph_chunks(text: str, chunk_chars: int = CHUNK_CHARS) -> Iterator[str]:
+    """Частини тексту приблизно по chunk_chars, що закінчуються на межі абзацу."""
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start + chunk_chars)
+        end = len(text) if end == -1 else end + 1
+        yield text[start:end]
+        start = end
+
+
+def _init_worker(source):
+    global _ENGINE
+    if _ENGINE is None:
+        accents = BinaryAccentDict(source) if isinstance(source, str) else source
+        _ENGINE = AccentEngine(accents)
+
+
+def _accent_chunk(chunk: str) -> str:
+    return _ENGINE.accent_text(chunk)
+
+
+def _worker_source(engine: AccentEngine):
+    """Що передати процесу без fork: шлях до незміненого бінарного словника або сам словник."""
+    accents = engine.accents
+    if isinstance(accents, BinaryAccentDict) and not accents.dirty:
+        return str(accents.path)
+    return dict(getattr(accents, 'index', accents))
+
+
+def iter_accent_parallel(chunks: Iterable[str], engine: AccentEngine,
+                         workers: Optional[int] = None) -> Iterator[str]:
+    """Обробляє частини в пулі процесів і віддає результати в порядку частин."""
+    global _ENGINE
+    workers = workers or parallel_workers()
+    methods = multiprocessing.get_all_start_methods()
+    if 'fork' in methods:
+        context = multiprocessing.get_context('fork')
+        source = None
+    else:
+        context = multiprocessing.get_context()
+        source = _worker_source(engine)
+
+    _ENGINE = engine
+    # Успадковані об'єкти (словник, таблиця форм) не чіпає збирач сміття процесів -
+    # інакше copy-on-write копіює їх у кожен процес
+    gc.freeze()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(source,)) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_accent_chunk, chunk))
+                if len(pending) >= workers * MAX_PENDING_PER_WORKER:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    finally:
+        _ENGINE = None
+        gc.unfreeze()
+
+
+def accent_text_parallel(text: str, engine: AccentEngine, workers: Optional[int] = None,
+                         chunk_chars: int = CHUNK_CHARS, logger=None) -> str:
+    """
+    Наголоси для великого тексту в кількох процесах.
+    Якщо пул процесів недоступний (Android, обмеження середовища) - в одному процесі.
+    """
+    started = time.perf_counter()
+    engine.prepare(len(text) // CHARS_PER_WORD)
+    try:
+        result = "".join(iter_accent_parallel(split_paragraph_chunks(text, chunk_chars), engine, workers))
+    except (OSError, ImportError, NotImplementedError, BrokenProcessPool) as e:
+        if logger:
+            logger.warning(f"accent_text_parallel: Пул процесів недоступний ({e}), обробка в одному процесі")
+        return engine.accent_text(text)
+    if logger:
+        logger.info(f"accent_text_parallel: {len(text) / (1 << 20):.1f} млн символів "
+                    f"за {time.perf_counter() - started:.2f} с")
+    return result
+
+
+def accent_file_parallel(input_path, output_path, engine: AccentEngine, workers: Optional[int] = None,
+                         chunk_chars: int = CHUNK_CHARS) -> int:
+    """
+    Потокова обробка файлу: читається частинами по цілих рядках, записується атомарно.
+    Повертає кількість записаних символів.
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    engine.prepare(Path(input_path).stat().st_size // (2 * CHARS_PER_WORD))
+
+    def read_chunks(f):
+        while True:
+            chunk = f.read(chunk_chars)
+            if not chunk:
+                return
+            if not chunk.endswith("\n"):
+                chunk += f.readline()
+            yield chunk
+
+    written = 0
+    with open(input_path, "r", encoding="utf-8", newline="") as src, \
+            open(tmp_path, "w", encoding="utf-8", newline="") as dst:
+        for accented in iter_accent_parallel(read_chunks(src), engine, workers):
+            dst.write(accented)
+            written += len(accented)
+    os.replace(tmp_path, output_path)
+    return written
+
+
+# ========== Порівняння з одним процесом ==========
+if __name__ == "__main__":
+    from book_editors_suite.core.accent_engine import synthetic_corpus
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 50
+    workers_arg = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    corpus, dictionary = synthetic_corpus(size_mb)
+    print(f"Текст: {size_mb} МБ, словник: {len(dictionary)} слів, процесів: {workers_arg or parallel_workers()}")
+
+    t0 = time.perf_counter()
+    serial = AccentEngine(dictionary).accent_text(corpus)
+    t1 = time.perf_counter()
+    parallel = accent_text_parallel(corpus, AccentEngine(dictionary), workers_arg)
+    t2 = time.perf_counter()
+    print(f"один процес: {t1 - t0:.2f} с, паралельно: {t2 - t1:.2f} с, збігається: {serial == parallel}")
@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+Необов'язкове транзакційне сховище проекту в SQLite (режим WAL).
+
+Замість перезапису цілих <проект>_config.json та sound_effects_list.json
+кожна зміна - це оновлення одного рядка в транзакції, тому редактори
+наголосів, тегів голосів, звукових ефектів і MultispeakerTTS можуть
+працювати з проектом одночасно: закладка одного не затирає закладку іншого.
+WAL дозволяє читати під час запису.
+
+Таблиці:
+    config          - ключі конфігу (значення в JSON), порядок ключів файлу
+    bookmarks       - закладки редакторів (<РЕДАКТОР>_BOOKMARK у конфігу)
+    sound_effects   - записи sound_effects_list.json
+    manifests       - маніфести рендерингу (книга, глави)
+
+Сховище вмикається, якщо поруч з конфігом є файл <проект>_project.db
+або в конфігу COMMON_PROJECT_STORE = true. При першому відкритті дані
+імпортуються з JSON, а JSON-файли і далі оновлюються експортом зі сховища
+(для інструментів, що читають JSON напряму).
+
+    python project_store.py init <проект>_config.json [sound_effects_list.json]
+    python project_store.py export <проект>_config.json [sound_effects_list.json]
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+from book_editors_suite.core.write_behind import atomic_write_text
+
+STORE_SUFFIX = "_project.db"
+CONFIG_SUFFIX = "_config.json"
+BOOKMARK_SUFFIX = "_BOOKMARK"
+STORE_FLAG = "COMMON_PROJECT_STORE"
+# Скільки чекати, поки інший процес завершить запис (с)
+BUSY_TIMEOUT = 10.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS config (
+    key TEXT PRIMARY KEY, value TEXT NOT NULL, position INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS bookmarks (
+    editor TEXT PRIMARY KEY, cursor INTEGER NOT NULL, scroll REAL NOT NULL,
+    paragraph_index INTEGER NOT NULL, position INTEGER NOT NULL, updated REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS sound_effects (
+    tag TEXT PRIMARY KEY, description TEXT NOT NULL, file_path TEXT NOT NULL,
+    position INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS manifests (
+    name TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL);
+"""
+
+
+def store_path_for(config_file) -> Path:
+    """Шлях до сховища поруч з конфігом: <проект>_config.json -> <проект>_project.db"""
+    config_file = Path(config_file)
+    name = config_file.name
+    base = name[:-len(CONFIG_SUFFIX)] if name.endswith(CONFIG_SUFFIX) else config_file.stem
+    return config_file.with_name(base + STORE_SUFFIX)
+
+
+def _bookmark_editor(key: str, value) -> Optional[str]:
+    """Назва редактора, якщо ключ конфігу - його закладка."""
+    if key.endswith(BOOKMARK_SUFFIX) and isinstance(value, dict):
+        return key[:-len(BOOKMARK_SUFFIX)].lower()
+    return None
+
+
+class ProjectStore:
+    """SQLite сховище конфігу, закладок, звукових ефектів і маніфестів проекту."""
+
+#-------------------------------------------
+    def __init__(self, path, logger=None):
+        if sqlite3 is None:
+            raise RuntimeError("sqlite3 недоступний")
+        self.path = Path(path)
+        self.logger = logger
+        # З'єднання SQLite не можна ділити між потоками - по одному на потік
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+#-------------------------------------------
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+#-------------------------------------------
+    @contextmanager
+    def _transaction(self):
+        """Транзакція запису (BEGIN IMMEDIATE - одразу бере блокування запису)."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+#-------------------------------------------
+    def close(self):
+        """Закриває з'єднання поточного потоку."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+#-------------------------------------------
+    @staticmethod
+    def _next_position(conn) -> int:
+        row = conn.execute("SELECT MAX(p) FROM (SELECT MAX(position) AS p FROM config "
+                           "UNION ALL SELECT MAX(position) FROM bookmarks)").fetchone()
+        return (row[0] or 0) + 1
+
+#-------------------------------------------
+    def is_empty(self) -> bool:
+        """Чи ще не імпортовано конфіг."""
+        conn = self._connection()
+        return (conn.execute("SELECT 1 FROM config LIMIT 1").fetchone() is None
+                and conn.execute("SELECT 1 FROM bookmarks LIMIT 1").fetchone() is None)
+
+#-------------------------------------------
+    def data_version(self) -> int:
+        """
+        Лічильник змін сховища іншими з'єднаннями (PRAGMA data_version) -
+        власні записи його не змінюють. Порівнювати лише в межах одного потоку.
+        """
+        return self._connection().execute("PRAGMA data_version").fetchone()[0]
+
+# ========== Конфіг ==========
+#-------------------------------------------
+    def _set_values(self, conn, updates: Dict[str, Any]):
+        now = time.time()
+        for key, value in updates.items():
+            editor = _bookmark_editor(key, value)
+            if editor is not None:
+                self._set_bookmark(conn, editor, value.get('cursor', 0), value.get('scroll', 0.0),
+                                   value.get('paragraph_index', 0), now)
+                continue
+            conn.execute(
+                "INSERT INTO config (key, value, position) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, json.dumps(value, ensure_ascii=False), self._next_position(conn)))
+
+#-------------------------------------------
+    def set_values(self, updates: Dict[str, Any]):
+        """Оновлює ключі конфігу (закладки <РЕДАКТОР>_BOOKMARK - у таблиці закладок)."""
+        with self._transaction() as conn:
+            self._set_values(conn, updates)
+
+#-------------------------------------------
+    def delete_values(self, keys: Iterable[str]):
+        """Видаляє ключі конфігу."""
+        with self._transaction() as conn:
+            for key in keys:
+                conn.execute("DELETE FROM config WHERE key = ?", (key,))
+                if key.endswith(BOOKMARK_SUFFIX):
+                    conn.execute("DELETE FROM bookmarks WHERE editor = ?",
+                                 (key[:-len(BOOKMARK_SUFFIX)].lower(),))
+
+#-------------------------------------------
+    def get_value(self, key: str, default=None):
+        """Значення одного ключа конфігу."""
+        if key.endswith(BOOKMARK_SUFFIX):
+            bookmark = self.get_bookmark(key[:-len(BOOKMARK_SUFFIX)].lower())
+            if bookmark is not None:
+                return bookmark
+        row = self._connection().execute("SELECT value FROM config WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+#-------------------------------------------
+    def get_config(self) -> Dict[str, Any]:
+        """Увесь конфіг у вигляді <проект>_config.json (у порядку ключів файлу)."""
+        conn = self._connection()
+        rows = [(position, key, json.loads(value)) for key, value, position in
+                conn.execute("SELECT key, value, position FROM config")]
+        rows.extend((position, editor.upper() + BOOKMARK_SUFFIX,
+                     {'cursor': cursor, 'scroll': scroll, 'paragraph_index': paragraph_index})
+                    for editor, cursor, scroll, paragraph_index, position in
+                    conn.execute("SELECT editor, cursor, scroll, paragraph_index, position FROM bookmarks"))
+        rows.sort(key=lambda row: row[0])
+        return {key: value for _, key, value in rows}
+
+# ========== Закладки ==========
+#-------------------------------------------
+    def _set_bookmark(self, conn, editor: str, cursor: int, scroll: float, paragraph_index: int, now: float):
+        conn.execute(
+            "INSERT INTO bookmarks (editor, cursor, scroll, paragraph_index, position, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(editor) DO UPDATE SET cursor = excluded.cursor, "
+            "scroll = excluded.scroll, paragraph_index = excluded.paragraph_index, updated = excluded.updated",
+            (editor, int(cursor), float(scroll), int(paragraph_index), self._next_position(conn), now))
+
+#-------------------------------------------
+    def set_bookmark(self, editor: str, cursor: int, scroll: float, paragraph_index: int):
+        """Оновлює закладку одного редактора (інші закладки не чіпає)."""
+        with self._transaction() as conn:
+            self._set_bookmark(conn, editor, cursor, scroll, paragraph_index, time.time())
+
+#-------------------------------------------
+    def get_bookmark(self, editor: str) -> Optional[Dict[str, Any]]:
+        """Закладка редактора {'cursor', 'scroll', 'paragraph_index'} або None."""
+        row = self._connection().execute(
+            "SELECT cursor, scroll, paragraph_index FROM bookmarks WHERE editor = ?", (editor,)).fetchone()
+        if row is None:
+            return None
+        return {'cursor': row[0], 'scroll': row[1], 'paragraph_index': row[2]}
+
+# ========== Звукові ефекти ==========
+#-------------------------------------------
+    def read_sound_effects(self) -> Dict[str, Dict[str, str]]:
+        """Звукові ефекти у вигляді sound_effects_list.json: {тег: {'description', 'file_path'}}."""
+        return {tag: {'description': description, 'file_path': file_path}
+                for tag, description, file_path in self._connection().execute(
+                    "SELECT tag, description, file_path FROM sound_effects ORDER BY position")}
+
+#-------------------------------------------
+    def put_sound_effect(self, tag: str, description: str, file_path: str):
+        """Додає або оновлює один звуковий ефект."""
+        with self._transaction() as conn:
+            position = (conn.execute("SELECT MAX(position) FROM sound_effects").fetchone()[0] or 0) + 1
+            conn.execute(
+                "INSERT INTO sound_effects (tag, description, file_path, position) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(tag) DO UPDATE SET description = excluded.description, "
+                "file_path = excluded.file_path",
+                (tag, description, file_path, position))
+
+#-------------------------------------------
+    def delete_sound_effect(self, tag: str) -> bool:
+        """Видаляє звуковий ефект. False - тегу немає."""
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM sound_effects WHERE tag = ?", (tag,)).rowcount > 0
+
+#-------------------------------------------
+    def reorder_sound_effects(self, tags: List[str]):
+        """Задає порядок звукових ефектів (теги поза списком - в кінці)."""
+        with self._transaction() as conn:
+            for position, tag in enumerate(tags, 1):
+                conn.execute("UPDATE sound_effects SET position = ? WHERE tag = ?", (position, tag))
+
+#-------------------------------------------
+    def _replace_sound_effects(self, conn, sound_effects: Dict[str, Dict[str, str]]):
+        conn.execute("DELETE FROM sound_effects")
+        conn.executemany(
+            "INSERT INTO sound_effects (tag, description, file_path, position) VALUES (?, ?, ?, ?)",
+            [(tag, entry.get('description', ''), entry.get('file_path', ''), position)
+             for position, (tag, entry) in enumerate(sound_effects.items(), 1)])
+
+# ========== Маніфести рендерингу ==========
+#-------------------------------------------
+    def save_manifest(self, name: str, data: Any):
+        """Зберігає маніфест (книги чи глави) під назвою name."""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO manifests (name, data, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET data = excluded.data, updated = excluded.updated",
+                (name, json.dumps(data, ensure_ascii=False), time.time()))
+
+#-------------------------------------------
+    def load_manifest(self, name: str):
+        """Маніфест за назвою або None."""
+        row = self._connection().execute("SELECT data FROM manifests WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+# ========== Імпорт та експорт JSON ==========
+#-------------------------------------------
+    def import_json(self, config_path=None, sound_effects_path=None) -> Dict[str, int]:
+        """
+        Імпортує конфіг і список звукових ефектів з JSON в одній транзакції
+        (наявні ключі перезаписуються). Повертає кількість імпортованих записів.
+        """
+        config, sound_effects = {}, None
+        if config_path and Path(config_path).exists():
+            with open(config_path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        if sound_effects_path and Path(sound_effects_path).exists():
+            with open(sound_effects_path, "r", encoding="utf-8") as f:
+                sound_effects = json.load(f).get("sound_effects", {})
+        with self._transaction() as conn:
+            self._set_values(conn, config)
+            if sound_effects is not None:
+                self._replace_sound_effects(conn, sound_effects)
+        if self.logger:
+            self.logger.info(f"ProjectStore: Імпортовано в {self.path.name}: {len(config)} ключів конфігу, "
+                             f"{len(sound_effects or {})} звукових ефектів")
+        return {'config': len(config), 'sound_effects': len(sound_effects or {})}
+
+#-------------------------------------------
+    def export_config_text(self) -> str:
+        """Конфіг у форматі <проект>_config.json."""
+        return json.dumps(self.get_config(), ensure_ascii=False, indent=2)
+
+#-------------------------------------------
+    def export_sound_effects_text(self) -> str:
+        """Звукові ефекти у форматі sound_effects_list.json."""
+        return json.dumps({"sound_effects": self.read_sound_effects()}, ensure_ascii=False, indent=2)
+
+#-------------------------------------------
+    def export_json(self, config_path=None, sound_effects_path=None):
+        """Атомарно записує сховище назад у JSON-файли проекту."""
+        if config_path:
+            atomic_write_text(config_path, self.export_config_text())
+        if sound_effects_path:
+            atomic_write_text(sound_effects_path, self.export_sound_effects_text())
+
+
+def open_project_store(config_file, create: bool = False, logger=None) -> Optional[ProjectStore]:
+    """
+    Сховище проекту поруч з конфігом, якщо воно вже є (або create=True).
+    None - сховище не ввімкнено, sqlite3 недоступний або помилка відкриття.
+    """
+    path = store_path_for(config_file)
+    if sqlite3 is None or not (create or path.exists()):
+        return None
+    try:
+        store = ProjectStore(path, logger)
+        if store.is_empty():
+            store.import_json(config_file)
+        return store
+    except Exception as e:
+        if logger:
+            logger.error(f"open_project_store: Помилка відкриття {path}: {e}")
+        return None
+
+
+# ========== Створення та експорт з командного рядка ==========
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("init", "export"):
+        print(__doc__)
+        sys.exit(1)
+    config_arg = sys.argv[2]
+    effects_arg = sys.argv[3] if len(sys.argv) > 3 else None
+    if sys.argv[1] == "init":
+        project_store = ProjectStore(store_path_for(config_arg))
+        counts = project_store.import_json(config_arg, effects_arg)
+        print(f"Створено {project_store.path}: {counts['config']} ключів конфігу, "
+              f"{counts['sound_effects']} звукових ефектів")
+    else:
+        project_store = open_project_store(config_arg)
+        if project_store is None:
+            print(f"Сховище не знайдено: {store_path_for(config_arg)}")
+            sys.exit(1)
+        project_store.export_json(config_arg, effects_arg)
+        print(f"Експортовано {project_store.path} -> {config_arg}" + (f", {effects_arg}" if effects_arg else ""))
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 """
 Менеджер для роботи з sound_effects_list.json
+
+Якщо передано сховище проекту (project_store), ефекти зберігаються в ньому
+по одному запису, а sound_effects_list.json оновлюється його експортом.
 """
 # Файл: /storage/emulated/0/a0_sb2_book_editors_suite/book_editors_suite/core/sound_effects_manager.py
 
@@ -11,14 +14,24 @@ import re
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from book_editors_suite.core.write_behind import WriteBehindFile
+
 
 class SoundEffectsManager:
     """Менеджер для роботи з sound_effects_list.json"""
     
-    def __init__(self, sound_effects_list_path: str, logger=None):
+    def __init__(self, sound_effects_list_path: str, logger=None, project_store=None):
         self.sound_effects_list_path = sound_effects_list_path
         self.logger = logger
+        self.project_store = project_store
+        self._export = None
         self.create_sound_effects_list_if_not_exists()
+        if project_store is not None:
+            # JSON - експорт сховища для MultispeakerTTS (відкладений, атомарний)
+            self._export = WriteBehindFile(sound_effects_list_path, project_store.export_sound_effects_text,
+                                           logger=logger)
+            if not project_store.read_sound_effects():
+                project_store.import_json(sound_effects_path=sound_effects_list_path)
     
     def create_sound_effects_list_if_not_exists(self) -> bool:
         """Створити файл sound_effects_list.json якщо не знайдено"""
@@ -45,6 +58,9 @@ class SoundEffectsManager:
     def read_sound_effects_list(self) -> Dict[str, Dict[str, str]]:
         """Прочитати з sound_effects_list.json"""
         try:
+            if self.project_store is not None:
+                return self.project_store.read_sound_effects()
+
             if not os.path.exists(self.sound_effects_list_path):
                 if self.logger:
                     self.logger.warning("Файл sound_effects_list.json не знайдено")
@@ -64,6 +80,11 @@ class SoundEffectsManager:
     def add_or_update_sound_effect(self, tag: str, description: str, file_path: str) -> bool:
         """Додати/оновити значення у sound_effects_list.json"""
         try:
+            if self.project_store is not None:
+                self.project_store.put_sound_effect(tag, description, file_path)
+                self._export.mark_dirty()
+                return True
+
             sound_effects = self.read_sound_effects_list()
             
             # Оновлюємо або додаємо запис
@@ -82,6 +103,14 @@ class SoundEffectsManager:
     def delete_sound_effect(self, tag: str) -> bool:
         """Видалити вказане значення з sound_effects_list.json"""
         try:
+            if self.project_store is not None:
+                if self.project_store.delete_sound_effect(tag):
+                    self._export.mark_dirty()
+                    return True
+                if self.logger:
+                    self.logger.warning(f"Тег {tag} не знайдено для видалення")
+                return False
+
             sound_effects = self.read_sound_effects_list()
             
             if tag in sound_effects:
@@ -112,6 +141,11 @@ class SoundEffectsManager:
                 key=lambda x: get_tag_number(x[0])
             ))
             
+            if self.project_store is not None:
+                self.project_store.reorder_sound_effects(list(sorted_effects))
+                self._export.mark_dirty()
+                return True
+            
             return self._save_sound_effects_list(sorted_effects)
             
         except Exception as e:
@@ -136,6 +170,12 @@ class SoundEffectsManager:
                 self.logger.error(f"Помилка збереження sound_effects_list.json: {e}")
             return False
     
+    def flush(self) -> bool:
+        """Записати відкладений експорт сховища у sound_effects_list.json"""
+        if self._export is None:
+            return True
+        return self._export.flush()
+    
     def get_sound_effect(self, tag: str) -> Optional[Dict[str, str]]:
         """Отримати інформацію про конкретний звуковий ефект"""
         sound_effects = self.read_sound_effects_list()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Планування черги синтезу за голосами.
+
+Фрагменти озвучуються не в порядку тексту, а пакетами (голос, швидкість),
+щоб локальні рушії TTS рідше перезавантажували моделі голосів.
+Ім'я вихідного файлу кожного завдання фіксується при додаванні в чергу,
+тому нумерація фрагментів і порядок об'єднання не змінюються.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+def voice_key(job: Dict) -> Tuple:
+    """Ключ пакета: (голос, швидкість). Копії пауз/мелодій мають ключ (None, None)."""
+    if job.get('kind') != 'speech':
+        return (None, None)
+    return (job.get('voice'), job.get('speed', 'normal'))
+
+
+def count_voice_switches(jobs: List[Dict], last_key: Optional[Tuple] = None) -> int:
+    """Кількість перемикань голосу при озвучуванні завдань у заданому порядку."""
+    switches = 0
+    for job in jobs:
+        if job.get('kind') != 'speech':
+            continue
+        key = voice_key(job)
+        if last_key is not None and key != last_key:
+            switches += 1
+        last_key = key
+    return switches
+
+
+def schedule_by_voice(jobs: List[Dict], last_key: Optional[Tuple] = None) -> List[Dict]:
+    """
+    Групує завдання за (голос, швидкість), зберігаючи порядок тексту всередині групи.
+    Групи йдуть у порядку першої появи; група поточного голосу (last_key) - першою,
+    щоб не перемикати голос на межі пакетів. Копії пауз/мелодій - в кінці.
+    """
+    groups = {}
+    for job in jobs:
+        groups.setdefault(voice_key(job), []).append(job)
+
+    order = [key for key in groups if key != (None, None)]
+    if last_key in groups and last_key != (None, None):
+        order.remove(last_key)
+        order.insert(0, last_key)
+    if (None, None) in groups:
+        order.append((None, None))
+    return [job for key in order for job in groups[key]]
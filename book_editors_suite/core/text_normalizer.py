@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+Нормалізація тексту за профілями: назви тек і файлів, назви глав для фрагментів,
+текст для TTS.
+
+Правила профілю описуються один раз і компілюються в:
+    один регулярний вираз   - усі шаблони як іменовані групи в одній альтернативі,
+                              заміна за назвою групи (рядок або функція); шаблони
+                              зі спільним першим символом ('#') збираються під
+                              ним - re шукає цей символ швидким проходом, а не
+                              пробує кожну гілку на кожній позиції
+    заміни символів         - пари (символ, заміна); застосовуються лише символи,
+                              що є в рядку (кілька str.replace швидші за
+                              str.translate, як і в batch_text)
+    таблицю str.translate   - для класу дозволених символів (keep): символи поза
+                              ним додаються в таблицю при першій зустрічі
+Рядок проходить регулярний вираз один раз, потім strip, заміни символів і
+translate - замість ланцюжка з десятка re.sub/str.replace.
+
+    python text_normalizer.py [текст.txt]     - порівняння з попередніми ланцюжками
+"""
+
+import re
+import sys
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
+
+Replacement = Union[str, Callable[[str], str]]
+
+# ========== Числа словами ==========
+
+_UNITS = ("нуль", "один", "два", "три", "чотири", "п'ять", "шість", "сім", "вісім", "дев'ять")
+_UNITS_FEMININE = ("нуль", "одна", "дві") + _UNITS[3:]
+_TEENS = ("десять", "одинадцять", "дванадцять", "тринадцять", "чотирнадцять", "п'ятнадцять",
+          "шістнадцять", "сімнадцять", "вісімнадцять", "дев'ятнадцять")
+_TENS = ("", "", "двадцять", "тридцять", "сорок", "п'ятдесят", "шістдесят", "сімдесят",
+         "вісімдесят", "дев'яносто")
+_HUNDREDS = ("", "сто", "двісті", "триста", "чотириста", "п'ятсот", "шістсот", "сімсот",
+             "вісімсот", "дев'ятсот")
+# (одна, дві-чотири, багато, жіночий рід)
+_SCALES = ((10 ** 9, ("мільярд", "мільярди", "мільярдів"), False),
+           (10 ** 6, ("мільйон", "мільйони", "мільйонів"), False),
+           (10 ** 3, ("тисяча", "тисячі", "тисяч"), True))
+
+
+def _plural(n: int, forms: Tuple[str, str, str]) -> str:
+    if 11 <= n % 100 <= 14:
+        return forms[2]
+    if n % 10 == 1:
+        return forms[0]
+    if 2 <= n % 10 <= 4:
+        return forms[1]
+    return forms[2]
+
+
+def _below_thousand(n: int, feminine: bool = False) -> list:
+    words = []
+    if n >= 100:
+        words.append(_HUNDREDS[n // 100])
+        n %= 100
+    if 10 <= n < 20:
+        words.append(_TEENS[n - 10])
+        return words
+    if n >= 20:
+        words.append(_TENS[n // 10])
+        n %= 10
+    if n:
+        words.append((_UNITS_FEMININE if feminine else _UNITS)[n])
+    return words
+
+
+def number_to_words(n: int) -> str:
+    """Ціле число словами (кількісний числівник, називний відмінок): 2021 -> дві тисячі двадцять один."""
+    if n == 0:
+        return _UNITS[0]
+    if n >= 10 ** 12:
+        return " ".join(_UNITS[int(d)] for d in str(n))
+    words = []
+    for scale, forms, feminine in _SCALES:
+        if n >= scale:
+            count = n // scale
+            words += _below_thousand(count, feminine)
+            words.append(_plural(count, forms))
+            n %= scale
+    words += _below_thousand(n)
+    return " ".join(words)
+
+
+_DIGIT_GROUP_SPACE = re.compile("[ \u00a0\u202f]")
+
+
+def number_text_to_words(text: str) -> str:
+    """Запис числа з тексту: '2021', '007', '3,25', '10 000' -> словами."""
+    whole, _, fraction = text.partition(",")
+    # Розряди, відокремлені пробілами: '1 000 000'
+    whole = _DIGIT_GROUP_SPACE.sub("", whole)
+    if len(whole) > 1 and whole.startswith("0"):
+        spoken = " ".join(_UNITS[int(d)] for d in whole)
+    else:
+        spoken = number_to_words(int(whole))
+    if fraction:
+        spoken += " кома " + number_text_to_words(fraction)
+    return spoken
+
+
+# ========== Нормалізатор ==========
+
+class _KeepTable(dict):
+    """Таблиця str.translate: символи поза дозволеним класом замінюються на replacement."""
+
+    def __init__(self, keep: "re.Pattern", replacement: str):
+        super().__init__()
+        self._keep = keep
+        self._replacement = replacement
+
+    def __missing__(self, code: int) -> str:
+        char = chr(code)
+        value = char if self._keep.fullmatch(char) else self._replacement
+        self[code] = value
+        return value
+
+
+_REGEX_SPECIAL = set("\\.^$*+?{}[]|()")
+
+
+def _combine_rules(rules) -> str:
+    """Альтернатива правил; правила з однаковим літеральним першим символом - під спільним префіксом."""
+    branches = {}
+    for name, pattern, _ in rules:
+        first = pattern[:1]
+        literal = first and first not in _REGEX_SPECIAL and pattern[1:2] not in ("*", "+", "?", "{")
+        branches.setdefault(first if literal else name, []).append((name, pattern))
+    parts = []
+    for group in branches.values():
+        if len(group) == 1:
+            name, pattern = group[0]
+            parts.append(f"(?P<{name}>{pattern})")
+        else:
+            prefix = re.escape(group[0][1][0])
+            parts.append(prefix + "(?:" + "|".join(f"(?P<{name}>{pattern[1:]})" for name, pattern in group) + ")")
+    return "|".join(parts)
+
+
+class Normalizer:
+    """
+    Скомпільований профіль нормалізації.
+    rules       - [(назва, шаблон, заміна)]: шаблони без іменованих груп,
+                  заміна - рядок або функція від знайденого тексту
+    char_map    - {символ: заміна}, '' - видалити символ
+    keep        - клас дозволених символів (наприклад r"[\\w-]"), інші -> keep_replacement
+    triggers    - символи, без яких жоден шаблон не збігається: рядок без них
+                  регулярний вираз не проходить
+    fallback    - результат для порожнього рядка
+    """
+
+#-------------------------------------------
+    def __init__(self, name: str, rules: Iterable[Tuple[str, str, Replacement]] = (),
+                 char_map: Optional[Dict[str, str]] = None, strip: bool = True,
+                 keep: Optional[str] = None, keep_replacement: str = "_", triggers: Optional[str] = None,
+                 fallback: str = ""):
+        self.name = name
+        rules = list(rules)
+        self._replacements = {rule_name: replacement for rule_name, _, replacement in rules}
+        self._regex = re.compile(_combine_rules(rules)) if rules else None
+        self._char_pairs = tuple((char_map or {}).items())
+        self._table = _KeepTable(re.compile(keep), keep_replacement) if keep else None
+        self._triggers = triggers
+        self._strip = strip
+        self._fallback = fallback
+
+#-------------------------------------------
+    def _replace(self, match) -> str:
+        replacement = self._replacements[match.lastgroup]
+        return replacement if isinstance(replacement, str) else replacement(match.group())
+
+#-------------------------------------------
+    def __call__(self, text: str) -> str:
+        if self._regex is not None and (self._triggers is None or any(ch in text for ch in self._triggers)):
+            text = self._regex.sub(self._replace, text)
+        if self._strip:
+            text = text.strip()
+        for char, replacement in self._char_pairs:
+            if char in text:
+                text = text.replace(char, replacement)
+        if self._table is not None:
+            text = text.translate(self._table)
+        return text or self._fallback
+
+
+# ========== Профілі ==========
+
+# "##" - лише на початку рядка
+TAG_RULES = (
+    ("heading", r"#(?<=\A#)#\s*", ""),
+    ("voice_tag", r"#(?i:g\d+(?:_(?:slow|fast))?:)", ""),
+    ("sound_tag", r"#(?i:S\d+:)", ""),
+)
+
+ABBREVIATIONS = {
+    "т.д.": "так далі",
+    "т.п.": "тому подібне",
+    "т.зв.": "так званий",
+    "напр.": "наприклад",
+    "див.": "дивись",
+    "ім.": "імені",
+    "вул.": "вулиця",
+    "проф.": "професор",
+    "тис.": "тисяч",
+    "млн": "мільйонів",
+    "млрд": "мільярдів",
+    "грн": "гривень",
+    "коп.": "копійок",
+    "км": "кілометрів",
+    "кг": "кілограмів",
+}
+
+
+def _abbreviation_pattern(abbreviations: Dict[str, str]) -> str:
+    """Скорочення (пробіл після внутрішніх крапок необов'язковий), довші - першими."""
+    parts = []
+    for key in sorted(abbreviations, key=len, reverse=True):
+        body = re.escape(key.rstrip(".")).replace(r"\.", r"\.\s?")
+        parts.append(body + (r"\." if key.endswith(".") else r"(?!\w)"))
+    return r"(?<![\w.])(?:" + "|".join(parts) + ")"
+
+
+def _expand_abbreviation(text: str) -> str:
+    return ABBREVIATIONS["".join(text.split())]
+
+
+TTS_RULES = TAG_RULES + (
+    ("abbreviation", _abbreviation_pattern(ABBREVIATIONS), _expand_abbreviation),
+    # Спершу числа з розрядами через пробіл ('10 000'), інакше їх прочитано б по групах
+    ("grouped_number", r"\d{1,3}(?:[ \u00a0\u202f]\d{3})+(?!\d)(?:,\d+)?", number_text_to_words),
+    ("number", r"\d+(?:,\d+)?", number_text_to_words),
+    # '+' як позначка наголосу біля літери
+    ("stress_plus", r"(?<=[^\W\d_])\+|\+(?=[^\W\d_])", ""),
+    ("spaces", r"[ \t]{2,}", " "),
+)
+
+INVISIBLE_CHARS = {'\ufeff': '', '\u200b': '', '\u200c': '', '\u200d': '', '\u00ad': '',
+                   '\u00a0': ' ', '\u202f': ' '}
+
+PROFILES = {
+    # Назва теки глави: без тегів, наголосів і розділових знаків, пробіли -> '_'
+    'folder_name': Normalizer(
+        'folder_name', TAG_RULES, triggers="#",
+        char_map={'\u0301': '', "'": '', ',': '', '.': '', '+': '', ' ': '_',
+                  **{char: '_' for char in '\\/:*?"<>|'}},
+        fallback="Глава"),
+    # Назва глави для фрагментів: лише без тегів
+    'fragment_title': Normalizer('fragment_title', TAG_RULES, triggers="#"),
+    # Назва файлу: усе, крім літер, цифр, '_' і '-', -> '_'
+    'filename': Normalizer('filename', TAG_RULES, keep=r"[\w-]", triggers="#", fallback="Глава"),
+    # Текст для TTS: числа та скорочення словами, без '+' і невидимих символів
+    'tts': Normalizer('tts', TTS_RULES, char_map=INVISIBLE_CHARS),
+}
+
+
+def normalize(text: str, profile: str) -> str:
+    """Нормалізує текст за профілем з PROFILES."""
+    return PROFILES[profile](text)
+
+
+# ========== Попередні ланцюжки - для порівняння ==========
+
+def sanitize_folder_name_legacy(s: str) -> str:
+    s2 = re.sub(r"^##\s*", "", s)
+    s2 = re.sub(r"#g\d+(?:_(slow|fast))?:", "", s2, flags=re.IGNORECASE)
+    s2 = re.sub(r"#S\d+:", "", s2, flags=re.IGNORECASE)
+    s2 = s2.strip()
+    s2 = s2.replace('\u0301', '')
+    s2 = s2.replace("'", '')
+    s2 = s2.replace(' ', '_')
+    s2 = s2.replace(',', '')
+    s2 = s2.replace('.', '')
+    s2 = s2.replace('+', '')
+    s2 = re.sub(r"[\\/:*?\"<>|]", "_", s2)
+    return s2 or "Глава"
+
+
+def sanitize_fragment_title_legacy(s: str) -> str:
+    s2 = re.sub(r"^##\s*", "", s)
+    s2 = re.sub(r"#g\d+(?:_(slow|fast))?:", "", s2, flags=re.IGNORECASE)
+    s2 = re.sub(r"#S\d+:", "", s2, flags=re.IGNORECASE)
+    return s2.strip()
+
+
+def benchmark(lines, label: str, repeat: int = 3) -> Dict:
+    """Порівнює профілі з попередніми ланцюжками на рядках тексту."""
+    lines = list(lines)
+    pairs = (('folder_name', sanitize_folder_name_legacy), ('fragment_title', sanitize_fragment_title_legacy))
+    stats = {}
+    for profile, legacy in pairs:
+        normalizer = PROFILES[profile]
+        started = time.perf_counter()
+        for _ in range(repeat):
+            expected = [legacy(line) for line in lines]
+        legacy_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = [normalizer(line) for line in lines]
+        seconds = time.perf_counter() - started
+        stats[profile] = {
+            'legacy_lps': round(repeat * len(lines) / legacy_seconds) if legacy_seconds else 0,
+            'lps': round(repeat * len(lines) / seconds) if seconds else 0,
+            'identical': result == expected,
+        }
+        print(f"{label}, {profile}: ланцюжок {stats[profile]['legacy_lps']} рядків/с, "
+              f"профіль {stats[profile]['lps']} рядків/с, результат однаковий: {stats[profile]['identical']}")
+    started = time.perf_counter()
+    spoken = [normalize(line, 'tts') for line in lines]
+    seconds = time.perf_counter() - started
+    chars = sum(map(len, lines))
+    print(f"{label}, tts: {chars / (1 << 20) / seconds if seconds else 0:.1f} МБ/с; "
+          f"приклад: {next((s for s, l in zip(spoken, lines) if s != l.strip()), '')[:80]!r}")
+    return stats
+
+
+# ========== Порівняння з командного рядка ==========
+if __name__ == "__main__":
+    text_path = sys.argv[1] if len(sys.argv) > 1 else "доповнення13_у_нас_гості.txt"
+    with open(text_path, 'r', encoding='utf-8') as f:
+        book_lines = [line for line in f.read().split("\n") if line.strip()]
+    benchmark(book_lines, text_path)
+    headings = [f"## #g{i % 9 + 1}_slow: Глава {i}. Дорога\u0301 дому, «частина» {i}/3: що? +" for i in range(20000)]
+    benchmark(headings, "Заголовки глав")
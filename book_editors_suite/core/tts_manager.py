@@ -2,18 +2,33 @@
 """
 Менеджер текст-в-мова (TTS) функціоналу з використанням Android TTS.
 """
-from kivy.logger import Logger
+import logging
 
-try:
-    from jnius import autoclass
-    TextToSpeech = autoclass('android.speech.tts.TextToSpeech')
-    Locale = autoclass('java.util.Locale')
-    HashMap = autoclass('java.util.HashMap')
-    PythonActivity = autoclass('org.kivy.android.PythonActivity')
-    ANDROID_TTS_AVAILABLE = True
-except ImportError:
-    ANDROID_TTS_AVAILABLE = False
-    Logger.warning("TTS: pyjnius не доступний, TTS не працюватиме")
+# Той самий логер, що kivy.logger.Logger (Kivy реєструє його під назвою "kivy"),
+# але без імпорту Kivy - модуль доступний і для фонових процесів
+Logger = logging.getLogger("kivy")
+
+# Класи Android TTS завантажуються через pyjnius лише при створенні TTSManager
+ANDROID_TTS_AVAILABLE = None
+TextToSpeech = Locale = HashMap = PythonActivity = None
+
+
+def load_android_tts() -> bool:
+    """Один раз завантажує класи Android TTS (pyjnius); False - TTS недоступний."""
+    global ANDROID_TTS_AVAILABLE, TextToSpeech, Locale, HashMap, PythonActivity
+    if ANDROID_TTS_AVAILABLE is not None:
+        return ANDROID_TTS_AVAILABLE
+    try:
+        from jnius import autoclass
+        TextToSpeech = autoclass('android.speech.tts.TextToSpeech')
+        Locale = autoclass('java.util.Locale')
+        HashMap = autoclass('java.util.HashMap')
+        PythonActivity = autoclass('org.kivy.android.PythonActivity')
+        ANDROID_TTS_AVAILABLE = True
+    except Exception:
+        ANDROID_TTS_AVAILABLE = False
+        Logger.warning("TTS: pyjnius не доступний, TTS не працюватиме")
+    return ANDROID_TTS_AVAILABLE
 
 
 class TTSManager:
@@ -24,7 +39,7 @@ class TTSManager:
         self.is_speaking = False
         self.tts_engine = None
         
-        if ANDROID_TTS_AVAILABLE:
+        if load_android_tts():
             self._init_android_tts()
 
 #-------------------------------------------    
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+Частотний звіт невідомих слів книги для пакетної розстановки наголосів.
+
+Текст ділиться на частини по межах абзаців і розбирається паралельно
+(WORD_RE): кожна частина рахує слова без наголосу та запам'ятовує перші
+позиції, з яких потім вирізаються контексти. Словник у процеси не передається - відсіювання відомих слів
+робиться один раз після злиття лічильників.
+
+Звіт - TSV з колонками: слово, кількість, наголос, контексти, пропозиція.
+Колонку "наголос" заповнюють вручну (знак \\u0301 або '+' після голосної),
+після чого apply_batch_file додає слова до словника. Пропозиція
+(AccentSuggester, з впевненістю) лише підказує - автоматично не застосовується.
+"""
+
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from book_editors_suite.utils.helpers import WORD_RE, strip_combining_acute
+
+ACUTE = '\u0301'
+PLUS_SIGN = '+'
+UKR_VOWELS = "аеєиіїоуюяАЕЄИІЇОУЮЯ"
+REPORT_HEADER = "слово\tкількість\tнаголос\tконтексти\tпропозиція"
+
+
+def count_vowels(word: str) -> int:
+    return sum(1 for ch in word if ch in UKR_VOWELS)
+
+
+def split_chunks(text: str, parts: int) -> List[Tuple[int, str]]:
+    """Ділить текст на приблизно рівні частини по переносах рядка: [(зсув, частина)]."""
+    if parts <= 1 or len(text) < 2:
+        return [(0, text)]
+    size = len(text) // parts + 1
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start + size)
+        end = len(text) if end == -1 else end + 1
+        chunks.append((start, text[start:end]))
+        start = end
+    return chunks
+
+
+def _scan_chunk(args) -> Tuple[Counter, Dict]:
+    """
+    Рахує слова без наголосу в частині тексту (для пулу процесів).
+    Повертає лічильник та перші позиції кожного слова - контексти вирізає батьківський процес.
+    """
+    offset, chunk, min_vowels, max_contexts = args
+    counts = Counter()
+    positions = {}
+    for match in WORD_RE.finditer(chunk):
+        word = match.group(0)
+        if ACUTE in word:
+            continue
+        key = word.lower()
+        counts[key] += 1
+        first = positions.get(key)
+        if first is None:
+            positions[key] = [offset + match.start()]
+        elif len(first) < max_contexts:
+            first.append(offset + match.start())
+    for key in [k for k in counts if count_vowels(k) < min_vowels]:
+        del counts[key]
+        del positions[key]
+    return counts, positions
+
+
+def _context(text: str, pos: int, context_chars: int) -> str:
+    """Фрагмент тексту навколо позиції в один рядок."""
+    start = max(pos - context_chars, 0)
+    end = min(pos + context_chars, len(text))
+    return " ".join(text[start:end].split())
+
+
+def find_unknown_words(text: str, accents, workers: int = None, min_vowels: int = 2,
+                       max_contexts: int = 3, context_chars: int = 40) -> List[Dict]:
+    """
+    Слова без наголосу в тексті та без запису в словнику, за спаданням частоти:
+    [{'word', 'count', 'form', 'contexts': [(позиція, текст)]}].
+    Односкладові слова (min_vowels) наголосу не потребують і пропускаються.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = split_chunks(text, workers if len(text) > 200000 else 1)
+    jobs = [(offset, chunk, min_vowels, max_contexts) for offset, chunk in chunks]
+
+    if len(jobs) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_scan_chunk, jobs))
+        except (OSError, ImportError, NotImplementedError):
+            results = [_scan_chunk(job) for job in jobs]
+    else:
+        results = [_scan_chunk(job) for job in jobs]
+
+    counts = Counter()
+    positions = {}
+    for chunk_counts, chunk_positions in results:
+        counts.update(chunk_counts)
+        for key, found in chunk_positions.items():
+            merged = positions.setdefault(key, [])
+            merged.extend(found[:max_contexts - len(merged)])
+
+    unknown = []
+    for key, count in counts.most_common():
+        if key in accents:
+            continue
+        first = positions[key]
+        match = WORD_RE.match(text, first[0])
+        unknown.append({
+            'word': key,
+            'count': count,
+            'form': match.group(0) if match else key,
+            'contexts': [(pos, _context(text, pos, context_chars)) for pos in first],
+        })
+    return unknown
+
+
+def write_report(unknown: List[Dict], report_path, top: int = None, suggestions: Dict = None) -> Path:
+    """
+    Записує звіт у TSV (колонка "наголос" порожня - для пакетного заповнення).
+    suggestions - {слово: пропозиція AccentSuggester} для останньої колонки.
+    """
+    suggestions = suggestions or {}
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    rows = unknown[:top] if top else unknown
+    with report_path.open('w', encoding='utf-8') as f:
+        f.write(REPORT_HEADER + "\n")
+        for item in rows:
+            samples = " | ".join(ctx.replace("\t", " ") for _, ctx in item['contexts'])
+            suggestion = suggestions.get(item['word'])
+            hint = f"{suggestion['suggestion']} ({suggestion['confidence']:.2f})" if suggestion else ""
+            f.write(f"{item['word']}\t{item['count']}\t\t{samples}\t{hint}\n")
+    return report_path
+
+
+def plus_to_acute(word: str) -> str:
+    """'+' після голосної -> комбінований наголос."""
+    out = []
+    for ch in word:
+        if ch == PLUS_SIGN and out and out[-1] in UKR_VOWELS:
+            out.append(ACUTE)
+        elif ch != PLUS_SIGN:
+            out.append(ch)
+    return "".join(out)
+
+
+def read_batch_file(report_path) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Читає заповнений звіт: {слово: слово з наголосом} та список відхилених рядків
+    (наголошена форма не збігається зі словом).
+    """
+    entries = {}
+    rejected = []
+    with Path(report_path).open('r', encoding='utf-8') as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 3 or cols[0] == "слово" or not cols[2].strip():
+                continue
+            key = cols[0].strip().lower()
+            accented = plus_to_acute(cols[2].strip()).lower()
+            if strip_combining_acute(accented) != key or ACUTE not in accented:
+                rejected.append(cols[0])
+                continue
+            entries[key] = accented
+    return entries, rejected
+
+
+def apply_batch_file(report_path, accents, file_manager=None, text_processor=None) -> Dict:
+    """
+    Додає заповнені слова звіту до словника (через журнал FileManager, якщо переданий).
+    Повертає {'applied': к-сть, 'rejected': [слова], 'words': {слово: з наголосом}}.
+    """
+    entries, rejected = read_batch_file(report_path)
+    for key, accented in entries.items():
+        if text_processor is not None:
+            text_processor.set_accent(accents, key, accented)
+        if file_manager is not None:
+            file_manager.save_accent_word(accents, key, accented)
+        else:
+            accents[key] = accented
+    return {'applied': len(entries), 'rejected': rejected, 'words': entries}
+
+
+# ========== Звіт з командного рядка ==========
+if __name__ == "__main__":
+    import json
+    from book_editors_suite.core.accent_suggest import AccentSuggester
+    text_path = sys.argv[1] if len(sys.argv) > 1 else "доповнення13_у_нас_гості.txt"
+    accents_path = sys.argv[2] if len(sys.argv) > 2 else "accents_files.json"
+    top = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    with open(text_path, 'r', encoding='utf-8') as f:
+        book_text = f.read()
+    with open(accents_path, 'r', encoding='utf-8') as f:
+        book_accents = json.load(f)
+    started = time.perf_counter()
+    found = find_unknown_words(book_text, book_accents)
+    hints = AccentSuggester(book_accents).suggest_many(item['word'] for item in found)
+    out = write_report(found, Path(text_path).with_name(Path(text_path).stem + "_невідомі.tsv"), top, hints)
+    print(f"{len(found)} невідомих слів за {time.perf_counter() - started:.2f} с -> {out}")
+    for item in found[:20]:
+        print(f"{item['count']:6d}  {item['word']}")
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Обернений індекс слів книги: нормалізоване слово -> номери абзаців.
+
+Будується один раз під час підготовки тексту і дозволяє після зміни
+словника виправити саме ті абзаци, де слово зустрічається, за час,
+пропорційний кількості входжень, а не розміру книги.
+Номери абзаців зберігаються компактно (array 'I').
+"""
+
+from array import array
+from typing import Dict, Iterable
+
+from book_editors_suite.utils.helpers import WORD_RE, strip_combining_acute
+
+
+def normalize_word(word: str) -> str:
+    """Ключ слова як у словнику: без наголосу, нижній регістр."""
+    return strip_combining_acute(word).lower()
+
+
+class WordIndex:
+    """Нормалізоване слово -> відсортовані номери абзаців."""
+
+#-------------------------------------------
+    def __init__(self):
+        self._index: Dict[str, array] = {}
+
+#-------------------------------------------
+    def add(self, paragraph_id: int, text: str):
+        """Додає слова абзацу. Абзаци мають додаватися за зростанням номера."""
+        index = self._index
+        for word in WORD_RE.findall(text):
+            key = normalize_word(word)
+            ids = index.get(key)
+            if ids is None:
+                index[key] = array('I', (paragraph_id,))
+            elif ids[-1] != paragraph_id:
+                ids.append(paragraph_id)
+
+#-------------------------------------------
+    @classmethod
+    def build(cls, paragraphs: Iterable[str]) -> "WordIndex":
+        """Індекс для списку абзаців."""
+        word_index = cls()
+        for paragraph_id, text in enumerate(paragraphs):
+            word_index.add(paragraph_id, text)
+        return word_index
+
+#-------------------------------------------
+    def paragraphs_with(self, key: str) -> array:
+        """Номери абзаців, що містять слово (ключ словника)."""
+        return self._index.get(key, array('I'))
+
+#-------------------------------------------
+    def words(self) -> Iterable[str]:
+        """Усі різні слова книги (ключі словника)."""
+        return self._index.keys()
+
+#-------------------------------------------
+    def __len__(self) -> int:
+        return len(self._index)
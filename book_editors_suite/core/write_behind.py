@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Відкладений (write-behind) атомарний запис файлу.
+
+Зміни робляться в пам'яті одразу, а файл перезаписується не частіше ніж
+раз на delay секунд: перша зміна запускає таймер, решта змін до його
+спрацювання об'єднуються в той самий запис. Запис атомарний - тимчасовий
+файл поруч, fsync, os.replace - тому збій посеред запису не обрізає файл.
+Незаписані зміни зберігаються при flush()/close() та при виході з процесу.
+"""
+
+import atexit
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Callable, Dict
+
+# Усі відкриті файли для запису при виході з процесу
+_OPEN_FILES = weakref.WeakSet()
+
+
+def atomic_write_text(path, text: str) -> int:
+    """Атомарно записує текст (тимчасовий файл + fsync + os.replace). Повертає розмір у байтах."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    data = text.encode("utf-8")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+class WriteBehindFile:
+    """
+    Файл, що записується із затримкою: mark_dirty() після зміни даних,
+    serialize() повертає вміст файлу і викликається під lock (тим самим,
+    під яким власник змінює дані). flush() не можна викликати, тримаючи lock.
+    on_flush() викликається після кожного успішного запису.
+    """
+
+#-------------------------------------------
+    def __init__(self, path, serialize: Callable[[], str], lock=None,
+                 delay: float = 2.0, logger=None, on_flush: Callable[[], None] = None):
+        self.path = Path(path)
+        self.serialize = serialize
+        self.lock = lock if lock is not None else threading.RLock()
+        self.delay = delay
+        self.logger = logger
+        self.on_flush = on_flush
+
+        self._write_lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self._pending_changes = 0
+        self._stats = {'changes': 0, 'flushes': 0, 'coalesced': 0, 'errors': 0,
+                       'last_ms': 0.0, 'max_ms': 0.0, 'total_ms': 0.0, 'last_bytes': 0}
+        _OPEN_FILES.add(self)
+
+#-------------------------------------------
+    def mark_dirty(self):
+        """Дані змінено: запланувати запис (якщо ще не заплановано)."""
+        with self.lock:
+            self._dirty = True
+            self._pending_changes += 1
+            self._stats['changes'] += 1
+            if self._timer is None and self.delay > 0:
+                self._timer = threading.Timer(self.delay, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if self.delay <= 0:
+            self.flush()
+
+#-------------------------------------------
+    def _on_timer(self):
+        with self.lock:
+            # Таймер міг бути скасований явним flush() і замінений новим
+            if self._timer is not threading.current_thread():
+                return
+            self._timer = None
+        self.flush()
+
+#-------------------------------------------
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+#-------------------------------------------
+    def flush(self) -> bool:
+        """Записує незбережені зміни зараз. True - файл актуальний."""
+        with self._write_lock:
+            with self.lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return True
+                text = self.serialize()
+                changes = self._pending_changes
+                self._dirty = False
+                self._pending_changes = 0
+
+            started = time.perf_counter()
+            try:
+                size = atomic_write_text(self.path, text)
+            except Exception as e:
+                with self.lock:
+                    # Зміни лишаються незбереженими до наступної спроби
+                    self._dirty = True
+                    self._pending_changes += changes
+                    self._stats['errors'] += 1
+                if self.logger:
+                    self.logger.error(f"WriteBehindFile: Помилка запису {self.path}: {e}")
+                return False
+
+            ms = (time.perf_counter() - started) * 1000
+            stats = self._stats
+            stats['flushes'] += 1
+            stats['coalesced'] += changes - 1
+            stats['last_ms'] = ms
+            stats['max_ms'] = max(stats['max_ms'], ms)
+            stats['total_ms'] += ms
+            stats['last_bytes'] = size
+            if self.on_flush is not None:
+                self.on_flush()
+        if self.logger:
+            self.logger.info(f"WriteBehindFile: Збережено {self.path.name}: змін {changes}, "
+                             f"{size} байт за {ms:.1f} мс")
+        return True
+
+#-------------------------------------------
+    def close(self) -> bool:
+        """Записує залишок змін і більше не планує записів."""
+        result = self.flush()
+        _OPEN_FILES.discard(self)
+        return result
+
+#-------------------------------------------
+    def stats(self) -> Dict:
+        """
+        Діагностика: changes - позначених змін, flushes - записів файлу,
+        coalesced - змін, об'єднаних з іншими, час запису (мс), pending - є незаписане.
+        """
+        stats = dict(self._stats)
+        stats['avg_ms'] = stats['total_ms'] / stats['flushes'] if stats['flushes'] else 0.0
+        stats['pending'] = self._dirty
+        return stats
+
+
+def flush_all():
+    """Записує незбережені зміни всіх відкритих файлів (викликається при виході)."""
+    for pending in list(_OPEN_FILES):
+        pending.flush()
+
+
+atexit.register(flush_all)
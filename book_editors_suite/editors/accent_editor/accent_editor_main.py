@@ -7,6 +7,8 @@
 
 import sys
 import os
+import threading
+from collections import deque
 from pathlib import Path
 
 sys.path.insert(0, '/storage/emulated/0/a0_sb2_book_editors_suite')
@@ -22,6 +24,13 @@ from kivy.core.window import Window
 from kivy.clock import Clock
 
 from book_editors_suite.core.base_editor import BaseEditor
+from book_editors_suite.core.unknown_words import find_unknown_words, write_report, apply_batch_file
+from book_editors_suite.core.accent_snapshot import AccentSnapshot
+from book_editors_suite.core.word_index import WordIndex, normalize_word
+from book_editors_suite.core.accent_engine import AccentEngine
+from book_editors_suite.core.accent_dict_binary import BinaryAccentDict
+from book_editors_suite.utils.helpers import strip_combining_acute
+from book_editors_suite.core.accent_suggest import AccentSuggester
 from book_editors_suite.ui.popups.edit_word_popup import EditWordPopup
 from book_editors_suite.ui.popups.extra_buttons_popup import ExtraButtonsPopup
 
@@ -29,6 +38,11 @@ from book_editors_suite.ui.popups.extra_buttons_popup import ExtraButtonsPopup
 class AccentEditorApp(App):
     """Редактор наголосів з використанням BaseEditor"""
 
+    # Скільки абзаців фоновий потік обробляє за один пакет
+    PREPARE_CHUNK = 200
+    # Нижче цієї впевненості попап редагування не заповнюється пропозицією
+    SUGGESTION_MIN_CONFIDENCE = 0.5
+
     def __init__(self, book_project_name: str, input_text_file: str = None, **kwargs):
         super().__init__(**kwargs)
         self.book_project_name = book_project_name
@@ -37,6 +51,11 @@ class AccentEditorApp(App):
         
         # Використовуємо BaseEditor
         self.base_editor = BaseEditor(book_project_name, input_text_file, "accent_editor")
+        project_info = self.base_editor.config_manager.get_project_info()
+        self.accent_snapshot = AccentSnapshot(
+            Path(project_info['base_path']) / book_project_name / "temp_folder" / "accent_snapshot.json",
+            self.base_editor.logger
+        )
         
         # Властивості редактора наголосів
         self.accents = {}
@@ -44,8 +63,23 @@ class AccentEditorApp(App):
         self.fixed_text = []
         self.current_idx = -1
         self.selected_word = None
-        self.text_before_selected_word = ""
-        self.text_after_selected_word = ""
+        self.selected_word_span = (0, 0)
+
+        # Фонова підготовка тексту
+        self._prep_lock = threading.Lock()
+        self._prepared = threading.Event()
+        self._prepare_thread = None
+        self._ready = []
+        self._ready_count = 0
+        self._initial_index = 0
+        self._priority_index = None
+        self._waiting_index = None
+        self._snapshot_plan = None
+        self._word_index = None
+        # Слова, збережені під час підготовки: фоновий потік дозастосовує їх до своєї копії словника
+        self._accent_updates = []
+        self._suggester = None
+        self._suggestions = {}
         
         # Віджети
         self.text_input = None
@@ -113,48 +147,214 @@ class AccentEditorApp(App):
     # ========== КРИТИЧНІ МЕТОДИ ==========
 
     def open_and_prepare_text(self):
-        """Завантажує текст і відновлює закладку З ПРОПУСКОМ ПОРОЖНІХ АБЗАЦІВ"""
+        """
+        Запускає підготовку тексту у фоновому потоці.
+        Спочатку обробляються абзаци від закладки, вони показуються одразу,
+        решта дообробляється у фоні з прогресом на кнопці "...".
+        """
+        self.restore_bookmark()
+        self._initial_index = self.base_editor.current_paragraph_index
+        self._prepared.clear()
+        self.text_input.text = ""
+        self.text_input.disabled = True
+        self.btn_next.disabled = True
+        self.btn_extra.text = "   . . .   \nПідготовка"
+        # Фоновий потік працює з власною копією словника: словник змінюється з інтерфейсу
+        self._accent_updates = []
+        engine = AccentEngine(self._accents_snapshot(), self.base_editor.logger)
+        self._prepare_thread = threading.Thread(target=self._prepare_text_worker, args=(engine,),
+                                                name="accent-prepare", daemon=True)
+        self._prepare_thread.start()
+
+    def _accents_snapshot(self):
+        """Копія словника для фонового потоку (бінарний словник - копія лише змін у пам'яті)"""
+        if isinstance(self.accents, BinaryAccentDict):
+            return self.accents.snapshot()
+        return dict(getattr(self.accents, 'index', self.accents))
+
+    def _prepare_text_worker(self, engine: AccentEngine):
+        """Фонова підготовка: кеш, потім абзаци пакетами від закладки до кінця, потім до закладки"""
+        shown = False
+        applied = 0
         try:
-            raw_text = self.base_editor.file_manager.load_input_text()
+            file_manager = self.base_editor.file_manager
+            raw_text = file_manager.load_input_text()
             if raw_text is None:
                 self.base_editor.logger.warning("Текст не знайдено")
                 return
 
-            accented_text = self.base_editor.text_processor.add_accents_to_text(raw_text, self.accents)
-            paragraphs = accented_text.split("\n")
-            self.text_for_correction = paragraphs
-            self.fixed_text = []
-
-            self.restore_bookmark()
-            target_index = self.base_editor.current_paragraph_index
-
-            # Додаємо абзаци до закладки
-            for i in range(target_index):
-                self.fixed_text.append(self.text_for_correction[i])
+            plan = self.accent_snapshot.plan(raw_text, engine.accents,
+                                             file_manager.accents_version, file_manager.accent_changes_since)
+            with self._prep_lock:
+                self._snapshot_plan = plan
+                self.text_for_correction = [raw if accented is None else accented
+                                            for raw, accented in zip(plan['paragraphs'], plan['result'])]
+                self._ready = [accented is not None for accented in plan['result']]
+                self._ready_count = sum(self._ready)
+            total = len(self._ready)
+
+            start = min(self._initial_index, total)
+            pending = deque(sorted(plan['todo'], key=lambda i: (i < start, i)))
+            while pending:
+                # Абзац, на якому чекає користувач, - поза чергою
+                priority = self._priority_index
+                if priority is not None and priority < total and not self._ready[priority]:
+                    chunk = [i for i in range(priority, min(priority + self.PREPARE_CHUNK, total)) if not self._ready[i]]
+                else:
+                    chunk = []
+                    while pending and len(chunk) < self.PREPARE_CHUNK:
+                        i = pending.popleft()
+                        if not self._ready[i]:
+                            chunk.append(i)
+                if not chunk:
+                    continue
+
+                raw = [plan['paragraphs'][i] for i in chunk]
+                while True:
+                    with self._prep_lock:
+                        updates = self._accent_updates[applied:]
+                    for key, value in updates:
+                        engine.set_word(key, value)
+                    applied += len(updates)
+                    accented = engine.accent_paragraphs(raw)
+                    self._prep_lock.acquire()
+                    if len(self._accent_updates) == applied:
+                        break
+                    # Поки оброблявся пакет, користувач зберіг слово - пакет обробляється ще раз
+                    self._prep_lock.release()
+                try:
+                    for i, text in zip(chunk, accented):
+                        self.text_for_correction[i] = text
+                        plan['result'][i] = text
+                        self._ready[i] = True
+                        # Абзаци до закладки вже перенесені у fixed_text сирими
+                        if i < self._initial_index and i < len(self.fixed_text):
+                            self.fixed_text[i] = text
+                    self._ready_count += len(chunk)
+                finally:
+                    self._prep_lock.release()
+                if not shown:
+                    Clock.schedule_once(lambda *_: self._show_initial_paragraph(), 0)
+                    shown = True
+                    # Обернений індекс слів (за сирими абзацами) - для виправлення абзаців після змін словника
+                    self._word_index = WordIndex.build(plan['paragraphs'])
+                Clock.schedule_once(lambda *_: self._on_prepare_progress(), 0)
+
+            if self._word_index is None:
+                self._word_index = WordIndex.build(plan['paragraphs'])
+            with self._prep_lock:
+                self.accent_snapshot.store(plan)
+        except Exception as e:
+            self.base_editor.logger.error(f"Помилка підготовки тексту: {e}")
+            with self._prep_lock:
+                # Решта абзаців лишається без наголосів, але редактор не блокується
+                for i, ready in enumerate(self._ready):
+                    if not ready:
+                        self._ready[i] = True
+                self._ready_count = len(self._ready)
+            message = f"Не вдалося підготувати текст:\n{e}"
+            Clock.schedule_once(lambda *_: self.show_popup("Помилка", message), 0)
+        finally:
+            self._prepared.set()
+            if not shown:
+                Clock.schedule_once(lambda *_: self._show_initial_paragraph(), 0)
+            Clock.schedule_once(lambda *_: self._on_prepare_progress(), 0)
+        self._prepare_suggestions(engine, applied)
+
+    def _prepare_suggestions(self, engine: AccentEngine, applied: int):
+        """Пропозиції наголосів для всіх невідомих слів книги одним пакетом (після підготовки тексту)"""
+        if self._word_index is None:
+            return
+        try:
+            # Копія словника фонового потоку з усіма збереженими під час підготовки словами
+            with self._prep_lock:
+                updates = self._accent_updates[applied:]
+            for key, value in updates:
+                engine.set_word(key, value)
+            self._suggester = AccentSuggester(engine.accents, self.base_editor.logger)
+            unknown = [word for word in self._word_index.words() if word not in self.accents]
+            self._suggestions = self._suggester.suggest_many(unknown)
+        except Exception as e:
+            self.base_editor.logger.error(f"Помилка підготовки пропозицій наголосів: {e}")
+
+    def accent_suggestion(self, word: str, min_confidence: float = None):
+        """
+        Пропозиція наголосу для слова поза словником (None - немає, ще не готово
+        або впевненість нижча за min_confidence, типово SUGGESTION_MIN_CONFIDENCE)
+        """
+        key = normalize_word(word)
+        if key in self.accents:
+            return None
+        suggestion = self._suggestions.get(key)
+        if suggestion is None and self._suggester is not None:
+            suggestion = self._suggester.suggest(key)
+        if min_confidence is None:
+            min_confidence = self.SUGGESTION_MIN_CONFIDENCE
+        if suggestion is None or suggestion['confidence'] < min_confidence:
+            return None
+        return suggestion
+
+    def _show_initial_paragraph(self):
+        """Показує абзац закладки З ПРОПУСКОМ ПОРОЖНІХ АБЗАЦІВ"""
+        with self._prep_lock:
+            paragraphs = self.text_for_correction
+            target_index = min(self._initial_index, len(paragraphs))
+            self.fixed_text = list(paragraphs[:target_index])
 
             # ПРОПУСК ПОРОЖНІХ АБЗАЦІВ
             while (target_index < len(paragraphs) and not paragraphs[target_index].strip()):
                 self.fixed_text.append("")
                 target_index += 1
 
-            if target_index < len(paragraphs):
-                self.text_input.text = paragraphs[target_index]
-                self.base_editor.current_paragraph_index = target_index
+        self.base_editor.current_paragraph_index = target_index
+        self._show_paragraph(target_index)
+
+    def _show_paragraph(self, idx: int):
+        """Показує абзац; якщо він ще не готовий - чекає на нього (без блокування інтерфейсу)"""
+        if idx < len(self.text_for_correction) and not self._ready[idx]:
+            self._waiting_index = idx
+            self._priority_index = idx
+            self.text_input.text = ""
+            self.text_input.disabled = True
+            self.btn_next.disabled = True
+        else:
+            self._waiting_index = None
+            self.text_input.disabled = False
+            self.btn_next.disabled = False
+            if idx < len(self.text_for_correction):
+                self.text_input.text = self.text_for_correction[idx]
             else:
                 self.text_input.text = ""
-                self.base_editor.current_paragraph_index = len(paragraphs)
+        self.btn_extra.text = self._extra_button_text()
+        self.clear_selection_state()
+        self.select_first_unknown_word()
 
-            total_paragraphs = len(paragraphs)
-            self.btn_extra.text = f"   . . .   \n{self.base_editor.current_paragraph_index+1}/{total_paragraphs}"
-            self.clear_selection_state()
+    def _on_prepare_progress(self):
+        """Оновлює прогрес підготовки та показує абзац, на який чекали"""
+        waiting = self._waiting_index
+        if waiting is not None and (waiting >= len(self._ready) or self._ready[waiting]):
+            self._show_paragraph(waiting)
+        else:
+            self.btn_extra.text = self._extra_button_text()
 
-        except Exception as e:
-            self.base_editor.logger.error(f"Помилка підготовки тексту: {e}")
-            self.show_popup("Помилка", f"Не вдалося підготувати текст:\n{e}")
+    def _extra_button_text(self) -> str:
+        """Текст кнопки "...": позиція в тексті та прогрес підготовки"""
+        total = len(self.text_for_correction)
+        text = f"   . . .   \n{self.base_editor.current_paragraph_index+1}/{total}"
+        if not self._prepared.is_set() and total:
+            text += f" ({100 * self._ready_count // total}%)"
+        return text
+
+    def wait_until_prepared(self):
+        """Чекає завершення фонової підготовки (перед збереженням всього тексту)"""
+        if self._prepare_thread is not None:
+            self._prepared.wait()
 
     def go_next_paragraph(self):
         """Перехід до наступного абзацу З ПРОПУСКОМ ПОРОЖНІХ"""
         self.stop_tts()
+        if self._waiting_index is not None:
+            return
 
         current_text = self.text_input.text
         if self.base_editor.current_paragraph_index < len(self.text_for_correction):
@@ -167,13 +367,11 @@ class AccentEditorApp(App):
                 self.fixed_text.append("")
                 self.base_editor.current_paragraph_index += 1
 
-            if self.base_editor.current_paragraph_index < len(self.text_for_correction):
-                self.text_input.text = self.text_for_correction[self.base_editor.current_paragraph_index]
-            else:
-                self.text_input.text = ""
+            self._show_paragraph(self.base_editor.current_paragraph_index)
+            if self.base_editor.current_paragraph_index >= len(self.text_for_correction):
                 self.show_popup("Кінець", "Досягнуто кінця тексту")
 
-        self.btn_extra.text = f"   . . .   \n{self.base_editor.current_paragraph_index+1}/{len(self.text_for_correction)}"
+        self.btn_extra.text = self._extra_button_text()
         self.move_bookmark()
         self.clear_selection_state()
 
@@ -202,6 +400,7 @@ class AccentEditorApp(App):
 
     def build_full_text(self) -> str:
         """Побудова повного тексту"""
+        self.wait_until_prepared()
         parts = []
         parts.extend(self.fixed_text)
         
@@ -262,16 +461,128 @@ class AccentEditorApp(App):
             self.show_popup("Помилка", error_msg)
 
     def sort_dictionary(self):
-        """Сортування словника"""
+        """Сортування словника (лише проєктний шар; тип словника не змінюється)"""
         try:
-            self.accents = dict(sorted(self.accents.items()))
-            self.save_accents()
+            local = self.base_editor.file_manager._local_layer(self.accents)
+            # Бінарний словник (.acdb) write_binary і так пише відсортованим
+            if not isinstance(local, BinaryAccentDict):
+                items = sorted(local.items())
+                local.clear()
+                local.update(items)
+                self.save_accents()
             self.show_popup("Успіх", "Словник відсортовано")
             self.base_editor.logger.info("Словник відсортовано")
         except Exception as e:
             self.base_editor.logger.error(f"Помилка сортування: {e}")
             self.show_popup("Помилка", f"Не вдалося відсортувати словник:\n{e}")
 
+    def unknown_words_report_path(self) -> Path:
+        """Шлях звіту невідомих слів: поруч з вхідним текстом, <назва>_невідомі.tsv"""
+        input_file = Path(self.base_editor.file_manager.get_config_value('INPUT_TEXT_FILE', self.input_text_file or ""))
+        return input_file.with_name(input_file.stem + "_невідомі.tsv")
+
+    def write_unknown_words_report(self):
+        """Частотний звіт слів без наголосу та без запису в словнику для всієї книги"""
+        try:
+            unknown = find_unknown_words(self.build_full_text(), self.accents)
+            suggestions = {item['word']: self.accent_suggestion(item['word'], 0.0) for item in unknown}
+            report_path = write_report(unknown, self.unknown_words_report_path(), suggestions=suggestions)
+            top = ", ".join(f"{item['word']} ({item['count']})" for item in unknown[:5])
+            self.base_editor.logger.info(f"Звіт невідомих слів: {len(unknown)} слів -> {report_path}")
+            self.show_popup("Невідомі слова", f"{len(unknown)} слів, найчастіші:\n{top}\n\n{report_path.name}")
+        except Exception as e:
+            self.base_editor.logger.error(f"Помилка звіту невідомих слів: {e}")
+            self.show_popup("Помилка", f"Не вдалося створити звіт:\n{e}")
+
+    def apply_unknown_words_batch(self):
+        """Додає наголоси з заповненого звіту до словника та до всього тексту"""
+        try:
+            report_path = self.unknown_words_report_path()
+            self.wait_until_prepared()
+            if not report_path.exists():
+                self.show_popup("Помилка", f"Звіт не знайдено:\n{report_path.name}")
+                return
+            result = apply_batch_file(report_path, self.accents,
+                                      self.base_editor.file_manager, self.base_editor.text_processor)
+
+            # Нові слова - в усі абзаци, ще не пройдені редактором, і в поточний
+            for key, accented in result['words'].items():
+                self.propagate_accent(key, accented)
+            if self.base_editor.current_paragraph_index < len(self.text_for_correction):
+                self.text_input.text = self.base_editor.text_processor.add_accents_to_text(self.text_input.text, self.accents)
+            self.clear_selection_state()
+
+            message = f"Додано слів: {result['applied']}"
+            if result['rejected']:
+                message += f"\nВідхилено: {', '.join(result['rejected'][:10])}"
+            self.base_editor.logger.info(f"Пакет наголосів з {report_path.name}: {message}")
+            self.show_popup("Пакет наголосів", message)
+        except Exception as e:
+            self.base_editor.logger.error(f"Помилка застосування пакета наголосів: {e}")
+            self.show_popup("Помилка", f"Не вдалося застосувати пакет:\n{e}")
+
+    def promote_accents_to_global(self):
+        """Переносить слова проєкту (крім розбіжностей) до спільного словника"""
+        file_manager = self.base_editor.file_manager
+        if not hasattr(self.accents, 'local'):
+            self.show_popup("Спільний словник", "Спільний словник не налаштовано")
+            return
+        count = file_manager.promote_accents_to_global(self.accents)
+        conflicts = len(self.accents.conflicts())
+        message = f"Перенесено слів: {count}"
+        if conflicts:
+            message += f"\nРозбіжностей лишилось: {conflicts}"
+        self.show_popup("Спільний словник", message)
+
+    def write_accents_conflicts_report(self):
+        """Звіт про слова з різними наголосами в спільному та проєктному словниках"""
+        report_path = self.base_editor.file_manager.write_accents_conflicts_report(self.accents)
+        if report_path is None:
+            self.show_popup("Спільний словник", "Спільний словник не налаштовано")
+            return
+        self.show_popup("Розбіжності", f"Слів: {len(self.accents.conflicts())}\n\n{report_path.name}")
+
+    def propagate_accent(self, key: str, value: str) -> int:
+        """
+        Переносить зміну словника в абзаци після поточного та в кеш тексту.
+        Абзаци знаходяться за обереним індексом - час залежить від кількості входжень.
+        Готові абзаци заново отримують наголоси з сирого тексту (наголоси автора
+        лишаються), ще не оброблені - отримають слово від фонового потоку.
+        Повертає кількість виправлених абзаців.
+        """
+        processor = self.base_editor.text_processor
+        current = self.base_editor.current_paragraph_index
+        with self._prep_lock:
+            preparing = not self._prepared.is_set()
+            if preparing:
+                self._accent_updates.append((key, value))
+            plan = self._snapshot_plan
+            if plan is None:
+                return 0
+            raw = plan['paragraphs']
+            if self._word_index is not None:
+                paragraph_ids = self._word_index.paragraphs_with(key)
+            else:
+                paragraph_ids = [i for i, text in enumerate(raw)
+                                 if key in strip_combining_acute(text).lower()]
+            paragraph_ids = [i for i in paragraph_ids if i < len(self._ready) and self._ready[i]]
+
+            accented = processor.add_accents_to_paragraphs([raw[i] for i in paragraph_ids], self.accents)
+            patched = []
+            for i, new_text in zip(paragraph_ids, accented):
+                if i > current:
+                    self.text_for_correction[i] = new_text
+                if plan['result'][i] != new_text:
+                    plan['result'][i] = new_text
+                    patched.append(i)
+
+        # Під час підготовки кеш запише фоновий потік разом з рештою абзаців
+        if not preparing:
+            file_manager = self.base_editor.file_manager
+            self.accent_snapshot.patch(plan, patched, file_manager.accents_version, len(self.accents))
+        self.base_editor.logger.info(f"Слово '{key}' -> '{value}' перенесено в {len(patched)} абзаців")
+        return len(patched)
+
     def save_accents(self):
         """Збереження словника"""
         try:
@@ -308,14 +619,27 @@ class AccentEditorApp(App):
         word, start, end = self.base_editor.text_processor.detect_word_at_cursor(text, cursor_idx)
         
         if word:
-            self.text_before_selected_word = text[:start]
-            self.text_after_selected_word = text[end:]
+            self.selected_word_span = (start, end)
             self.selected_word = word
             self.btn_edit.disabled = False
             self.base_editor.logger.debug(f"Виділено слово: '{word}'")
         else:
             self.clear_selection_state()
 
+    def select_first_unknown_word(self):
+        """Виділяє перше слово абзацу без наголосу, якого немає в словнику"""
+        text = self.text_input.text
+        if not text or self.text_input.disabled:
+            return
+        spans = self.base_editor.text_processor.unknown_word_spans(text, self.accents)
+        if not spans:
+            return
+        start, end = spans[0]
+        self.selected_word_span = (start, end)
+        self.selected_word = text[start:end]
+        self.btn_edit.disabled = False
+        self.text_input.select_text(start, end)
+
     def clear_selection_state(self):
         """Очищення виділення"""
         self.selected_word = None
@@ -337,9 +661,10 @@ class AccentEditorApp(App):
             
         replaced = self.base_editor.text_processor.match_casing(old_word, new_word)
         
-        new_txt = self.text_before_selected_word + replaced + self.text_after_selected_word
+        start, end = self.selected_word_span
+        new_txt, new_pos = self.base_editor.text_processor.replace_word_span(
+            self.text_input.text, start, end, replaced, old_word)
         self.text_input.text = new_txt
-        new_pos = len(self.text_before_selected_word) + len(replaced)
         Clock.schedule_once(lambda dt: self._set_cursor_by_index(new_pos), 0)
 
     def _set_cursor_by_index(self, idx: int):
@@ -395,10 +720,22 @@ class AccentEditorApp(App):
         popup = Popup(title=title, content=Label(text=message), size_hint=(0.8, 0.4))
         popup.open()
 
+    def on_pause(self):
+        """Android може завершити призупинений додаток - зберігаємо відкладені зміни конфігу"""
+        self.save_bookmark()
+        self.base_editor.config_manager.flush()
+        return True
+
+    def on_resume(self):
+        """Поки додаток стояв на паузі, конфіг міг змінити інший редактор - перечитуємо змінене"""
+        self.base_editor.config_manager.check_for_changes()
+
     def on_stop(self):
         """Дії при закритті додатку"""
         self.save_bookmark()
+        self.base_editor.config_manager.flush()
         self.stop_tts()
+        self.base_editor.file_manager.compact_accents(self.accents)
         self.base_editor.logger.info("Редактор наголосів закрито")
 
 
@@ -103,7 +103,8 @@ class SoundEffectsEditor(App):
         
         # Ініціалізація менеджера звукових ефектів
         sound_effects_list_path = self.base_editor.config.get('SOUNDS_EFFECTS_LIST', '')
-        self.sound_effects_manager = SoundEffectsManager(sound_effects_list_path, self.base_editor.logger)
+        self.sound_effects_manager = SoundEffectsManager(sound_effects_list_path, self.base_editor.logger,
+                                                         self.base_editor.config_manager.project_store)
         
         # Додаткові властивості для звукових ефектів
         self.sound_dict = self.base_editor.config.get('SOUND_DICT', {})
@@ -114,8 +115,7 @@ class SoundEffectsEditor(App):
         
         # Стан програми
         self.selected_word = None
-        self.text_before_selected_word = ""
-        self.text_after_selected_word = ""
+        self.selected_word_span = (0, 0)
         self.recent_effects = []  # Список останніх використаних ефектів
         
         # Віджети
@@ -448,8 +448,7 @@ class SoundEffectsEditor(App):
         word, start, end = self.base_editor.text_processor.detect_word_at_cursor(text, cursor_idx)
         
         if word:
-            self.text_before_selected_word = text[:start]
-            self.text_after_selected_word = text[end:]
+            self.selected_word_span = (start, end)
             self.selected_word = word
             self.btn_edit.disabled = False
             self.base_editor.logger.debug(f"Виділено слово: '{word}'")
@@ -474,9 +473,10 @@ class SoundEffectsEditor(App):
         # Використовуємо text_processor для заміни з правильним регістром
         replaced = self.base_editor.text_processor.match_casing(old_word, new_word)
         
-        new_txt = self.text_before_selected_word + replaced + self.text_after_selected_word
+        start, end = self.selected_word_span
+        new_txt, new_pos = self.base_editor.text_processor.replace_word_span(
+            self.text_widget.text, start, end, replaced, old_word)
         self.text_widget.text = new_txt
-        new_pos = len(self.text_before_selected_word) + len(replaced)
         Clock.schedule_once(lambda dt: self._set_cursor_by_index(new_pos), 0)
 
     def listen_current_word(self, instance):
@@ -596,9 +596,22 @@ class SoundEffectsEditor(App):
         """Показ попапу з помилкою"""
         self.show_popup("Помилка", message)
 
+    def on_pause(self):
+        """Android може завершити призупинений додаток - зберігаємо відкладені зміни конфігу"""
+        self.save_bookmark()
+        self.base_editor.config_manager.flush()
+        self.sound_effects_manager.flush()
+        return True
+
+    def on_resume(self):
+        """Поки додаток стояв на паузі, конфіг міг змінити інший редактор - перечитуємо змінене"""
+        self.base_editor.config_manager.check_for_changes()
+
     def on_stop(self):
         """Дії при закритті додатку"""
         self.save_bookmark()
+        self.base_editor.config_manager.flush()
+        self.sound_effects_manager.flush()
         self.base_editor.tts_manager.stop_tts()
         self.base_editor.logger.info("Sound Effects Editor закрито")
 
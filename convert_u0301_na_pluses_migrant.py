@@ -4,6 +4,7 @@
 
 Вхід: текстовий файл з символом наголосу \u0301
 Вихід: текстовий файл з позначенням наголосів символом '+' після наголошеної голосної
+(інші напрямки - параметр MODE, див. book_editors_suite/core/accent_marks.py)
 
 Файли:
 - Вхідний: /storage/emulated/0/Documents/inputf.txt
@@ -12,47 +13,34 @@
 """
 
 import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, '/storage/emulated/0/a0_sb2_book_editors_suite')
+
+from book_editors_suite.core.accent_marks import convert_file
+
 # === Налаштування ===
 INPUT_FILE  = "/storage/emulated/0/book_projects/доповнення13_у_нас_гості/pluses/доповнення13_у_нас_гості.txt"
 #"/storage/emulated/0/Documents/Out_u0301/Ніжний маніфест_u0301.txt"
 #"/storage/emulated/0/Documents/inputf.txt"
 OUTPUT_DIR  = "/storage/emulated/0/book_projects/доповнення13_у_нас_гості/pluses"
-ACCENT_CHAR = "\u0301"
-PLUS_SIGN   = "+"
-UKR_VOWELS  = "аеєиіїоуюяАЕЄИІЇОУЮЯ"
+# Режим: acute-to-plus, plus-to-acute, acute-to-plus-before, plus-before-to-acute
+MODE        = "acute-to-plus"
 
 # === Перевірка наявності вхідного файлу ===
 if not os.path.exists(INPUT_FILE):
     print(f"Помилка: вхідний файл не знайдено:\n{INPUT_FILE}")
     exit()
 
-# === Читання вхідного файлу ===
-with open(INPUT_FILE, "r", encoding="utf-8") as f:
-    text = f.read()
-
-# === Конвертація наголосів ===
-new_text = ""
-i = 0
-while i < len(text):
-    ch = text[i]
-    if i + 1 < len(text) and text[i + 1] == ACCENT_CHAR and ch in UKR_VOWELS:
-        new_text += ch + PLUS_SIGN
-        i += 2  # пропустити символ наголосу
-    else:
-        new_text += ch
-        i += 1
-
 # === Формування імені вихідного файлу ===
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 output_file = os.path.join(OUTPUT_DIR, f"outputf_plus_{timestamp}.txt")
 
-# === Збереження результату ===
+# === Конвертація наголосів (потоково, частинами) ===
 try:
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(new_text)
-    print(f"Конвертація успішна! Вихідний файл: {os.path.basename(output_file)}")
+    stats = convert_file(INPUT_FILE, output_file, MODE)
+    print(f"Конвертація успішна! Вихідний файл: {os.path.basename(output_file)} "
+          f"({stats['seconds']:.2f} с)")
 except Exception as e:
     print(f"Помилка при збереженні файлу:\n{e}")
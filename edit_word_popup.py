@@ -57,6 +57,16 @@ class EditWordPopup(Popup):
         self.title = f"Редагування: {original_word}"
         self.size_hint = (0.98, 0.88)
 
+        # Пропозиція наголосу для невідомого слова (за схожими словами словника)
+        initial_word = original_word
+        if self.editor_name == 'accent_editor' and self.accent_char not in original_word \
+                and hasattr(self.parent_app, 'accent_suggestion'):
+            suggestion = self.parent_app.accent_suggestion(original_word)
+            if suggestion:
+                initial_word = self._match_casing(original_word, suggestion['suggestion'])
+                self.title = (f"Редагування: {original_word} "
+                              f"(пропозиція {suggestion['confidence']:.0%}, як {suggestion['like']})")
+
         # Отримуємо налаштування з конфігурації
         try:
             # Для всіх редакторів тепер використовуємо base_editor
@@ -92,7 +102,7 @@ class EditWordPopup(Popup):
         root.add_widget(btn_row)
 
         # Поле редагування
-        self.edit_input = TextInput(text=original_word, font_size=text_widget_font_size+20, multiline=False)
+        self.edit_input = TextInput(text=initial_word, font_size=text_widget_font_size+20, multiline=False)
         root.add_widget(self.edit_input)
 
         # Рядок з інформацією (годинник та батарея)
@@ -222,9 +232,11 @@ class EditWordPopup(Popup):
         
         # Зберігаємо в словник нижнім регістром
         key = self._strip_combining_acute(self.original_word).lower()
-        self.parent_app.accents[key] = new_word.lower()
+        self.parent_app.base_editor.text_processor.set_accent(self.parent_app.accents, key, new_word.lower())
         #success = self.base_editor.file_manager.save_accents(self.accents)
-        self.parent_app.base_editor.file_manager.save_accents(self.parent_app.accents)
+        self.parent_app.base_editor.file_manager.save_accent_word(self.parent_app.accents, key, new_word.lower())
+        if hasattr(self.parent_app, 'propagate_accent'):
+            self.parent_app.propagate_accent(key, new_word.lower())
         
         # Додаємо в текст у поточному регістрі
         replaced = self._match_casing(self.original_word, new_word)
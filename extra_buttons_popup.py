@@ -53,21 +53,26 @@ class ExtraButtonsPopup(Popup):
         root = BoxLayout(orientation='vertical', spacing=8, padding=8)
 
         # Сітка кнопок зверху
-        btn_grid = GridLayout(cols=2, size_hint_y=None, height=3*(8+bbtn_height), spacing=8)
+        rows = 5 if self.editor_name == "accent_editor" else 3
+        btn_grid = GridLayout(cols=2, size_hint_y=None, height=rows*(8+bbtn_height), spacing=8)
 
         # Створюємо кнопки
         self.btn_save_txt = Button(text="До txt", font_size=bbtn_font_size)
         self.btn_save_mp3 = Button(text="До mp3", font_size=bbtn_font_size)
         self.btn_theme = Button(text="День-ніч", font_size=bbtn_font_size)
         self.btn_sort_dict = Button(text="Сортуй", font_size=bbtn_font_size)
+        self.btn_unknown_words = Button(text="Невідомі слова", font_size=bbtn_font_size)
+        self.btn_apply_batch = Button(text="Пакет наголосів", font_size=bbtn_font_size)
+        self.btn_promote = Button(text="До спільного", font_size=bbtn_font_size)
+        self.btn_conflicts = Button(text="Розбіжності", font_size=bbtn_font_size)
         self.btn_bookmark_start = Button(text="Закладку на початок", font_size=bbtn_font_size)
         self.btn_back = Button(text="Повернутися", font_size=bbtn_font_size)
         
         # Список кнопок залежить від типу редактора
         if self.editor_name == "accent_editor":
-            for btn in (self.btn_theme, self.btn_bookmark_start, self.btn_save_txt, self.btn_save_mp3, self.btn_sort_dict, self.btn_back):
+            for btn in (self.btn_theme, self.btn_bookmark_start, self.btn_save_txt, self.btn_save_mp3, self.btn_sort_dict, self.btn_unknown_words, self.btn_apply_batch, self.btn_promote, self.btn_conflicts, self.btn_back):
                 btn_grid.add_widget(btn)
-            self.extra_button_list = (self.btn_theme, self.btn_bookmark_start, self.btn_save_txt, self.btn_save_mp3, self.btn_sort_dict, self.btn_back)
+            self.extra_button_list = (self.btn_theme, self.btn_bookmark_start, self.btn_save_txt, self.btn_save_mp3, self.btn_sort_dict, self.btn_unknown_words, self.btn_apply_batch, self.btn_promote, self.btn_conflicts, self.btn_back)
         
         elif self.editor_name in ["voice_tags_editor", "sound_effects_editor"]:
             for btn in (self.btn_theme, self.btn_bookmark_start, self.btn_save_txt, self.btn_back):
@@ -84,6 +89,10 @@ class ExtraButtonsPopup(Popup):
         if self.editor_name == "accent_editor":
             self.btn_save_mp3.bind(on_press=self.on_save_mp3)
             self.btn_sort_dict.bind(on_press=self.on_sort_dict)
+            self.btn_unknown_words.bind(on_press=self.on_unknown_words)
+            self.btn_apply_batch.bind(on_press=self.on_apply_batch)
+            self.btn_promote.bind(on_press=self.on_promote)
+            self.btn_conflicts.bind(on_press=self.on_conflicts)
         self.btn_theme.bind(on_press=self.on_toggle_theme)        
         self.btn_bookmark_start.bind(on_press=self.on_bookmark_start)
         self.btn_back.bind(on_press=lambda *_: self.dismiss())
@@ -129,11 +138,36 @@ class ExtraButtonsPopup(Popup):
         except Exception as e:
             self.main_app.base_editor.logger.error(f"Помилка перемикання теми: {e}")
 
+    def on_unknown_words(self, *_):
+        """Створює частотний звіт невідомих слів книги."""
+        self.dismiss()
+        self.main_app.write_unknown_words_report()
+
+    def on_apply_batch(self, *_):
+        """Застосовує заповнений звіт невідомих слів до словника та тексту."""
+        self.dismiss()
+        self.main_app.apply_unknown_words_batch()
+
+    def on_promote(self, *_):
+        """Переносить слова проєкту до спільного словника."""
+        self.dismiss()
+        self.main_app.promote_accents_to_global()
+
+    def on_conflicts(self, *_):
+        """Звіт про розбіжності спільного та проєктного словників."""
+        self.dismiss()
+        self.main_app.write_accents_conflicts_report()
+
     def on_sort_dict(self, *_):
         """Сортує словник наголосів."""
         try:
             if hasattr(self.main_app, 'accents'):
-                self.main_app.accents = dict(sorted(self.main_app.accents.items()))
+                accents = self.main_app.accents
+                if hasattr(accents, 'local'):
+                    # Шаровий словник: сортується лише проєктний шар
+                    accents.local = dict(sorted(accents.local.items()))
+                else:
+                    self.main_app.accents = dict(sorted(accents.items()))
                 self.main_app.save_accents()
                 self.show_success_popup("Словник відсортовано")
             else:
@@ -3,18 +3,27 @@
 Менеджер роботи з файлами.
 """
 import json
+import os
 from pathlib import Path
 
+from book_editors_suite.core.accent_dict_binary import BinaryAccentDict, binary_path_for, json_to_binary, write_binary
+from book_editors_suite.core.accent_journal import AccentJournal, journal_path_for
+from book_editors_suite.core.layered_accents import LayeredAccents, open_accents_file, write_conflicts_report
+
 
 class FileManager:
     """Керування файловими операціями."""
 
+    # Після скількох змін у журналі словник ущільнюється у фоні
+    ACCENTS_JOURNAL_COMPACT = 1000
+
 #-------------------------------------------    
     def __init__(self, config_manager, editor_name: str, logger=None):
         self.config_manager = config_manager
         self.editor_name = editor_name
         self.config = config_manager.load_for_editor(editor_name)
         self.logger = logger
+        self._accent_journal = None
 
 #-------------------------------------------    
     def load_input_text(self) -> str:
@@ -66,8 +75,52 @@ class FileManager:
 
 #-------------------------------------------    
     def load_accents(self) -> dict:
-        """Завантажує словник наголосів з JSON файлу."""
+        """
+        Завантажує словник наголосів та відтворює поверх нього журнал змін.
+        Якщо поруч з JSON є бінарний словник (.acdb), він відкривається через mmap
+        без розбору всього файлу. Застарілий бінарний файл перебудовується з JSON.
+        Якщо задано спільний словник (GLOBAL_ACCENTS_FILE), проєктний словник
+        стає шаром поверх нього (LayeredAccents).
+        """
+        accents = self._load_accents_file()
+        journal = self._get_accent_journal()
+        if journal is not None:
+            try:
+                journal.replay(accents)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"\nload_accents:  Помилка відтворення журналу: {e}\n")
+
+        global_file = self.config.get('GLOBAL_ACCENTS_FILE', '')
+        if global_file:
+            # Відсутній спільний словник - порожній шар: його створить перше перенесення слів
+            try:
+                accents = LayeredAccents(open_accents_file(global_file), accents, self.logger)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"\nload_accents:  Помилка відкриття спільного словника {global_file}: {e}\n")
+        return accents
+
+#-------------------------------------------    
+    def _load_accents_file(self) -> dict:
+        """Завантажує основний файл словника (бінарний або JSON)."""
         accents_file = self.config.get('ACCENTS_FILE', '')
+        binary_file = binary_path_for(accents_file) if accents_file else None
+        if binary_file and binary_file.exists():
+            try:
+                json_file = Path(accents_file)
+                if json_file.exists() and json_file.stat().st_mtime > binary_file.stat().st_mtime:
+                    json_to_binary(json_file, binary_file)
+                    if self.logger:
+                        self.logger.info(f"\nload_accents:  Бінарний словник оновлено з {json_file.name}\n")
+                accents = BinaryAccentDict(binary_file)
+                if self.logger:
+                    self.logger.info(f"\nload_accents:  Бінарний словник наголосів відкрито: {len(accents)} слів\n")
+                return accents
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"\nload_accents:  Помилка відкриття {binary_file}: {e}\n")
+
         if accents_file and Path(accents_file).exists():
             try:
                 with open(accents_file, "r", encoding="utf-8") as f:
@@ -86,13 +139,43 @@ class FileManager:
 
 #-------------------------------------------        
     def save_accents(self, accents: dict) -> bool:
-        """Зберігає словник наголосів у JSON файл."""
+        """
+        Зберігає словник наголосів повністю та очищає журнал змін.
+        Якщо використовується бінарний словник (.acdb) - у нього, інакше у JSON файл.
+        Для шарового словника зберігається лише проєктний шар.
+        """
+        accents = self._local_layer(accents)
+        journal = self._get_accent_journal()
+        if journal is not None:
+            journal.wait()
+            try:
+                return journal.compact(accents, self._write_accents_file)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"\nsave_accents: Помилка очищення журналу: {e}\n")
+                return False
+        return self._write_accents_file(accents)
+
+#-------------------------------------------        
+    def _write_accents_file(self, accents: dict) -> bool:
+        """Атомарно записує основний файл словника (тимчасовий файл + os.replace)."""
         accents_file = self.config.get('ACCENTS_FILE', '')
         if accents_file:
+            binary_file = binary_path_for(accents_file)
             try:
+                if isinstance(accents, BinaryAccentDict) or binary_file.exists():
+                    write_binary(accents, binary_file)
+                    if self.logger:
+                        self.logger.info(f"\nsave_accents:  Бінарний словник наголосів збережено: {len(accents)} слів\n")
+                    return True
+
                 Path(accents_file).parent.mkdir(parents=True, exist_ok=True)
-                with open(accents_file, "w", encoding="utf-8") as f:
+                tmp_file = Path(accents_file + ".tmp")
+                with open(tmp_file, "w", encoding="utf-8") as f:
                     json.dump(accents, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, accents_file)
                 if self.logger:
                     self.logger.info(f"\nsave_accents:  Словник наголосів збережено: {len(accents)} слів\n")
                 return True
@@ -102,6 +185,119 @@ class FileManager:
                     self.logger.error(error_msg)
         return False
 
+#-------------------------------------------        
+    def _get_accent_journal(self):
+        """Журнал змін словника (створюється при першому зверненні)."""
+        accents_file = self.config.get('ACCENTS_FILE', '')
+        if not accents_file:
+            return None
+        if self._accent_journal is None:
+            self._accent_journal = AccentJournal(journal_path_for(accents_file), self.logger)
+        return self._accent_journal
+
+#-------------------------------------------        
+    def save_accent_word(self, accents: dict, key: str, value: str) -> bool:
+        """
+        Зберігає одне слово: дописує зміну в журнал (час не залежить від розміру словника).
+        Коли журнал виростає, словник ущільнюється у фоні.
+        """
+        accents[key] = value
+        journal = self._get_accent_journal()
+        if journal is None:
+            return False
+        try:
+            journal.append(key, value)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"\nsave_accent_word: Помилка запису в журнал: {e}\n")
+            return False
+
+        if journal.pending >= self.ACCENTS_JOURNAL_COMPACT:
+            local = self._local_layer(accents)
+            snapshot = local.snapshot() if isinstance(local, BinaryAccentDict) else dict(local)
+            journal.compact_in_background(snapshot, self._write_accents_file)
+        if self.logger:
+            self.logger.debug(f"save_accent_word: '{key}' -> '{value}' (версія словника {journal.version})")
+        return True
+
+#-------------------------------------------        
+    @staticmethod
+    def _local_layer(accents):
+        """Словник, що зберігається у файл проєкту (для шарового - проєктний шар)."""
+        return accents.local if isinstance(accents, LayeredAccents) else accents
+
+#-------------------------------------------        
+    def promote_accents_to_global(self, accents, keys=None) -> int:
+        """
+        Переносить слова проєкту (усі або keys) у спільний словник і
+        прибирає їх з проєктного. Повертає кількість перенесених слів.
+        """
+        global_file = self.config.get('GLOBAL_ACCENTS_FILE', '')
+        if not global_file or not isinstance(accents, LayeredAccents):
+            if self.logger:
+                self.logger.warning("\npromote_accents_to_global: Спільний словник не налаштовано\n")
+            return 0
+        try:
+            self.compact_accents(accents)
+            promoted = accents.promote(global_file, keys)
+            if promoted:
+                self.save_accents(accents)
+            return len(promoted)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"\npromote_accents_to_global: Помилка перенесення: {e}\n")
+            return 0
+
+#-------------------------------------------        
+    def write_accents_conflicts_report(self, accents, report_path=None):
+        """Звіт про слова з різними наголосами в спільному та проєктному словниках."""
+        if not isinstance(accents, LayeredAccents):
+            return None
+        if report_path is None:
+            accents_file = Path(self.config.get('ACCENTS_FILE', ''))
+            report_path = accents_file.with_name(accents_file.stem + "_розбіжності.tsv")
+        try:
+            report_path = write_conflicts_report(accents, report_path)
+            if self.logger:
+                self.logger.info(f"\nwrite_accents_conflicts_report: Розбіжностей: "
+                                 f"{len(accents.conflicts())} -> {report_path}\n")
+            return report_path
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"\nwrite_accents_conflicts_report: Помилка запису звіту: {e}\n")
+            return None
+
+#-------------------------------------------        
+    def compact_accents(self, accents: dict) -> bool:
+        """Ущільнює журнал у основний файл, якщо є незбережені зміни (при закритті редактора)."""
+        journal = self._get_accent_journal()
+        if journal is None:
+            return False
+        journal.wait()
+        if not journal.pending:
+            return True
+        return self.save_accents(accents)
+
+#-------------------------------------------        
+    def accent_changes_since(self, version: int):
+        """Слова, змінені в словнику після версії version (None - невідомо)."""
+        journal = self._get_accent_journal()
+        if journal is None:
+            return None
+        try:
+            return journal.changes_since(version)
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"\naccent_changes_since: Помилка читання журналу: {e}\n")
+            return None
+
+#-------------------------------------------        
+    @property
+    def accents_version(self) -> int:
+        """Версія словника: номер останньої зміни в журналі."""
+        journal = self._get_accent_journal()
+        return journal.version if journal is not None else 0
+
 #-------------------------------------------    
     def get_config_value(self, key: str, default=None):
         """Отримує значення з конфігурації."""
@@ -111,9 +307,8 @@ class FileManager:
     def update_config(self, updates: dict):
         """Оновлює конфігурацію через config_manager."""
         try:
+            # self.config - живий конфіг редактора, config_manager оновлює його на місці
             self.config_manager.save_from_editor(self.editor_name, updates)
-            # Оновлюємо локальну копію конфігурації
-            self.config = self.config_manager.load_for_editor(self.editor_name)
             if self.logger:
                 self.logger.info(f"\nupdate_config: Конфігурацію оновлено: {list(updates.keys())}\n")
             return True
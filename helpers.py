@@ -9,15 +9,26 @@ import re
 from datetime import datetime
 from pathlib import Path
 
-try:
-    from jnius import autoclass
-    PythonActivity = autoclass('org.kivy.android.PythonActivity')
-    Context = autoclass('android.content.Context')
-    BatteryManager = autoclass('android.os.BatteryManager')
-    Intent = autoclass('android.content.Intent')
-    IntentFilter = autoclass('android.content.IntentFilter')
-except Exception:
-    PythonActivity = Context = BatteryManager = Intent = IntentFilter = None
+# Класи Android (pyjnius) завантажуються при першому запиті заряду батареї -
+# модуль імпортують усі процеси, а більшості з них Android API не потрібне
+PythonActivity = Context = BatteryManager = Intent = IntentFilter = None
+_ANDROID_LOADED = False
+
+
+def _load_android_classes():
+    global PythonActivity, Context, BatteryManager, Intent, IntentFilter, _ANDROID_LOADED
+    if _ANDROID_LOADED:
+        return
+    _ANDROID_LOADED = True
+    try:
+        from jnius import autoclass
+        PythonActivity = autoclass('org.kivy.android.PythonActivity')
+        Context = autoclass('android.content.Context')
+        BatteryManager = autoclass('android.os.BatteryManager')
+        Intent = autoclass('android.content.Intent')
+        IntentFilter = autoclass('android.content.IntentFilter')
+    except Exception:
+        PythonActivity = Context = BatteryManager = Intent = IntentFilter = None
 
 # Регулярка для слів з комбінованим наголосом та апострофом
 WORD_RE = re.compile(
@@ -39,6 +50,21 @@ def match_casing(original: str, replacement: str) -> str:
         return replacement[0].upper() + replacement[1:].lower()
     return replacement.lower()
 
+# Транслітерація українських букв у латиницю (для назв файлів і папок)
+UK_TO_LAT = {
+    'а':'a','б':'b','в':'v','г':'h','ґ':'g','д':'d','е':'e','є':'ye','ж':'zh',
+    'з':'z','и':'y','і':'i','ї':'yi','й':'y','к':'k','л':'l','м':'m','н':'n',
+    'о':'o','п':'p','р':'r','с':'s','т':'t','у':'u','ф':'f','х':'kh','ц':'ts',
+    'ч':'ch','ш':'sh','щ':'shch','ь':'','ю':'yu','я':'ya'
+}
+
+def transliterate(text: str) -> str:
+    """Латиницею в нижньому регістрі; пробіли та інші символи -> '_'."""
+    return "".join(
+        UK_TO_LAT[ch] if ch in UK_TO_LAT else (ch if ch.isalnum() or ch == '_' else '_')
+        for ch in text.lower()
+    )
+
 def get_clock_str() -> str:
     """Повертає поточний час у форматі HH:MM."""
     try:
@@ -51,6 +77,7 @@ def get_battery_percent() -> int:
     Повертає заряд батареї у %.
     Спочатку через BatteryManager.getIntProperty, якщо недоступно - через ACTION_BATTERY_CHANGED.
     """
+    _load_android_classes()
     try:
         if BatteryManager and PythonActivity:
             activity = PythonActivity.mActivity
@@ -76,11 +103,5 @@ def get_battery_percent() -> int:
 
 def sanitize_filename(s: str) -> str:
     """Очищує рядок для використання в назвах файлів."""
-    s2 = re.sub(r"^##\s* ", "", s)
-    s2 = re.sub(r"#g\d+: ? ", "", s2)
-    s2 = re.sub(r"#S\d+: ? ", "", s2)
-    s2 = s2.strip()
-    s2 = re.sub(r"[^\w\d_-]", "_", s2)
-    if not s2:
-        s2 = "Глава"
-    return s2
\ No newline at end of file
+    from book_editors_suite.core.text_normalizer import normalize
+    return normalize(s, 'filename')
\ No newline at end of file
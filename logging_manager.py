@@ -1,12 +1,95 @@
 # -*- coding: utf-8 -*-
 """
 Менеджер логування для всіх редакторів.
+
+Логер лише кладе записи в чергу (QueueHandler), а запис у файл і на консоль
+робить фоновий потік (QueueListener) - редактор і конвеєр не чекають на диск.
+Файл логу обмежений за розміром: при переповненні він стає <app>.log.1.gz
+(старі архіви зсуваються, найстаріший видаляється).
+
+Повідомлення на гарячих шляхах - у %-стилі з аргументами (форматуються лише
+якщо рівень увімкнено) і під перевіркою isEnabledFor.
+
+    python logging_manager.py [кількість_викликів]   - вартість логування до/після
 """
+import atexit
+import gzip
 import logging
+import logging.handlers
+import os
+import queue
+import shutil
 import sys
+import tempfile
+import time
 from datetime import datetime
 from pathlib import Path
 
+# Розмір файлу логу, після якого він архівується, і скільки архівів зберігати
+LOG_MAX_BYTES = 2 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s\n'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Запущені фонові потоки логування: ім'я логера -> QueueListener
+_LISTENERS = {}
+
+
+def _gzip_namer(name: str) -> str:
+    return name + ".gz"
+
+
+def _gzip_rotator(source: str, dest: str):
+    """Стискає заповнений файл логу в архів і видаляє оригінал."""
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def make_rotating_file_handler(log_file, max_bytes: int = LOG_MAX_BYTES,
+                               backup_count: int = LOG_BACKUP_COUNT) -> logging.Handler:
+    """Файловий обробник з ротацією за розміром і стисненням старих логів (.gz)."""
+    handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    handler.namer = _gzip_namer
+    handler.rotator = _gzip_rotator
+    return handler
+
+
+def start_queue_logging(logger: logging.Logger, handlers) -> logging.handlers.QueueListener:
+    """
+    Під'єднує до логера QueueHandler, а handlers передає фоновому потоку.
+    Попередні обробники логера (і його попередній потік) прибираються.
+    """
+    stop_queue_logging(logger.name)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _LISTENERS[logger.name] = listener
+    return listener
+
+
+def stop_queue_logging(name: str = None):
+    """Дописує чергу і зупиняє фоновий потік логера (name=None - усіх)."""
+    names = list(_LISTENERS) if name is None else [name]
+    for key in names:
+        listener = _LISTENERS.pop(key, None)
+        if listener is None:
+            continue
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+# Незаписані повідомлення дописуються при виході з процесу
+atexit.register(stop_queue_logging)
+
 
 class LoggingManager:
     """Керування логуванням додатку."""
@@ -31,33 +114,25 @@ class LoggingManager:
             self.logger = logging.getLogger(self.app_name)
             self.logger.setLevel(self.level)
             
-            # Видаляємо старі обробники
-            for handler in self.logger.handlers[:]:
-                self.logger.removeHandler(handler)
-            
             # Форматер
-            formatter = logging.Formatter(
-                '%(asctime)s - %(levelname)s - %(message)s\n',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
+            formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
             
-            # Файловий обробник
-            file_handler = logging.FileHandler(log_file, encoding='utf-8')
+            # Файловий обробник з ротацією
+            file_handler = make_rotating_file_handler(log_file)
             file_handler.setFormatter(formatter)
             
             # Консольний обробник
             console_handler = logging.StreamHandler(sys.stdout)
             console_handler.setFormatter(formatter)
             
-            # Додаємо обробники
-            self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)
+            # Обидва обробники працюють у фоновому потоці
+            start_queue_logging(self.logger, (file_handler, console_handler))
             
             self.info("=_" * 10)
-            self.info(f"setup_logging: 🚀 {self.app_name} запущено\n")
-            self.info(f"📝 Лог-файл: {log_file}\n")
+            self.info("setup_logging: 🚀 %s запущено\n", self.app_name)
+            self.info("📝 Лог-файл: %s\n", log_file)
             self.info("=_" * 10)
-            
+
         except Exception as e:
             print(f"setup_logging: ❌ Помилка налаштування логування: {e}\n")
             # Резервний логер
@@ -68,32 +143,122 @@ class LoggingManager:
                 self.logger.addHandler(handler)
 
 #-------------------------------------------    
-    def info(self, message: str):
+    def isEnabledFor(self, level: int) -> bool:
+        """Чи буде записано повідомлення цього рівня (для перевірки перед дорогим форматуванням)."""
+        return self.logger is not None and self.logger.isEnabledFor(level)
+
+#-------------------------------------------    
+    def info(self, message: str, *args):
         """Запис інформаційного повідомлення."""
         if self.logger:
-            self.logger.info(message)
+            self.logger.info(message, *args)
 
 #-------------------------------------------    
-    def error(self, message: str):
+    def error(self, message: str, *args):
         """Запис повідомлення про помилку."""
         if self.logger:
-            self.logger.error(message)
+            self.logger.error(message, *args)
 
 #-------------------------------------------    
-    def warning(self, message: str):
+    def warning(self, message: str, *args):
         """Запис попереджувального повідомлення."""
         if self.logger:
-            self.logger.warning(message)
+            self.logger.warning(message, *args)
 
 #-------------------------------------------    
-    def debug(self, message: str):
+    def debug(self, message: str, *args):
         """Запис відлагоджувального повідомлення."""
         if self.logger:
-            self.logger.debug(message)
+            self.logger.debug(message, *args)
 
 #-------------------------------------------    
-    def critical(self, message: str):
+    def critical(self, message: str, *args):
         """Запис критичного повідомлення."""
         if self.logger:
-            self.logger.critical(message)
-#-------------------------------------------            
\ No newline at end of file
+            self.logger.critical(message, *args)
+
+#-------------------------------------------    
+    def close(self):
+        """Дописує чергу в файл і зупиняє фоновий потік."""
+        if self.logger:
+            stop_queue_logging(self.logger.name)
+#-------------------------------------------
+
+
+def benchmark(calls: int = 10000):
+    """
+    Вартість calls викликів логування для потоку, що логує (мс):
+    sync  - FileHandler + StreamHandler прямо в потоці (як було),
+    queue - QueueHandler (файл і консоль у фоновому потоці), drain - дописування черги,
+    enqueue - лише постановка в чергу (без фонового потоку, що на одному ядрі ділить з нами GIL),
+    debug_fstring / debug_guarded - вимкнений DEBUG з f-рядком і з перевіркою рівня.
+    """
+    results = {}
+    formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+    original, replacement = "Слово", "сло\u0301во"
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w", encoding="utf-8") as devnull:
+        def handlers(name, rotating):
+            file_path = os.path.join(tmp, f"{name}.log")
+            file_handler = (make_rotating_file_handler(file_path) if rotating
+                            else logging.FileHandler(file_path, encoding='utf-8'))
+            console_handler = logging.StreamHandler(devnull)
+            for handler in (file_handler, console_handler):
+                handler.setFormatter(formatter)
+            return file_handler, console_handler
+
+        sync_logger = logging.getLogger("logging_benchmark_sync")
+        sync_logger.propagate = False
+        sync_logger.setLevel(logging.INFO)
+        sync_handlers = handlers("sync", False)
+        for handler in sync_handlers:
+            sync_logger.addHandler(handler)
+        started = time.perf_counter()
+        for i in range(calls):
+            sync_logger.info(f"Фрагмент {i}: {original} -> {replacement}")
+        results['sync'] = (time.perf_counter() - started) * 1000
+        for handler in sync_handlers:
+            sync_logger.removeHandler(handler)
+            handler.close()
+
+        queue_logger = logging.getLogger("logging_benchmark_queue")
+        queue_logger.propagate = False
+        queue_logger.setLevel(logging.INFO)
+        start_queue_logging(queue_logger, handlers("queue", True))
+        started = time.perf_counter()
+        for i in range(calls):
+            queue_logger.info("Фрагмент %d: %s -> %s", i, original, replacement)
+        results['queue'] = (time.perf_counter() - started) * 1000
+        stop_queue_logging(queue_logger.name)
+        results['drain'] = (time.perf_counter() - started) * 1000 - results['queue']
+
+        queue_logger.handlers[0].queue = queue.SimpleQueue()
+        started = time.perf_counter()
+        for i in range(calls):
+            queue_logger.info("Фрагмент %d: %s -> %s", i, original, replacement)
+        results['enqueue'] = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for i in range(calls):
+            queue_logger.debug(f"match_casing: '{original}' -> '{replacement}' -> '{i}'")
+        results['debug_fstring'] = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        for i in range(calls):
+            if queue_logger.isEnabledFor(logging.DEBUG):
+                queue_logger.debug("match_casing: '%s' -> '%s' -> '%s'", original, replacement, i)
+        results['debug_guarded'] = (time.perf_counter() - started) * 1000
+        for handler in queue_logger.handlers[:]:
+            queue_logger.removeHandler(handler)
+    return results
+
+
+# ========== Вартість логування з командного рядка ==========
+if __name__ == "__main__":
+    calls_arg = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    report = benchmark(calls_arg)
+    print(f"Логування, {calls_arg} викликів (час потоку, що логує):")
+    print(f"  до:    FileHandler + StreamHandler       {report['sync']:8.1f} мс")
+    print(f"  після: QueueHandler (фоновий потік)      {report['queue']:8.1f} мс"
+          f"  (дописування черги {report['drain']:.1f} мс)")
+    print(f"         лише постановка в чергу          {report['enqueue']:8.1f} мс")
+    print(f"  DEBUG вимкнено: f-рядок                 {report['debug_fstring']:8.1f} мс")
+    print(f"  DEBUG вимкнено: isEnabledFor + %-стиль  {report['debug_guarded']:8.1f} мс")
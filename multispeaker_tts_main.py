@@ -17,16 +17,20 @@ import shutil
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-# TTS
-try:
-    from gtts import gTTS
-except:
-    gTTS = None
+# gTTS та pydub імпортуються при першому використанні (див. tts_generate_gtts, audio_segment)
 
-try:
-    from pydub import AudioSegment
-except:
-    AudioSegment = None
+sys.path.insert(0, '/storage/emulated/0/a0_sb2_book_editors_suite')
+
+from book_editors_suite.core.audio_validator import validate_book, bad_fragments, list_chapter_fragments
+from book_editors_suite.core.audio_merge import audio_segment, merge_fragments
+from book_editors_suite.core.logging_manager import (LOG_DATE_FORMAT, make_rotating_file_handler,
+                                                     start_queue_logging)
+from book_editors_suite.core.book_assembler import (BookAssembler, BOOK_MANIFEST_KEY, BOOK_MANIFEST_NAME,
+                                                    chapter_manifest_key)
+from book_editors_suite.core.music_bed import find_bed_config
+from book_editors_suite.core.project_store import STORE_FLAG, open_project_store
+from book_editors_suite.core.synthesis_scheduler import count_voice_switches, schedule_by_voice, voice_key
+from book_editors_suite.core.text_normalizer import normalize
 
 
 class SimpleConfigManager:
@@ -46,6 +50,11 @@ class SimpleConfigManager:
         # Завантажуємо конфіг
         with open(self.config_file, 'r', encoding='utf-8') as f:
             self.full_config = json.load(f)
+
+        # Сховище проекту (якщо ввімкнено) - там найсвіжіші зміни редакторів
+        self.project_store = open_project_store(self.config_file, bool(self.full_config.get(STORE_FLAG)))
+        if self.project_store is not None:
+            self.full_config = self.project_store.get_config()
     
     def load_for_editor(self, editor_name: str) -> Dict:
         """Завантажує конфігурацію для конкретного редактора"""
@@ -95,53 +104,56 @@ class SimpleLoggingManager:
             self.log_dir.mkdir(parents=True, exist_ok=True)
             log_file = self.log_dir / f"{self.app_name}.log"
             
-            # Налаштування базового логування
-            logging.basicConfig(
-                level=logging.INFO,
-                handlers=[
-                    logging.FileHandler(log_file, encoding='utf-8'),
-                    logging.StreamHandler(sys.stdout)
-                ],
-                format='%(asctime)s - %(levelname)s - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
+            # Кореневий логер: запис у файл (з ротацією) і на консоль - у фоновому потоці
+            formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s',
+                                          datefmt=LOG_DATE_FORMAT)
+            handlers = [make_rotating_file_handler(log_file), logging.StreamHandler(sys.stdout)]
+            for handler in handlers:
+                handler.setFormatter(formatter)
+            root = logging.getLogger()
+            root.setLevel(logging.INFO)
+            start_queue_logging(root, handlers)
             
             self.logger = logging.getLogger(self.app_name)
-            self.info(f"🚀 {self.app_name} запущено")
-            self.info(f"📝 Лог-файл: {log_file}")
+            self.info("🚀 %s запущено", self.app_name)
+            self.info("📝 Лог-файл: %s", log_file)
             
         except Exception as e:
             print(f"Помилка налаштування логування: {e}")
             # Резервний логер
             self.logger = logging.getLogger(f"{self.app_name}_fallback")
     
-    def info(self, message: str):
+    def isEnabledFor(self, level: int) -> bool:
+        """Чи буде записано повідомлення цього рівня"""
+        return hasattr(self, 'logger') and self.logger.isEnabledFor(level)
+    
+    def info(self, message: str, *args):
         """Запис інформаційного повідомлення"""
         if hasattr(self, 'logger'):
-            self.logger.info(message)
+            self.logger.info(message, *args)
         else:
-            print(f"INFO: {message}")
+            print(f"INFO: {message % args if args else message}")
     
-    def error(self, message: str):
+    def error(self, message: str, *args):
         """Запис повідомлення про помилку"""
         if hasattr(self, 'logger'):
-            self.logger.error(message)
+            self.logger.error(message, *args)
         else:
-            print(f"ERROR: {message}")
+            print(f"ERROR: {message % args if args else message}")
     
-    def warning(self, message: str):
+    def warning(self, message: str, *args):
         """Запис попереджувального повідомлення"""
         if hasattr(self, 'logger'):
-            self.logger.warning(message)
+            self.logger.warning(message, *args)
         else:
-            print(f"WARNING: {message}")
+            print(f"WARNING: {message % args if args else message}")
     
-    def debug(self, message: str):
+    def debug(self, message: str, *args):
         """Запис відлагоджувального повідомлення"""
         if hasattr(self, 'logger'):
-            self.logger.debug(message)
+            self.logger.debug(message, *args)
         else:
-            print(f"DEBUG: {message}")
+            print(f"DEBUG: {message % args if args else message}")
 
 
 class MultispeakerTTS:
@@ -175,6 +187,14 @@ class MultispeakerTTS:
         self._current_text_folder = None
         self._current_audio_folder = None
         self._current_chapter_name_for_files = None
+        self._chapter_manifest = []
+        self._synthesis_queue = []
+        self._book_chapters = []
+        self._chapters_in_queue = 0
+        self._last_text_voice_key = None
+        self._last_synth_voice_key = None
+        self._text_order_voice_switches = 0
+        self._voice_switches = 0
         
         # Ініціалізація параметрів з конфігу
         self._init_from_config()
@@ -202,6 +222,14 @@ class MultispeakerTTS:
         self.FRAGMENT_SOFT_LIMIT = self.config.get('FRAGMENT_SOFT_LIMIT', 900)
         self.FRAGMENT_HARD_LIMIT = self.config.get('FRAGMENT_HARD_LIMIT', 1000)
         self.SOUNDS_MODE = "mp3" if self.TTS_MODE == "gTTS" else "wav"
+        self.VALIDATE_AUDIO = self.config.get('VALIDATE_AUDIO', True)
+        self.MERGE_WORKERS = self.config.get('MERGE_WORKERS', 0)
+        self.MERGE_LOOKAHEAD = self.config.get('MERGE_LOOKAHEAD', 0)
+        self.DO_ASSEMBLE = self.config.get('DO_ASSEMBLE', False)
+        self.ASSEMBLE_STEMS = self.config.get('ASSEMBLE_STEMS', False)
+        self.MUSIC_BEDS = self.config.get('MUSIC_BEDS', {})
+        # 0 - озвучувати одразу в порядку тексту; N - пакетами за голосами в межах N глав
+        self.SYNTH_SCHEDULE_WINDOW = self.config.get('SYNTH_SCHEDULE_WINDOW', 0)
         
         # Завантажуємо додаткові дані звукових ефектів
         self.scenarios = self._load_scenarios_json()
@@ -237,30 +265,14 @@ class MultispeakerTTS:
 
     def sanitize_chapter_folder_name(self, s: str) -> str:
         """Очищує назву глави для використання в іменах папок"""
-        s2 = re.sub(r"^##\s*", "", s)
-        s2 = re.sub(r"#g\d+(?:_(slow|fast))?:", "", s2, flags=re.IGNORECASE)
-        s2 = re.sub(r"#S\d+:", "", s2, flags=re.IGNORECASE)
-        s2 = s2.strip()
-        s2 = s2.replace('\u0301', '')
-        s2 = s2.replace("'", '')
-        s2 = s2.replace(' ', '_')
-        s2 = s2.replace(',', '')
-        s2 = s2.replace('.', '')
-        s2 = s2.replace('+', '')
-        s2 = re.sub(r"[\\/:*?\"<>|]", "_", s2)
-        
-        if not s2:
-            s2 = "Глава"
-            
-        self.logger.info(f"MultispeakerTTS: Назва глави: '{s2}'")
+        s2 = normalize(s, 'folder_name')
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("MultispeakerTTS: Назва глави: '%s'", s2)
         return s2
 
     def sanitize_chapter_fragment_title(self, s: str) -> str:
         """Очищує назву глави для фрагментів"""
-        s2 = re.sub(r"^##\s*", "", s)
-        s2 = re.sub(r"#g\d+(?:_(slow|fast))?:", "", s2, flags=re.IGNORECASE)
-        s2 = re.sub(r"#S\d+:", "", s2, flags=re.IGNORECASE)
-        return s2.strip()
+        return normalize(s, 'fragment_title')
 
     def format_fragment_filename(self, chapter_name: str, num: int, ext: str) -> str:
         """Форматує ім'я файлу фрагмента"""
@@ -307,7 +319,9 @@ class MultispeakerTTS:
     # ---------- TTS генерація ----------
     def tts_generate_gtts(self, text: str, out_path: Path, lang: str = 'uk') -> bool:
         """Генерація TTS через gTTS"""
-        if gTTS is None:
+        try:
+            from gtts import gTTS
+        except ImportError:
             self.logger.error("MultispeakerTTS: gTTS не встановлено")
             return False
         try:
@@ -331,6 +345,21 @@ class MultispeakerTTS:
             self.logger.error(f"MultispeakerTTS: TFile помилка: {e}")
             return False
 
+    def synthesize_to_file(self, text: str, out_path: Path, voice: str = None, speed: str = "normal") -> bool:
+        """Озвучує текст у файл згідно з TTS_MODE (числа та скорочення - словами)"""
+        text = normalize(text, 'tts')
+        key = (voice, speed)
+        if voice is not None:
+            if self._last_synth_voice_key is not None and key != self._last_synth_voice_key:
+                self._voice_switches += 1
+            self._last_synth_voice_key = key
+
+        if self.TTS_MODE == 'gTTS':
+            return self.tts_generate_gtts(text, out_path)
+        elif self.TTS_MODE == 'TFile':
+            return self.tts_generate_tfile(text, out_path)
+        return False
+
     # ---------- Збереження фрагмента ----------
     def save_fragment_and_tts(self, fragment_text: str, voice_tag: str, speed: str, 
                             chapter_folder_name: str, fragment_num: int) -> Tuple[bool, Optional[Path]]:
@@ -354,18 +383,31 @@ class MultispeakerTTS:
         audio_name = self.format_fragment_filename(chapter_folder_name, fragment_num, self.SOUNDS_MODE)
         audio_path = self._current_audio_folder / audio_name
 
-        success = False
-        if self.TTS_MODE == 'gTTS':
-            success = self.tts_generate_gtts(fragment_text, audio_path)
-        elif self.TTS_MODE == 'TFile':
-            success = self.tts_generate_tfile(fragment_text, audio_path)
+        self._record_fragment(fragment_num, 'speech', audio_name, voice=voice_tag, speed=speed, text_file=txt_name)
+        self._current_fragment_counter += 1
+
+        job = {
+            'kind': 'speech', 'audio_path': str(audio_path), 'text_path': str(txt_path),
+            'voice': voice_tag, 'speed': speed
+        }
+        # Перемикання голосу, якби фрагменти озвучувались у порядку тексту
+        self._text_order_voice_switches += count_voice_switches([job], self._last_text_voice_key)
+        self._last_text_voice_key = voice_key(job)
+
+        if self.SYNTH_SCHEDULE_WINDOW:
+            # Озвучування відкладається: черга буде оброблена пакетами за голосами
+            self._synthesis_queue.append(job)
+            return True, audio_path
+
+        success = self.synthesize_to_file(fragment_text, audio_path, voice_tag, speed)
 
         if success:
             self.logger.info(f"MultispeakerTTS: Фрагмент озвучено: {audio_path} (голос: {voice_tag}, швидкість: {speed})")
-            self._current_fragment_counter += 1
             return True, audio_path
         else:
-            self.logger.error(f"MultispeakerTTS: Не вдалося озвучити фрагмент #{fragment_num}")
+            # Номер фрагмента зарезервовано, повторна спроба - через чергу синтезу
+            self.logger.error(f"MultispeakerTTS: Не вдалося озвучити фрагмент #{fragment_num}, додано в чергу повтору")
+            self._synthesis_queue.append(job)
             return False, None
 
     # ---------- Додавання пауз та звукових ефектів ----------
@@ -384,6 +426,10 @@ class MultispeakerTTS:
             if pause_path.exists():
                 shutil.copy2(str(pause_path), str(out_path))
                 self.logger.info(f"MultispeakerTTS: Додано паузу: {tag} -> {out_path}")
+                # У маніфест - лише скопійовані файли, інакше перевірка вважатиме їх втраченими
+                self._record_fragment(frag_num, 'pause', out_path.name, tag=tag, source=str(pause_path))
+            else:
+                self.logger.warning(f"MultispeakerTTS: Файл паузи не знайдено: {pause_path}")
         elif tag.startswith('S') and tag[1:].isdigit():
             # Звуковий ефект з тегу S01, S02, etc.
             sound_tag_upper = tag.upper()
@@ -397,6 +443,7 @@ class MultispeakerTTS:
             if sound_inp_path.exists():
                 shutil.copyfile(str(sound_inp_path), str(out_path))
                 self.logger.info(f"MultispeakerTTS: Додано звуковий ефект: {tag} -> {out_path}")
+                self._record_fragment(frag_num, 'sfx', out_path.name, tag=sound_tag_upper, source=str(sound_inp_path))
             else:
                 self.logger.warning(f"MultispeakerTTS: Файл звукового ефекту не знайдено: {sound_inp_path}")
         
@@ -420,6 +467,7 @@ class MultispeakerTTS:
         if melody_inp_path.exists():
             shutil.copyfile(str(melody_inp_path), str(out_path))
             self.logger.info(f"MultispeakerTTS: Додано мелодію {kind}: {out_path}")
+            self._record_fragment(frag_num, 'melody', out_path.name, tag=kind, source=str(melody_inp_path))
         else:
             self.logger.warning(f"MultispeakerTTS: Файл мелодії не знайдено: {melody_inp_path}")
         
@@ -462,6 +510,7 @@ class MultispeakerTTS:
 
         self._current_fragment_counter = 0
         self._current_block_text = []
+        self._chapter_manifest = []
         self._current_voice_tag = 'G1'  # голос за замовчуванням
         self._current_voice_speed = "normal"  # швидкість за замовчуванням
 
@@ -472,6 +521,7 @@ class MultispeakerTTS:
             self._current_voice_speed = voice_match.group(2) if voice_match.group(2) else "normal"
 
         self._current_chapter_name_for_files = chapter_folder_name
+        self._book_chapters.append({'folder': chapter_folder_name, 'title': chapter_fragment_title})
         
         # Додати мелодію початку
         self.add_melody(self._current_chapter_folder, self._current_fragment_counter, "START")
@@ -569,14 +619,173 @@ class MultispeakerTTS:
         
         # Додати мелодію завершення
         self.add_melody(self._current_chapter_folder, self._current_fragment_counter, "END")
+        self._save_chapter_manifest()
+
+        # Пакетне озвучування, коли у вікні накопичилось SYNTH_SCHEDULE_WINDOW глав
+        if self.SYNTH_SCHEDULE_WINDOW:
+            self._chapters_in_queue += 1
+            if self._chapters_in_queue >= self.SYNTH_SCHEDULE_WINDOW:
+                self.process_synthesis_queue()
+                self._chapters_in_queue = 0
         
         self.logger.info(f"MultispeakerTTS: Глава '{self._current_chapter_name_for_files}' завершена. Фрагментів: {self._current_fragment_counter}")
         self._current_block_text = []
         self._current_voice_tag = None
 
+    # ---------- Маніфест глави та черга синтезу ----------
+    def _record_fragment(self, frag_num: int, kind: str, file_name: str, **info):
+        """Записує фрагмент у маніфест поточної глави"""
+        entry = {'num': frag_num, 'kind': kind, 'file': file_name}
+        entry.update(info)
+        self._chapter_manifest.append(entry)
+
+    def _save_chapter_manifest(self):
+        """Зберігає маніфест поточної глави у manifest.json"""
+        if self._current_chapter_folder is None:
+            return
+        manifest_path = self._current_chapter_folder / "manifest.json"
+        manifest = {'sounds_mode': self.SOUNDS_MODE, 'fragments': self._chapter_manifest}
+        try:
+            with manifest_path.open('w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            if self.config_manager.project_store is not None:
+                self.config_manager.project_store.save_manifest(
+                    chapter_manifest_key(self._current_chapter_folder.name), manifest)
+        except Exception as e:
+            self.logger.warning(f"MultispeakerTTS: Не вдалося зберегти маніфест глави: {e}")
+
+    def load_chapter_manifest(self, chapter_folder: Path) -> List[Dict]:
+        """Завантажує маніфест глави (список фрагментів)"""
+        manifest_path = Path(chapter_folder) / "manifest.json"
+        store = self.config_manager.project_store
+        if store is not None:
+            manifest = store.load_manifest(chapter_manifest_key(Path(chapter_folder).name))
+            if manifest is not None:
+                return manifest.get('fragments', [])
+        if not manifest_path.exists():
+            return []
+        try:
+            with manifest_path.open('r', encoding='utf-8') as f:
+                return json.load(f).get('fragments', [])
+        except Exception as e:
+            self.logger.warning(f"MultispeakerTTS: Помилка читання маніфесту {manifest_path}: {e}")
+            return []
+
+    def _save_book_manifest(self):
+        """Зберігає порядок та назви глав книги (для збирання книги)"""
+        manifest_path = self._project_root / BOOK_MANIFEST_NAME
+        manifest = {'sounds_mode': self.SOUNDS_MODE, 'chapters': self._book_chapters}
+        try:
+            with manifest_path.open('w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            if self.config_manager.project_store is not None:
+                self.config_manager.project_store.save_manifest(BOOK_MANIFEST_KEY, manifest)
+        except Exception as e:
+            self.logger.warning(f"MultispeakerTTS: Не вдалося зберегти маніфест книги: {e}")
+
+    def requeue_fragment(self, chapter_folder: Path, entry: Dict):
+        """Повертає фрагмент з маніфесту в чергу синтезу"""
+        audio_path = Path(chapter_folder) / "Звук" / entry['file']
+        if entry.get('kind') == 'speech':
+            self._synthesis_queue.append({
+                'kind': 'speech', 'audio_path': str(audio_path),
+                'text_path': str(Path(chapter_folder) / "Текст" / entry.get('text_file', '')),
+                'voice': entry.get('voice'), 'speed': entry.get('speed', 'normal')
+            })
+        else:
+            self._synthesis_queue.append({
+                'kind': 'copy', 'audio_path': str(audio_path), 'source': entry.get('source', '')
+            })
+
+    def process_synthesis_queue(self) -> int:
+        """
+        Обробляє чергу синтезу пакетами за (голос, швидкість).
+        Повертає кількість успішних фрагментів
+        """
+        jobs = schedule_by_voice(self._synthesis_queue, self._last_synth_voice_key)
+        self._synthesis_queue = []
+        done = 0
+        for job in jobs:
+            audio_path = Path(job['audio_path'])
+            try:
+                if job['kind'] == 'speech':
+                    with open(job['text_path'], 'r', encoding='utf-8') as f:
+                        text = f.read()
+                    success = self.synthesize_to_file(text, audio_path, job.get('voice'), job.get('speed', 'normal'))
+                else:
+                    success = bool(job['source']) and Path(job['source']).exists()
+                    if success:
+                        shutil.copyfile(job['source'], str(audio_path))
+            except Exception as e:
+                self.logger.error(f"MultispeakerTTS: Помилка синтезу з черги {audio_path.name}: {e}")
+                success = False
+
+            if success:
+                done += 1
+                self.logger.info(f"MultispeakerTTS: Фрагмент з черги записано: {audio_path}")
+            else:
+                self.logger.error(f"MultispeakerTTS: Синтез з черги не вдався: {audio_path}")
+        return done
+
+    def log_synthesis_report(self):
+        """Звіт про перемикання голосів: порядок тексту проти фактичного"""
+        saved = self._text_order_voice_switches - self._voice_switches
+        self.logger.info(f"MultispeakerTTS: Перемикань голосу: {self._voice_switches} "
+                         f"(у порядку тексту було б {self._text_order_voice_switches}, заощаджено {max(saved, 0)}; "
+                         f"вікно планування: {self.SYNTH_SCHEDULE_WINDOW} глав)")
+
+    def validate_rendered_audio(self, requeue: bool = True) -> List[Dict]:
+        """
+        Перевіряє всі фрагменти проекту за заголовками (без декодування).
+        Пошкоджені фрагменти повертаються в чергу синтезу та перезаписуються.
+        Повертає список фрагментів, що лишилися пошкодженими.
+        """
+        if self._project_root is None:
+            return []
+
+        report = validate_book(self._project_root, self.SOUNDS_MODE)
+        bad = {name: bad_fragments(results) for name, results in report.items()}
+
+        # Фрагменти з маніфесту, яких немає на диску (перерваний синтез)
+        manifests = {}
+        for chapter_dir in self._project_root.iterdir():
+            if chapter_dir.is_dir():
+                manifests[chapter_dir.name] = self.load_chapter_manifest(chapter_dir)
+                for entry in manifests[chapter_dir.name]:
+                    audio_path = chapter_dir / "Звук" / entry['file']
+                    if not audio_path.exists():
+                        bad.setdefault(chapter_dir.name, []).append(
+                            {'path': str(audio_path), 'status': 'missing', 'format': None,
+                             'duration': 0.0, 'detail': 'файл відсутній'})
+
+        bad = {name: results for name, results in bad.items() if results}
+        total = sum(len(results) for results in report.values())
+        self.logger.info(f"MultispeakerTTS: Перевірено фрагментів: {total}, пошкоджених: {sum(len(r) for r in bad.values())}")
+
+        if not bad or not requeue:
+            return [r for results in bad.values() for r in results]
+
+        for chapter_name, results in bad.items():
+            chapter_folder = self._project_root / chapter_name
+            by_file = {e['file']: e for e in manifests.get(chapter_name, [])}
+            for r in results:
+                name = Path(r['path']).name
+                self.logger.warning(f"MultispeakerTTS: {r['status']}: {name} ({r['detail']})")
+                if name in by_file:
+                    self.requeue_fragment(chapter_folder, by_file[name])
+                else:
+                    self.logger.warning(f"MultispeakerTTS: Фрагмент {name} відсутній у маніфесті, повтор неможливий")
+
+        self.process_synthesis_queue()
+        return self.validate_rendered_audio(requeue=False)
+
     def merge_chapter_audio(self, chapter_folder: Path):
-        """Об'єднує всі звукові фрагменти глави в один файл"""
-        if AudioSegment is None:
+        """
+        Об'єднує всі звукові фрагменти глави в один файл.
+        Фрагменти декодуються паралельно (MERGE_WORKERS, 0 - всі ядра) з
+        обмеженим випередженням (MERGE_LOOKAHEAD), запис - послідовний.
+        """
+        if audio_segment() is None and self.SOUNDS_MODE != "wav":
             self.logger.error("MultispeakerTTS: pydub не встановлено — не можу об'єднати аудіо.")
             return
             
@@ -585,23 +794,52 @@ class MultispeakerTTS:
             self.logger.warning(f"MultispeakerTTS: Папки зі звуком немає: {sound_folder}")
             return
             
-        fragments = sorted([f for f in os.listdir(sound_folder) if f.endswith(f".{self.SOUNDS_MODE}")])
+        fragments = [f for f in list_chapter_fragments(sound_folder) if f.suffix == f".{self.SOUNDS_MODE}"]
         if not fragments:
             self.logger.warning("MultispeakerTTS: Немає фрагментів для об'єднання.")
             return
             
-        combined = None
-        for f in fragments:
-            try:
-                seg = AudioSegment.from_file(str(sound_folder / f))
-                combined = seg if combined is None else combined + seg
-            except Exception as e:
-                self.logger.warning(f"MultispeakerTTS: Помилка завантаження фрагменту {f}: {e}")
-                
-        if combined:
-            out_file = sound_folder / f"{chapter_folder.name}_повна.{self.SOUNDS_MODE}"
-            combined.export(str(out_file), format=self.SOUNDS_MODE)
+        # Музична підкладка: приглушується під мовою, відновлюється в паузах та мелодіях
+        bed_config = find_bed_config(self.MUSIC_BEDS, chapter_folder.name)
+        speech_flags = None
+        if bed_config:
+            kinds = {e['file']: e.get('kind') for e in self.load_chapter_manifest(chapter_folder)}
+            speech_flags = [kinds.get(f.name) == 'speech' for f in fragments]
+            self.logger.info(f"MultispeakerTTS: Музична підкладка для {chapter_folder.name}: {bed_config['file']}")
+
+        out_file = sound_folder / f"{chapter_folder.name}_повна.{self.SOUNDS_MODE}"
+        try:
+            stats = merge_fragments(fragments, out_file, self.SOUNDS_MODE,
+                                    workers=self.MERGE_WORKERS or None,
+                                    lookahead=self.MERGE_LOOKAHEAD or None,
+                                    logger=self.logger,
+                                    music_bed=bed_config, speech_flags=speech_flags)
+        except Exception as e:
+            self.logger.error(f"MultispeakerTTS: Помилка об'єднання аудіо {chapter_folder.name}: {e}")
+            return
+
+        if stats['ok']:
             self.logger.info(f"MultispeakerTTS: Об'єднано аудіо: {out_file}")
+        else:
+            self.logger.error(f"MultispeakerTTS: Не вдалося об'єднати аудіо: {out_file}")
+
+    def assemble_book(self, with_stems: bool = None) -> Optional[Dict]:
+        """Збирає всю книгу з мітками глав (і доріжками голосів) за один прохід"""
+        if self._project_root is None:
+            self.logger.error("MultispeakerTTS: Проєкт не ініціалізовано — нема що збирати")
+            return None
+        if with_stems is None:
+            with_stems = self.ASSEMBLE_STEMS
+        assembler = BookAssembler(self._project_root, self.SOUNDS_MODE, self.voice_dict,
+                                  logger=self.logger,
+                                  workers=self.MERGE_WORKERS or None,
+                                  lookahead=self.MERGE_LOOKAHEAD or None,
+                                  store=self.config_manager.project_store)
+        try:
+            return assembler.assemble(with_stems=with_stems)
+        except Exception as e:
+            self.logger.error(f"MultispeakerTTS: Помилка збирання книги: {e}")
+            return None
 
     # ---------- Основний процес ----------
     def process_input_file(self):
@@ -645,12 +883,26 @@ class MultispeakerTTS:
 
         if in_chapter:
             self.finalize_chapter()
+        self._save_book_manifest()
+
+        # Залишок черги (останнє вікно глав) та повтор невдалих фрагментів
+        self.process_synthesis_queue()
+        self._chapters_in_queue = 0
+        self.log_synthesis_report()
+
+        if self.VALIDATE_AUDIO:
+            remaining = self.validate_rendered_audio()
+            if remaining:
+                self.logger.error(f"MultispeakerTTS: Лишилися пошкоджені фрагменти: {len(remaining)}")
 
         if self.DO_MERGE:
             for chapter_dir in self._project_root.iterdir():
                 if chapter_dir.is_dir():
                     self.merge_chapter_audio(chapter_dir)
 
+        if self.DO_ASSEMBLE:
+            self.assemble_book()
+
         self.logger.info("MultispeakerTTS: Обробка файлу завершена.")
 
     def run(self):
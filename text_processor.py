@@ -2,7 +2,11 @@
 """
 Модуль обробки тексту.
 """
-from book_editors_suite.utils.helpers import WORD_RE, strip_combining_acute, match_casing
+import logging
+
+from book_editors_suite.utils.helpers import match_casing
+from book_editors_suite.core.accent_engine import PARALLEL_THRESHOLD_CHARS, AccentEngine
+from book_editors_suite.core.paragraph_tokens import ParagraphTokens
 
 
 class TextProcessor:
@@ -10,6 +14,9 @@ class TextProcessor:
     
     def __init__(self, logger=None):
         self.logger = logger
+        self._engine = None
+        self._engine_key = None
+        self._tokens = None
     
     def match_casing(self, original: str, replacement: str) -> str:
         """
@@ -17,28 +24,51 @@ class TextProcessor:
         Використовує функцію match_casing з helpers.
         """
         result = match_casing(original, replacement)
-        if self.logger:
-            self.logger.debug(f"match_casing: '{original}' -> '{replacement}' -> '{result}'")
+        # Викликається на кожне слово - без DEBUG повідомлення навіть не форматується
+        if self.logger and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("match_casing: '%s' -> '%s' -> '%s'", original, replacement, result)
         return result
     
-    def add_accents_to_text(self, text: str, accents: dict) -> str:
-        """Додає наголоси до тексту згідно з словником."""
-        def replace_with_accent(match):
-            word = match.group(0)
-            if '\u0301' in word:  # Якщо вже є наголос - залишаємо
-                return word
-            key = strip_combining_acute(word).lower()
-            if key in accents:
-                return self.match_casing(word, accents[key])
-            return word
+    def _accent_engine(self, accents: dict) -> AccentEngine:
+        """
+        Підготовлений рушій для словника (кешується, поки той самий словник
+        не змінив розмір; зміни існуючих слів - через set_accent).
+        """
+        cache_key = (id(accents), len(accents))
+        if self._engine is None or self._engine_key != cache_key or self._engine.accents is not accents:
+            self._engine = AccentEngine(accents, self.logger)
+            self._engine_key = cache_key
+        return self._engine
 
-        accented_text = WORD_RE.sub(replace_with_accent, text)
+    def set_accent(self, accents: dict, key: str, value: str):
+        """Додає/змінює слово в словнику та в підготовленому рушії."""
+        self._accent_engine(accents).set_word(key, value)
+        self._engine_key = (id(accents), len(accents))
+
+    def add_accents_to_text(self, text: str, accents: dict) -> str:
+        """
+        Додає наголоси до тексту згідно з словником.
+        Дуже великі тексти (від PARALLEL_THRESHOLD_CHARS) обробляються в кількох процесах
+        (модуль пулу процесів імпортується лише для них).
+        """
+        engine = self._accent_engine(accents)
+        accented_text = None
+        if len(text) >= PARALLEL_THRESHOLD_CHARS:
+            from book_editors_suite.core.parallel_accents import accent_text_parallel, parallel_workers
+            if parallel_workers() > 1:
+                accented_text = accent_text_parallel(text, engine, logger=self.logger)
+        if accented_text is None:
+            accented_text = engine.accent_text(text)
         
         if self.logger:
             self.logger.info("add_accents_to_text:  Наголоси додано до тексту")
             
         return accented_text
 
+    def add_accents_to_paragraphs(self, paragraphs: list, accents: dict) -> list:
+        """Додає наголоси до списку абзаців за один прохід."""
+        return self._accent_engine(accents).accent_paragraphs(paragraphs)
+
     def split_into_paragraphs(self, text: str) -> list:
         """Розділяє текст на абзаци."""
         paragraphs = text.split("\n")
@@ -63,29 +93,51 @@ class TextProcessor:
             start += len(word)
         return positions
 
+    def paragraph_tokens(self, text: str) -> ParagraphTokens:
+        """
+        Індекс слів абзацу (кешується для останнього тексту: після ручного
+        редагування перебудовується, після replace_word_span - оновлюється).
+        """
+        if self._tokens is None or self._tokens.text != text:
+            self._tokens = ParagraphTokens(text)
+        return self._tokens
+
     def detect_word_at_cursor(self, text: str, cursor_index: int):
         """
         Визначає слово під курсором.
         Повертає (word, start, end)
+        Індексується лише абзац навколо курсора - редактори тегів і звукових
+        ефектів передають увесь текст книги.
         """
         if not text or cursor_index < 0 or cursor_index > len(text):
             return None, 0, 0
-
-        # Знаходимо межі слова
-        start = cursor_index
-        while start > 0 and self._is_word_char(text[start - 1]):
-            start -= 1
-
-        end = cursor_index
-        while end < len(text) and self._is_word_char(text[end]):
-            end += 1
-
-        word = text[start:end]
-        if WORD_RE.fullmatch(word):
-            return word, start, end
-        else:
+        para_start = text.rfind("\n", 0, cursor_index) + 1
+        para_end = text.find("\n", cursor_index)
+        if para_end == -1:
+            para_end = len(text)
+        word, start, end = self.paragraph_tokens(text[para_start:para_end]).word_at(cursor_index - para_start)
+        if word is None:
             return None, 0, 0
+        return word, start + para_start, end + para_start
+
+    def replace_word_span(self, text: str, start: int, end: int, new_word: str, old_word: str = None):
+        """
+        Замінює слово text[start:end] на new_word, індекс слів оновлюється без перебудови.
+        Повертає (новий текст, позиція курсора після слова).
+        Якщо задано old_word, а текст після виділення змінився - береться найближче таке саме слово.
+        """
+        tokens = self.paragraph_tokens(text)
+        if old_word is not None and text[start:end] != old_word:
+            found = [i for i, word in enumerate(tokens.words) if word == old_word]
+            if not found:
+                if self.logger:
+                    self.logger.warning(f"replace_word_span: Слово '{old_word}' не знайдено в абзаці")
+                return text, end
+            index = min(found, key=lambda i: abs(tokens.starts[i] - start))
+            start, end = tokens.starts[index], tokens.ends[index]
+        return tokens.splice(start, end, new_word), start + len(new_word)
 
-    def _is_word_char(self, char: str) -> bool:
-        """Перевіряє, чи символ є частиною слова."""
-        return char.isalpha() or char == '\u0301' or char == "'"
\ No newline at end of file
+    def unknown_word_spans(self, text: str, accents, min_vowels: int = 2) -> list:
+        """Межі слів без наголосу, яких немає в словнику: [(start, end)] - для підсвічування."""
+        tokens = self.paragraph_tokens(text)
+        return tokens.spans(tokens.unknown(accents, min_vowels))
\ No newline at end of file
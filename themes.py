@@ -2,7 +2,6 @@
 """
 Модуль для управління темами інтерфейсу.
 """
-from kivy.core.window import Window
 
 
 class ThemeManager:
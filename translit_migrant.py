@@ -1,24 +1,11 @@
 import os
+import sys
 from datetime import datetime
 
-# Транслитерація українських букв у латиницю
-uk_to_lat = {
-    'а':'a','б':'b','в':'v','г':'h','ґ':'g','д':'d','е':'e','є':'ye','ж':'zh',
-    'з':'z','и':'y','і':'i','ї':'yi','й':'y','к':'k','л':'l','м':'m','н':'n',
-    'о':'o','п':'p','р':'r','с':'s','т':'t','у':'u','ф':'f','х':'kh','ц':'ts',
-    'ч':'ch','ш':'sh','щ':'shch','ь':'','ю':'yu','я':'ya'
-}
+sys.path.insert(0, '/storage/emulated/0/a0_sb2_book_editors_suite')
 
-def transliterate(text):
-    result = ''
-    for char in text.lower():
-        if char in uk_to_lat:
-            result += uk_to_lat[char]
-        elif char.isalnum() or char in ['_']:
-            result += char
-        else:
-            result += '_'  # для пробілів та інших символів
-    return result
+# Транслитерація українських букв у латиницю (спільна з пакетною обробкою)
+from book_editors_suite.utils.helpers import transliterate
 
 def save_file(output_folder, input_name, text):
     # Розділяємо шлях на існуючі та нові папки
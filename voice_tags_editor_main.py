@@ -51,8 +51,7 @@ class VoiceTagsEditor(App):
         # Стан програми
         self.current_speed = "normal"
         self.selected_word = None
-        self.text_before_selected_word = ""
-        self.text_after_selected_word = ""
+        self.selected_word_span = (0, 0)
         
         # Віджети
         self.text_widget = None
@@ -352,8 +351,7 @@ class VoiceTagsEditor(App):
         word, start, end = self.base_editor.text_processor.detect_word_at_cursor(text, cursor_idx)
         
         if word:
-            self.text_before_selected_word = text[:start]
-            self.text_after_selected_word = text[end:]
+            self.selected_word_span = (start, end)
             self.selected_word = word
             self.btn_edit.disabled = False
             self.base_editor.logger.info(f"Виділено слово: '{word}' з позиції {start} до {end}")
@@ -387,10 +385,11 @@ class VoiceTagsEditor(App):
         replaced = self.base_editor.text_processor.match_casing(old_word, new_word)
         self.base_editor.logger.debug(f"Слово з відповідним регістром: '{replaced}'")
         
-        new_txt = self.text_before_selected_word + replaced + self.text_after_selected_word
+        start, end = self.selected_word_span
+        new_txt, new_pos = self.base_editor.text_processor.replace_word_span(
+            self.text_widget.text, start, end, replaced, old_word)
         self.text_widget.text = new_txt
         
-        new_pos = len(self.text_before_selected_word) + len(replaced)
         Clock.schedule_once(lambda dt: self._set_cursor_by_index(new_pos), 0)
         self.base_editor.logger.info(f"Слово замінено, новий курсор: {new_pos}")
 
@@ -489,10 +488,21 @@ class VoiceTagsEditor(App):
         self.base_editor.logger.info(f"Показ статусного повідомлення: {message}")
         self.show_popup("Повідомлення", message)
 
+    def on_pause(self):
+        """Android може завершити призупинений додаток - зберігаємо відкладені зміни конфігу"""
+        self.save_bookmark()
+        self.base_editor.config_manager.flush()
+        return True
+
+    def on_resume(self):
+        """Поки додаток стояв на паузі, конфіг міг змінити інший редактор - перечитуємо змінене"""
+        self.base_editor.config_manager.check_for_changes()
+
     def on_stop(self):
         """Дії при закритті додатку"""
         self.base_editor.logger.info("Завершення роботи Voice Tags Editor")
         self.save_bookmark()
+        self.base_editor.config_manager.flush()
         self.stop_tts()
         self.base_editor.logger.info("Voice Tags Editor закрито")
 